@@ -0,0 +1,182 @@
+"""Compact ticket history storage with monthly partitions
+
+Revision ID: 9c1e4a7b2d10
+Revises: 3703816b42a2
+Create Date: 2026-10-19 09:12:41.204518
+
+"""
+import uuid
+import zlib
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e4a7b2d10'
+down_revision: Union[str, None] = '3703816b42a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# Copied from the application as of this revision, so later changes there
+# cannot change what this migration writes
+ACTION_CODES = {
+    'created': 1,
+    'updated_title': 2,
+    'updated_description': 3,
+    'updated_status': 4,
+    'updated_priority': 5,
+    'updated_department': 6,
+    'updated_assignees': 7,
+}
+ACTION_BY_CODE = {code: action for action, code in ACTION_CODES.items()}
+
+# Leading byte of every encoded value describing how it is stored
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+COMPRESS_THRESHOLD = 256
+
+
+def encode_text(value: Optional[str]) -> Optional[bytes]:
+    if value is None:
+        return None
+    data = value.encode("utf-8")
+    if len(data) >= COMPRESS_THRESHOLD:
+        compressed = zlib.compress(data, 6)
+        if len(compressed) < len(data):
+            return _ZLIB + compressed
+    return _RAW + data
+
+
+def decode_text(value: Optional[bytes]) -> Optional[str]:
+    if value is None:
+        return None
+    value = bytes(value)
+    marker, payload = value[:1], value[1:]
+    if marker == _ZLIB:
+        payload = zlib.decompress(payload)
+    return payload.decode("utf-8")
+
+
+def _create_compact_table(name):
+    return op.create_table(
+        name,
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'),
+                  autoincrement=True, nullable=False),
+        sa.Column('ticket_id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('action', sa.SmallInteger(), nullable=False),
+        sa.Column('old_value', sa.LargeBinary(), nullable=True),
+        sa.Column('new_value', sa.LargeBinary(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['ticket_id'], ['tickets.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def _create_legacy_table(name):
+    return op.create_table(
+        name,
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('ticket_id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('action', sa.String(length=100), nullable=False),
+        sa.Column('old_value', sa.Text(), nullable=True),
+        sa.Column('new_value', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['ticket_id'], ['tickets.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def _history_table(name):
+    return sa.table(
+        name,
+        sa.column('id'), sa.column('ticket_id'), sa.column('user_id'), sa.column('action'),
+        sa.column('old_value'), sa.column('new_value'), sa.column('created_at', sa.DateTime(timezone=True)),
+    )
+
+
+def _copy(source, target, convert):
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(source).order_by(source.c.created_at)).mappings()
+    batch = []
+    for row in rows:
+        batch.append(convert(row))
+        if len(batch) >= BATCH_SIZE:
+            bind.execute(target.insert(), batch)
+            batch = []
+    if batch:
+        bind.execute(target.insert(), batch)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    legacy = _history_table('ticket_history')
+    compact = _create_compact_table('ticket_history_compact')
+
+    def convert(row):
+        return {
+            'ticket_id': row['ticket_id'],
+            'user_id': row['user_id'],
+            'action': ACTION_CODES[row['action']],
+            'old_value': encode_text(row['old_value']),
+            'new_value': encode_text(row['new_value']),
+            'created_at': row['created_at'],
+        }
+
+    _copy(legacy, compact, convert)
+
+    op.drop_table('ticket_history')
+    op.rename_table('ticket_history_compact', 'ticket_history')
+    op.create_index('ix_ticket_history_ticket_id_id', 'ticket_history', ['ticket_id', 'id'])
+    op.create_index('ix_ticket_history_created_at', 'ticket_history', ['created_at'])
+
+    op.create_table(
+        'ticket_history_partitions',
+        sa.Column('month', sa.String(length=6), nullable=False),
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('rolled_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('month'),
+        sa.UniqueConstraint('table_name'),
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    partitions = bind.execute(sa.text('SELECT table_name FROM ticket_history_partitions')).all()
+
+    compact_tables = [_history_table('ticket_history')] + [
+        _history_table(table_name) for (table_name,) in partitions
+    ]
+    legacy = _create_legacy_table('ticket_history_legacy')
+
+    def convert(row):
+        return {
+            'id': str(uuid.uuid4()),
+            'ticket_id': row['ticket_id'],
+            'user_id': row['user_id'],
+            'action': ACTION_BY_CODE[row['action']],
+            'old_value': decode_text(row['old_value']),
+            'new_value': decode_text(row['new_value']),
+            'created_at': row['created_at'],
+        }
+
+    for table in compact_tables:
+        _copy(table, legacy, convert)
+
+    for (table_name,) in partitions:
+        op.drop_table(table_name)
+    op.drop_table('ticket_history_partitions')
+    op.drop_index('ix_ticket_history_created_at', table_name='ticket_history')
+    op.drop_index('ix_ticket_history_ticket_id_id', table_name='ticket_history')
+    op.drop_table('ticket_history')
+    op.rename_table('ticket_history_legacy', 'ticket_history')
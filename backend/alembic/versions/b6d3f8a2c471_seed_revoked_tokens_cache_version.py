@@ -0,0 +1,33 @@
+"""Seed revoked tokens cache version
+
+Revision ID: b6d3f8a2c471
+Revises: e7d2a9c5b183
+Create Date: 2026-10-19 23:12:08.274519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d3f8a2c471'
+down_revision: Union[str, None] = 'e7d2a9c5b183'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+cache_versions = sa.table(
+    'cache_versions',
+    sa.column('name', sa.String),
+    sa.column('version', sa.BigInteger),
+)
+
+
+def upgrade() -> None:
+    # Seed the row so concurrent first revocations only ever update it
+    op.bulk_insert(cache_versions, [{'name': 'revoked_tokens', 'version': 0}])
+
+
+def downgrade() -> None:
+    op.execute(cache_versions.delete().where(cache_versions.c.name == 'revoked_tokens'))
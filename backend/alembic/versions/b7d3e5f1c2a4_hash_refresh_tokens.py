@@ -0,0 +1,63 @@
+"""Store refresh tokens by SHA-256 digest, one row per session
+
+Revision ID: b7d3e5f1c2a4
+Revises: 4f2b8d6e1a93
+Create Date: 2026-10-19 12:15:42.902114
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e5f1c2a4'
+down_revision: Union[str, None] = '4f2b8d6e1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.add_column(sa.Column('token_hash', sa.LargeBinary(length=32), nullable=True))
+        batch_op.add_column(sa.Column('device', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Hash existing tokens so current sessions survive the upgrade
+    refresh_tokens = sa.table(
+        'refresh_tokens',
+        sa.column('id', sa.String),
+        sa.column('token', sa.String),
+        sa.column('token_hash', sa.LargeBinary),
+    )
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(refresh_tokens.c.id, refresh_tokens.c.token)).fetchall()
+    for token_id, token in rows:
+        conn.execute(
+            refresh_tokens.update()
+            .where(refresh_tokens.c.id == token_id)
+            .values(token_hash=hashlib.sha256(token.encode()).digest())
+        )
+
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.alter_column('token_hash', existing_type=sa.LargeBinary(length=32), nullable=False)
+        batch_op.drop_column('token')
+        batch_op.create_unique_constraint('uq_refresh_tokens_token_hash', ['token_hash'])
+        batch_op.create_index('ix_refresh_tokens_user_id', ['user_id'])
+        batch_op.create_index('ix_refresh_tokens_expires_at', ['expires_at'])
+
+
+def downgrade() -> None:
+    # Digests cannot be turned back into tokens, so every session is signed out
+    op.execute('DELETE FROM refresh_tokens')
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.drop_index('ix_refresh_tokens_expires_at')
+        batch_op.drop_index('ix_refresh_tokens_user_id')
+        batch_op.drop_constraint('uq_refresh_tokens_token_hash', type_='unique')
+        batch_op.add_column(sa.Column('token', sa.String(length=500), nullable=False))
+        batch_op.create_unique_constraint('uq_refresh_tokens_token', ['token'])
+        batch_op.drop_column('last_used_at')
+        batch_op.drop_column('device')
+        batch_op.drop_column('token_hash')
@@ -1,28 +1,92 @@
 """Attachment management API endpoints."""
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import re
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse, StreamingResponse
 
+from app.core.config import settings
 from app.core.security import get_current_user_id, require_permission
-from app.models.attachment import AttachmentCreate, AttachmentResponse, PresignedUrlResponse
-from app.services.attachment_service import attachment_service
-from app.services.ticket_service import ticket_service
+from app.models.attachment import (
+    AttachmentCreate, AttachmentResponse, BlobUploadResponse, CompressionStats,
+    PresignedUrlResponse, UploadSessionCreate, UploadSessionResponse
+)
+from app.services.attachment_service_db import get_attachment_service
+from app.services.blob_store import blob_store
+from app.services.preview_service import PREVIEW_MEDIA_TYPES, preview_generator, preview_kind
+from app.services.upload_service import get_upload_service
 from app.utils.errors import build_error_response, ErrorCodes
 
 router = APIRouter()
 
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range Range header into an inclusive (start, end).
+
+    Returns None when the whole file should be sent (no header, or one
+    this server does not serve partially, like multiple ranges). Raises
+    416 when the range lies outside the file.
+    """
+    match = _RANGE_PATTERN.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail=build_error_response(
+                ErrorCodes.E_ATTACHMENT_RANGE_NOT_SATISFIABLE, "Requested range not satisfiable"),
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+def accepts_encoding(header: Optional[str], encoding: str) -> bool:
+    """Check whether an Accept-Encoding header allows a content coding."""
+    aliases = {encoding, "*"} | ({"x-gzip"} if encoding == "gzip" else set())
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() not in aliases:
+            continue
+        qvalue = params.strip()
+        try:
+            if qvalue.startswith("q=") and float(qvalue[2:]) == 0:
+                continue
+        except ValueError:
+            continue
+        return True
+    return False
+
+
+def content_disposition(filename: str) -> str:
+    """Build an attachment Content-Disposition header, as FileResponse does."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
 
 def convert_attachment_to_response(attachment) -> AttachmentResponse:
     """Convert internal attachment model to response model."""
     return AttachmentResponse(
-        id=attachment.id,
-        ticketId=attachment.ticket_id,
+        id=str(attachment.id),
+        ticketId=str(attachment.ticket_id),
         filename=attachment.filename,
         contentType=attachment.content_type,
         size=attachment.size,
         fileKey=attachment.file_key,
-        uploadedBy=attachment.uploaded_by,
-        createdAt=attachment.created_at
+        uploadedBy=str(attachment.uploaded_by),
+        createdAt=attachment.created_at.isoformat()
     )
 
 
@@ -30,7 +94,8 @@ def convert_attachment_to_response(attachment) -> AttachmentResponse:
 async def get_presigned_url(
     filename: str,
     content_type: str,
-    current_user_data: dict = Depends(require_permission("write:tickets"))
+    current_user_data: dict = Depends(require_permission("write:tickets")),
+    attachment_service=Depends(get_attachment_service)
 ):
     """Get presigned URL for file upload."""
     try:
@@ -43,23 +108,171 @@ async def get_presigned_url(
         )
 
 
+@router.put("/blobs", response_model=BlobUploadResponse)
+async def upload_blob(
+    request: Request,
+    current_user_data: dict = Depends(require_permission("write:tickets"))
+):
+    """Store a file streamed as the raw request body; returns its file key.
+
+    The Content-Type header decides whether the file is compressed at rest.
+    """
+    try:
+        file_key, size = await blob_store.save_stream(
+            request.stream(), settings.ATTACHMENT_MAX_BYTES, request.headers.get("content-type"))
+        return BlobUploadResponse(fileKey=file_key, size=size)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to store file", {"error": str(e)})
+        )
+
+
+@router.post("/uploads", response_model=UploadSessionResponse)
+async def create_upload(
+    upload_data: UploadSessionCreate,
+    current_user_data: dict = Depends(require_permission("write:tickets")),
+    upload_service=Depends(get_upload_service)
+):
+    """Start a resumable upload of a file of the given size."""
+    try:
+        session = upload_service.create_session(
+            upload_data.size, current_user_data.get("user_id"), upload_data.contentType)
+        return upload_service.to_response(session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to create upload", {"error": str(e)})
+        )
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload(
+    upload_id: str,
+    current_user_data: dict = Depends(require_permission("write:tickets")),
+    upload_service=Depends(get_upload_service)
+):
+    """Get the byte ranges of a resumable upload received so far."""
+    try:
+        session = upload_service.get_session(upload_id, current_user_data.get("user_id"))
+        return upload_service.to_response(session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to get upload", {"error": str(e)})
+        )
+
+
+@router.put("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def upload_chunk(
+    upload_id: str,
+    offset: int,
+    request: Request,
+    current_user_data: dict = Depends(require_permission("write:tickets")),
+    upload_service=Depends(get_upload_service)
+):
+    """Write the raw request body at an offset of a resumable upload."""
+    try:
+        session = upload_service.get_session(upload_id, current_user_data.get("user_id"))
+        await upload_service.write_chunk(session, offset, request.stream())
+        return upload_service.to_response(session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to store chunk", {"error": str(e)})
+        )
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=BlobUploadResponse)
+async def complete_upload(
+    upload_id: str,
+    current_user_data: dict = Depends(require_permission("write:tickets")),
+    upload_service=Depends(get_upload_service)
+):
+    """Finish a fully received upload; returns its file key."""
+    try:
+        session = upload_service.get_session(upload_id, current_user_data.get("user_id"))
+        return await upload_service.complete(session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to complete upload", {"error": str(e)})
+        )
+
+
+@router.delete("/uploads/{upload_id}")
+async def abort_upload(
+    upload_id: str,
+    current_user_data: dict = Depends(require_permission("write:tickets")),
+    upload_service=Depends(get_upload_service)
+):
+    """Discard a resumable upload."""
+    try:
+        session = upload_service.get_session(upload_id, current_user_data.get("user_id"))
+        upload_service.abort(session)
+        return {"message": "Upload aborted"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to abort upload", {"error": str(e)})
+        )
+
+
+@router.get("/compression-stats", response_model=List[CompressionStats])
+async def get_compression_stats(
+    current_user_data: dict = Depends(require_permission("read:reports")),
+    attachment_service=Depends(get_attachment_service)
+):
+    """Get attachment bytes and bytes on disk per content type."""
+    try:
+        return [
+            CompressionStats(
+                contentType=row["content_type"],
+                attachments=row["count"],
+                compressed=row["compressed_count"],
+                bytes=row["total_size"],
+                storedBytes=row["stored_size"],
+                ratio=round(row["total_size"] / row["stored_size"], 2) if row["stored_size"] else 1.0
+            )
+            for row in attachment_service.get_compression_stats()
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to get compression stats", {"error": str(e)})
+        )
+
+
 @router.post("/", response_model=AttachmentResponse)
 async def create_attachment(
     attachment_data: AttachmentCreate,
     file_key: str,
-    current_user_data: dict = Depends(require_permission("write:tickets"))
+    current_user_data: dict = Depends(require_permission("write:tickets")),
+    attachment_service=Depends(get_attachment_service)
 ):
     """Create attachment record after successful upload."""
     try:
-        # Verify ticket exists
-        ticket = ticket_service.get_ticket(attachment_data.ticketId)
-        if not ticket:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=build_error_response(
-                    ErrorCodes.E_TICKET_NOT_FOUND, "Ticket not found")
-            )
-
         attachment = attachment_service.create_attachment(
             attachment_data, current_user_data.get("user_id"), file_key)
         return convert_attachment_to_response(attachment)
@@ -76,7 +289,8 @@ async def create_attachment(
 @router.get("/{attachment_id}", response_model=AttachmentResponse)
 async def get_attachment(
     attachment_id: str,
-    current_user_data: dict = Depends(require_permission("read:tickets"))
+    current_user_data: dict = Depends(require_permission("read:tickets")),
+    attachment_service=Depends(get_attachment_service)
 ):
     """Get attachment by ID."""
     try:
@@ -92,22 +306,126 @@ async def get_attachment(
         )
 
 
-@router.get("/ticket/{ticket_id}", response_model=List[AttachmentResponse])
-async def get_ticket_attachments(
-    ticket_id: str,
-    current_user_data: dict = Depends(require_permission("read:tickets"))
+@router.get("/{attachment_id}/download")
+async def download_attachment(
+    attachment_id: str,
+    request: Request,
+    current_user_data: dict = Depends(require_permission("read:tickets")),
+    attachment_service=Depends(get_attachment_service)
 ):
-    """Get all attachments for a ticket."""
+    """Stream an attachment's file, honouring a single-range Range header.
+
+    A file compressed at rest is sent as stored, with Content-Encoding,
+    to clients that accept its encoding, and decompressed for the rest.
+    Ranges always address the uncompressed bytes.
+    """
     try:
-        # Verify ticket exists
-        ticket = ticket_service.get_ticket(ticket_id)
-        if not ticket:
+        attachment = attachment_service.get_attachment(attachment_id)
+        blob = blob_store.stat(attachment.file_key)
+        if blob is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=build_error_response(
-                    ErrorCodes.E_TICKET_NOT_FOUND, "Ticket not found")
+                    ErrorCodes.E_ATTACHMENT_NOT_FOUND, "Attachment file not found")
+            )
+
+        headers = {"Accept-Ranges": "bytes"}
+        if blob.encoding:
+            headers["Vary"] = "Accept-Encoding"
+        byte_range = parse_range(request.headers.get("range"), blob.size)
+        if byte_range is None:
+            if blob.encoding is None or accepts_encoding(
+                    request.headers.get("accept-encoding"), blob.encoding):
+                if blob.encoding:
+                    headers["Content-Encoding"] = blob.encoding
+                return FileResponse(
+                    blob.path,
+                    media_type=attachment.content_type,
+                    filename=attachment.filename,
+                    headers=headers
+                )
+            return StreamingResponse(
+                blob_store.iter_range(attachment.file_key, 0, blob.size),
+                media_type=attachment.content_type,
+                headers={
+                    **headers,
+                    "Content-Length": str(blob.size),
+                    "Content-Disposition": content_disposition(attachment.filename),
+                }
             )
 
+        start, end = byte_range
+        return StreamingResponse(
+            blob_store.iter_range(attachment.file_key, start, end - start + 1),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type=attachment.content_type,
+            headers={
+                **headers,
+                "Content-Range": f"bytes {start}-{end}/{blob.size}",
+                "Content-Length": str(end - start + 1),
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to download attachment", {"error": str(e)})
+        )
+
+
+@router.get("/{attachment_id}/preview")
+async def get_attachment_preview(
+    attachment_id: str,
+    current_user_data: dict = Depends(require_permission("read:tickets")),
+    attachment_service=Depends(get_attachment_service)
+):
+    """Get an image thumbnail (PNG) or the first lines of a text file."""
+    try:
+        attachment = attachment_service.get_attachment(attachment_id)
+        kind = preview_kind(attachment.content_type, attachment.filename)
+        if kind is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=build_error_response(
+                    ErrorCodes.E_PREVIEW_UNAVAILABLE, "No preview for this file type")
+            )
+        if not blob_store.exists(attachment.file_key):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=build_error_response(
+                    ErrorCodes.E_ATTACHMENT_NOT_FOUND, "Attachment file not found")
+            )
+
+        path = await preview_generator.get(attachment.file_key, kind)
+        # Previews are keyed by content hash, so they never change
+        return FileResponse(
+            path,
+            media_type=PREVIEW_MEDIA_TYPES[kind],
+            headers={
+                "Cache-Control": "private, max-age=31536000, immutable",
+                "ETag": f'"{attachment.file_key}-{kind}"',
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to get attachment preview", {"error": str(e)})
+        )
+
+
+@router.get("/ticket/{ticket_id}", response_model=List[AttachmentResponse])
+async def get_ticket_attachments(
+    ticket_id: str,
+    current_user_data: dict = Depends(require_permission("read:tickets")),
+    attachment_service=Depends(get_attachment_service)
+):
+    """Get all attachments for a ticket."""
+    try:
         attachments = attachment_service.get_ticket_attachments(ticket_id)
         return [convert_attachment_to_response(att) for att in attachments]
     except HTTPException:
@@ -123,7 +441,8 @@ async def get_ticket_attachments(
 @router.delete("/{attachment_id}")
 async def delete_attachment(
     attachment_id: str,
-    current_user_data: dict = Depends(require_permission("write:tickets"))
+    current_user_data: dict = Depends(require_permission("write:tickets")),
+    attachment_service=Depends(get_attachment_service)
 ):
     """Delete attachment."""
     try:
@@ -1,26 +1,31 @@
 """Authentication API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials
 
 from sqlalchemy.orm import Session
 
-from app.core.security import security, get_current_user_id, get_current_user_with_role
+from app.core.security import (
+    security, get_current_user_id, get_current_user_with_role, password_pool, revoke_access_token
+)
 from app.database.base import get_db
-from app.models.auth import LoginRequest, LoginResponse, RefreshTokenRequest, RefreshTokenResponse
+from app.models.auth import LoginRequest, LoginResponse, RefreshTokenRequest, RefreshTokenResponse, SessionResponse
 from app.models.user import UserCreate, UserResponse, UserRole, EmailVerificationRequest, ResendOTPRequest
 from app.services.auth_service_db import get_auth_service
 from app.services.user_service_db import get_user_service
 from app.utils.errors import build_error_response
+from app.utils.rate_limit import rate_limit
 
 router = APIRouter()
 
 
-@router.post("/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, auth_service=Depends(get_auth_service)):
+@router.post("/login", response_model=LoginResponse, dependencies=[Depends(rate_limit("login"))])
+async def login(login_data: LoginRequest, request: Request, auth_service=Depends(get_auth_service)):
     """Login user and return access/refresh tokens."""
     try:
-        return auth_service.login(login_data.email, login_data.password)
+        return await auth_service.login(
+            login_data.email, login_data.password, request.headers.get("user-agent"))
     except HTTPException:
         raise
     except Exception as e:
@@ -47,7 +52,7 @@ async def refresh_token(refresh_data: RefreshTokenRequest, auth_service=Depends(
         )
 
 
-@router.post("/register", response_model=UserResponse)
+@router.post("/register", response_model=UserResponse, dependencies=[Depends(rate_limit("register"))])
 async def register(user_data: UserCreate, user_service=Depends(get_user_service)):
     """Register a new user (non-admin only)."""
     try:
@@ -65,8 +70,9 @@ async def register(user_data: UserCreate, user_service=Depends(get_user_service)
         user_data.email_verified = False
 
         # Create user with system as creator (for registration)
+        password_hash = await password_pool.hash(user_data.password)
         user = user_service.create_user(
-            user_data, "system", send_verification=True)
+            user_data, "system", send_verification=True, password_hash=password_hash)
 
         # Convert to response format (camelCase)
         return UserResponse(
@@ -90,10 +96,21 @@ async def register(user_data: UserCreate, user_service=Depends(get_user_service)
 
 
 @router.post("/logout")
-async def logout(auth_service=Depends(get_auth_service)):
+async def logout(
+    request: Request,
+    refresh_data: Optional[RefreshTokenRequest] = None,
+    auth_service=Depends(get_auth_service)
+):
     """Logout user by invalidating refresh token."""
     try:
-        # Allow logout without authentication
+        # Allow logout without authentication; a refresh token ends just its session
+        if refresh_data:
+            auth_service.logout(refresh_data.refreshToken)
+
+        # Revoke the presented access token so it cannot be reused until expiry
+        authorization = request.headers.get("Authorization")
+        if authorization and authorization.startswith("Bearer "):
+            revoke_access_token(authorization.split(" ")[1])
         return {"message": "Logged out successfully"}
     except Exception as e:
         raise HTTPException(
@@ -103,6 +120,54 @@ async def logout(auth_service=Depends(get_auth_service)):
         )
 
 
+@router.get("/sessions", response_model=List[SessionResponse])
+async def get_sessions(
+    user_data: dict = Depends(get_current_user_with_role),
+    auth_service=Depends(get_auth_service)
+):
+    """Get the current user's signed-in sessions."""
+    try:
+        sessions = auth_service.get_sessions(user_data.get("user_id"))
+        return [
+            SessionResponse(
+                id=session.id,
+                device=session.device,
+                createdAt=session.created_at.isoformat() if session.created_at else None,
+                lastUsedAt=session.last_used_at.isoformat() if session.last_used_at else None,
+                expiresAt=session.expires_at.isoformat()
+            )
+            for session in sessions
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to get sessions", {"error": str(e)})
+        )
+
+
+@router.delete("/sessions/{session_id}")
+async def revoke_session(
+    session_id: str,
+    user_data: dict = Depends(get_current_user_with_role),
+    auth_service=Depends(get_auth_service)
+):
+    """Revoke one of the current user's sessions (sign out that device)."""
+    try:
+        auth_service.revoke_session(user_data.get("user_id"), session_id)
+        return {"message": "Session revoked successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to revoke session", {"error": str(e)})
+        )
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
     user_data: dict = Depends(get_current_user_with_role),
@@ -140,7 +205,7 @@ async def get_current_user(
         )
 
 
-@router.post("/verify-email")
+@router.post("/verify-email", dependencies=[Depends(rate_limit("verify-email"))])
 async def verify_email(verification_data: EmailVerificationRequest, user_service=Depends(get_user_service)):
     """Verify user email with OTP."""
     try:
@@ -166,7 +231,7 @@ async def verify_email(verification_data: EmailVerificationRequest, user_service
         )
 
 
-@router.post("/resend-otp")
+@router.post("/resend-otp", dependencies=[Depends(rate_limit("resend-otp"))])
 async def resend_otp(resend_data: ResendOTPRequest, user_service=Depends(get_user_service)):
     """Resend OTP to user email."""
     try:
@@ -3,10 +3,9 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from app.core.security import get_current_user_id, require_permission
+from app.core.security import require_permission
 from app.models.project import ProjectCreate, ProjectUpdate, ProjectResponse
 from app.services.project_service import project_service
-from app.services.auth_service import auth_service
 from app.utils.errors import build_error_response, ErrorCodes
 
 router = APIRouter()
@@ -24,20 +23,6 @@ def convert_project_to_response(project) -> ProjectResponse:
     )
 
 
-def require_manager_or_admin(current_user_id: str = Depends(get_current_user_id)) -> str:
-    """Dependency to require manager or admin role."""
-    user = auth_service.get_user_by_id(current_user_id)
-    if not user or user.role not in ["manager", "admin"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=build_error_response(
-                ErrorCodes.E_AUTH_INSUFFICIENT_PERMISSIONS,
-                "Manager or admin role required"
-            )
-        )
-    return current_user_id
-
-
 @router.get("/", response_model=List[ProjectResponse])
 async def get_projects(current_user_data: dict = Depends(require_permission("read:projects"))):
     """Get all projects."""
@@ -1,31 +1,18 @@
 """Reports and analytics API endpoints."""
 
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 
-from app.core.security import get_current_user_id, require_permission
-from app.models.reports import DashboardStats, ReportResponse
+from app.core.security import require_permission
+from app.models.reports import DashboardStats, ReportResponse, BoardSnapshot
 from app.services.ticket_service_db import get_ticket_service
 from app.services.reports_service import reports_service
-from app.services.auth_service import auth_service
 from app.utils.errors import build_error_response, ErrorCodes
 
 router = APIRouter()
 
 
-def require_manager_or_admin(current_user_id: str = Depends(get_current_user_id)) -> str:
-    """Dependency to require manager or admin role."""
-    user = auth_service.get_user_by_id(current_user_id)
-    if not user or user.role not in ["manager", "admin"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=build_error_response(
-                ErrorCodes.E_AUTH_INSUFFICIENT_PERMISSIONS,
-                "Manager or admin role required"
-            )
-        )
-    return current_user_id
-
-
 @router.get("/dashboard", response_model=DashboardStats)
 async def get_dashboard_stats(current_user_data: dict = Depends(require_permission("read:reports")), ticket_service=Depends(get_ticket_service)):
     """Get dashboard statistics."""
@@ -56,6 +43,40 @@ async def get_dashboard_stats(current_user_data: dict = Depends(require_permissi
         )
 
 
+@router.get("/snapshot", response_model=BoardSnapshot)
+async def get_board_snapshot(
+    as_of: datetime = Query(..., alias="asOf",
+                            description="Point in time to reconstruct the board at"),
+    current_user_data: dict = Depends(require_permission("read:reports")),
+    ticket_service=Depends(get_ticket_service)
+):
+    """Get ticket counts by status, priority and department as of a point in time."""
+    try:
+        snapshot = ticket_service.get_board_snapshot(as_of)
+        return BoardSnapshot(
+            asOf=snapshot["as_of"].isoformat(),
+            totalTickets=snapshot["total"],
+            ticketsByStatus=[
+                {"status": status, "count": count}
+                for status, count in snapshot["by_status"].items()
+            ],
+            ticketsByPriority=[
+                {"priority": priority, "count": count}
+                for priority, count in snapshot["by_priority"].items()
+            ],
+            ticketsByDepartment=[
+                {"department": dept, "count": count}
+                for dept, count in snapshot["by_department"].items()
+            ]
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to build board snapshot", {"error": str(e)})
+        )
+
+
 @router.get("/tickets-by-status", response_model=ReportResponse)
 async def get_tickets_by_status_report(current_user_data: dict = Depends(require_permission("read:reports"))):
     """Get tickets grouped by status report (manager/admin only)."""
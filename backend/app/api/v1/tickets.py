@@ -1,10 +1,14 @@
 """Ticket management API endpoints."""
 
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 
 from app.core.security import get_current_user_id, require_permission, get_current_user_with_role
-from app.models.ticket import TicketCreate, TicketUpdate, TicketResponse, TicketHistoryEntry
+from app.models.ticket import (
+    TicketCreate, TicketUpdate, TicketResponse, TicketHistoryEntry, TicketInternal,
+    TicketCommentCreate, TicketCommentUpdate, TicketCommentResponse, TicketCommentPage
+)
 from app.models.reports import DashboardStats
 from app.services.ticket_service_db import get_ticket_service
 from app.services.auth_service_db import get_auth_service
@@ -33,9 +37,10 @@ async def options_ticket(ticket_id: str):
     return {"message": "OK"}
 
 
-def convert_ticket_to_response(ticket) -> TicketResponse:
+def convert_ticket_to_response(ticket, extras: Optional[Dict[str, Any]] = None) -> TicketResponse:
     """Convert internal ticket model to response model."""
     return TicketResponse(
+        **(extras or {}),
         id=str(ticket.id),
         key=ticket.key,
         title=ticket.title,
@@ -46,7 +51,89 @@ def convert_ticket_to_response(ticket) -> TicketResponse:
         assigneeIds=[str(a.id) for a in ticket.assignees],
         status=ticket.status,
         createdAt=ticket.created_at.isoformat(),
-        updatedAt=ticket.updated_at.isoformat() if ticket.updated_at else None
+        updatedAt=ticket.updated_at.isoformat() if ticket.updated_at else None,
+        responseDueAt=ticket.response_due_at.isoformat() if ticket.response_due_at else None,
+        resolutionDueAt=ticket.resolution_due_at.isoformat() if ticket.resolution_due_at else None
+    )
+
+
+def convert_comment_to_response(comment, author=None) -> TicketCommentResponse:
+    """Convert internal comment model to response model."""
+    return TicketCommentResponse(
+        id=str(comment.id),
+        ticketId=str(comment.ticket_id),
+        userId=str(comment.user_id),
+        authorName=author.name if author else None,
+        content=comment.content,
+        createdAt=comment.created_at.isoformat(),
+        updatedAt=comment.updated_at.isoformat() if comment.updated_at else None
+    )
+
+
+def get_accessible_ticket(ticket_id: str, user_data: dict, ticket_service):
+    """Get a ticket the user may view, raising 404 or 403 otherwise."""
+    ticket = ticket_service.get_ticket(ticket_id)
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=build_error_response(
+                ErrorCodes.E_TICKET_NOT_FOUND, "Ticket not found")
+        )
+
+    user_role = user_data.get("role")
+    user_id = user_data.get("user_id")
+    if user_role == "client" and str(ticket.reporter_id) != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=build_error_response(
+                ErrorCodes.E_AUTH_INSUFFICIENT_PERMISSIONS,
+                "Can only view own tickets"
+            )
+        )
+    elif user_role in ["developer", "support"] and str(ticket.reporter_id) != user_id and user_id not in [str(a.id) for a in ticket.assignees]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=build_error_response(
+                ErrorCodes.E_AUTH_INSUFFICIENT_PERMISSIONS,
+                "Can only view assigned tickets"
+            )
+        )
+    return ticket
+
+
+def check_comment_author(comment, user_data: dict):
+    """Only a comment's author, managers and admins may change it."""
+    if user_data.get("role") not in ["admin", "manager"] and str(comment.user_id) != user_data.get("user_id"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=build_error_response(
+                ErrorCodes.E_AUTH_INSUFFICIENT_PERMISSIONS,
+                "Can only change own comments"
+            )
+        )
+
+
+def convert_tickets_to_response(tickets, include: Optional[str], ticket_service) -> List[TicketResponse]:
+    """Convert a ticket list, adding the aggregates named in a comma-separated include."""
+    names = [name.strip() for name in include.split(",")] if include else []
+    extras = ticket_service.get_list_extras(tickets, names) if names else {}
+    return [convert_ticket_to_response(ticket, extras.get(str(ticket.id))) for ticket in tickets]
+
+
+def convert_state_to_response(state: TicketInternal) -> TicketResponse:
+    """Convert a reconstructed ticket state to response model."""
+    return TicketResponse(
+        id=state.id,
+        key=state.key,
+        title=state.title,
+        description=state.description,
+        priority=state.priority,
+        department=state.department,
+        reporterId=state.reporter_id,
+        assigneeIds=state.assignee_ids,
+        status=state.status,
+        createdAt=state.created_at,
+        updatedAt=state.updated_at
     )
 
 
@@ -56,6 +143,8 @@ async def get_tickets(
     priority: Optional[str] = Query(None, description="Filter by priority"),
     assignee_id: Optional[str] = Query(
         None, description="Filter by assignee ID"),
+    include: Optional[str] = Query(
+        None, description="Comma-separated per-ticket aggregates to add: attachments, comments"),
     user_data: dict = Depends(require_permission("read:tickets")),
     ticket_service=Depends(get_ticket_service)
 ):
@@ -81,7 +170,7 @@ async def get_tickets(
             filters["user_access"] = user_id
 
         tickets = ticket_service.get_all_tickets(filters if filters else None)
-        return [convert_ticket_to_response(ticket) for ticket in tickets]
+        return convert_tickets_to_response(tickets, include, ticket_service)
     except Exception as e:
         print(f"Error getting tickets: {str(e)}")
         raise HTTPException(
@@ -115,6 +204,8 @@ async def create_ticket(
 
 @router.get("/my", response_model=List[TicketResponse])
 async def get_my_tickets(
+    include: Optional[str] = Query(
+        None, description="Comma-separated per-ticket aggregates to add: attachments, comments"),
     user_data: dict = Depends(require_permission("read:tickets")),
     ticket_service=Depends(get_ticket_service)
 ):
@@ -122,7 +213,7 @@ async def get_my_tickets(
     try:
         user_id = user_data.get("user_id")
         tickets = ticket_service.get_user_tickets(user_id)
-        return [convert_ticket_to_response(ticket) for ticket in tickets]
+        return convert_tickets_to_response(tickets, include, ticket_service)
     except Exception as e:
         print(f"Error getting tickets: {str(e)}")
         raise HTTPException(
@@ -165,10 +256,12 @@ async def get_dashboard_stats(current_user_data: dict = Depends(require_permissi
 @router.get("/{ticket_id}", response_model=TicketResponse)
 async def get_ticket(
     ticket_id: str,
+    as_of: Optional[datetime] = Query(
+        None, alias="asOf", description="Reconstruct the ticket as it was at this time"),
     user_data: dict = Depends(require_permission("read:tickets")),
     ticket_service=Depends(get_ticket_service)
 ):
-    """Get ticket by ID."""
+    """Get ticket by ID, optionally as it was at a point in time."""
     try:
         ticket = ticket_service.get_ticket(ticket_id)
         if not ticket:
@@ -199,6 +292,19 @@ async def get_ticket(
                 )
             )
 
+        if as_of is not None:
+            state = ticket_service.get_ticket_as_of(ticket_id, as_of)
+            if not state:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=build_error_response(
+                        ErrorCodes.E_TICKET_NOT_FOUND,
+                        "Ticket did not exist at the requested time",
+                        {"asOf": as_of.isoformat()}
+                    )
+                )
+            return convert_state_to_response(state)
+
         return convert_ticket_to_response(ticket)
     except HTTPException:
         raise
@@ -303,7 +409,7 @@ async def get_ticket_history(
                 id=str(entry.id),
                 ticketId=str(entry.ticket_id),
                 userId=str(entry.user_id),
-                action=entry.action,
+                action=entry.action.value,
                 oldValue=entry.old_value,
                 newValue=entry.new_value,
                 createdAt=entry.created_at.isoformat()
@@ -320,6 +426,106 @@ async def get_ticket_history(
         )
 
 
+@router.get("/{ticket_id}/comments", response_model=TicketCommentPage)
+async def get_ticket_comments(
+    ticket_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
+    user_data: dict = Depends(require_permission("read:tickets")),
+    ticket_service=Depends(get_ticket_service)
+):
+    """Get a page of ticket comments, oldest first."""
+    try:
+        get_accessible_ticket(ticket_id, user_data, ticket_service)
+        comments, authors, next_cursor = ticket_service.get_comments_page(ticket_id, limit, cursor)
+        return TicketCommentPage(
+            items=[convert_comment_to_response(comment, authors.get(str(comment.user_id)))
+                   for comment in comments],
+            nextCursor=next_cursor
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to get comments", {"error": str(e)})
+        )
+
+
+@router.post("/{ticket_id}/comments", response_model=TicketCommentResponse)
+async def create_ticket_comment(
+    ticket_id: str,
+    comment_data: TicketCommentCreate,
+    user_data: dict = Depends(require_permission("write:tickets")),
+    ticket_service=Depends(get_ticket_service),
+    auth_service=Depends(get_auth_service)
+):
+    """Add a comment to a ticket."""
+    try:
+        get_accessible_ticket(ticket_id, user_data, ticket_service)
+        comment = ticket_service.add_comment(ticket_id, user_data.get("user_id"), comment_data.content)
+        return convert_comment_to_response(comment, auth_service.get_user_by_id(user_data.get("user_id")))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to create comment", {"error": str(e)})
+        )
+
+
+@router.put("/{ticket_id}/comments/{comment_id}", response_model=TicketCommentResponse)
+async def update_ticket_comment(
+    ticket_id: str,
+    comment_id: str,
+    comment_data: TicketCommentUpdate,
+    user_data: dict = Depends(require_permission("write:tickets")),
+    ticket_service=Depends(get_ticket_service),
+    auth_service=Depends(get_auth_service)
+):
+    """Edit a comment (its author, managers and admins)."""
+    try:
+        get_accessible_ticket(ticket_id, user_data, ticket_service)
+        comment = ticket_service.get_comment(ticket_id, comment_id)
+        check_comment_author(comment, user_data)
+        comment = ticket_service.update_comment(comment, comment_data.content)
+        return convert_comment_to_response(comment, auth_service.get_user_by_id(str(comment.user_id)))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to update comment", {"error": str(e)})
+        )
+
+
+@router.delete("/{ticket_id}/comments/{comment_id}")
+async def delete_ticket_comment(
+    ticket_id: str,
+    comment_id: str,
+    user_data: dict = Depends(require_permission("write:tickets")),
+    ticket_service=Depends(get_ticket_service)
+):
+    """Delete a comment (its author, managers and admins)."""
+    try:
+        get_accessible_ticket(ticket_id, user_data, ticket_service)
+        comment = ticket_service.get_comment(ticket_id, comment_id)
+        check_comment_author(comment, user_data)
+        ticket_service.delete_comment(comment)
+        return {"message": "Comment deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to delete comment", {"error": str(e)})
+        )
+
+
 @router.get("/key/{ticket_key}", response_model=TicketResponse)
 async def get_ticket_by_key(
     ticket_key: str,
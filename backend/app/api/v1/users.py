@@ -3,7 +3,7 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from app.core.security import get_current_user_id, require_admin_role, require_permission, get_current_user_with_role
+from app.core.security import get_current_user_id, require_admin_role, require_permission, get_current_user_with_role, password_pool
 from app.models.user import UserCreate, UserUpdate, UserResponse
 from app.services.user_service_db import get_user_service
 from app.services.auth_service_db import get_auth_service
@@ -50,8 +50,10 @@ async def create_user(
 ):
     """Create a new user (admin only)."""
     try:
+        password_hash = await password_pool.hash(user_data.password)
         user = user_service.create_user(
-            user_data, current_user_data.get("user_id"), send_verification=False)
+            user_data, current_user_data.get("user_id"), send_verification=False,
+            password_hash=password_hash)
         return UserResponse(
             id=str(user.id),
             name=user.name,
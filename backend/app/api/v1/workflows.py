@@ -1,12 +1,14 @@
 """Workflow management API endpoints."""
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-
-from app.core.security import get_current_user_id, require_permission
-from app.models.workflow import WorkflowRuleCreate, WorkflowRuleUpdate, WorkflowRuleResponse
-from app.services.workflow_service import workflow_service
-from app.services.auth_service import auth_service
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.security import require_permission
+from app.models.workflow import (
+    WorkflowApplyResponse, WorkflowRuleCreate, WorkflowRuleUpdate, WorkflowRuleResponse
+)
+from app.services.workflow_service_db import get_workflow_service
 from app.utils.errors import build_error_response, ErrorCodes
 
 router = APIRouter()
@@ -27,22 +29,11 @@ def convert_workflow_to_response(rule) -> WorkflowRuleResponse:
     )
 
 
-def require_admin_role(current_user_id: str = Depends(get_current_user_id)) -> str:
-    """Dependency to require admin role."""
-    user = auth_service.get_user_by_id(current_user_id)
-    if not user or user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=build_error_response(
-                ErrorCodes.E_AUTH_INSUFFICIENT_PERMISSIONS,
-                "Admin role required"
-            )
-        )
-    return current_user_id
-
-
 @router.get("/", response_model=List[WorkflowRuleResponse])
-async def get_workflow_rules(current_user_data: dict = Depends(require_permission("read:workflows"))):
+async def get_workflow_rules(
+    current_user_data: dict = Depends(require_permission("read:workflows")),
+    workflow_service=Depends(get_workflow_service)
+):
     """Get all workflow rules (admin only)."""
     try:
         rules = workflow_service.get_all_rules()
@@ -58,7 +49,8 @@ async def get_workflow_rules(current_user_data: dict = Depends(require_permissio
 @router.post("/", response_model=WorkflowRuleResponse)
 async def create_workflow_rule(
     rule_data: WorkflowRuleCreate,
-    current_user_data: dict = Depends(require_permission("write:workflows"))
+    current_user_data: dict = Depends(require_permission("write:workflows")),
+    workflow_service=Depends(get_workflow_service)
 ):
     """Create a new workflow rule (admin only)."""
     try:
@@ -78,7 +70,8 @@ async def create_workflow_rule(
 @router.get("/{rule_id}", response_model=WorkflowRuleResponse)
 async def get_workflow_rule(
     rule_id: str,
-    current_user_data: dict = Depends(require_permission("read:workflows"))
+    current_user_data: dict = Depends(require_permission("read:workflows")),
+    workflow_service=Depends(get_workflow_service)
 ):
     """Get workflow rule by ID (admin only)."""
     try:
@@ -105,7 +98,8 @@ async def get_workflow_rule(
 async def update_workflow_rule(
     rule_id: str,
     rule_data: WorkflowRuleUpdate,
-    current_user_data: dict = Depends(require_permission("write:workflows"))
+    current_user_data: dict = Depends(require_permission("write:workflows")),
+    workflow_service=Depends(get_workflow_service)
 ):
     """Update workflow rule (admin only)."""
     try:
@@ -125,7 +119,8 @@ async def update_workflow_rule(
 @router.delete("/{rule_id}")
 async def delete_workflow_rule(
     rule_id: str,
-    current_user_data: dict = Depends(require_permission("write:workflows"))
+    current_user_data: dict = Depends(require_permission("write:workflows")),
+    workflow_service=Depends(get_workflow_service)
 ):
     """Delete workflow rule (admin only)."""
     try:
@@ -139,3 +134,25 @@ async def delete_workflow_rule(
             detail=build_error_response(
                 "E_INTERNAL_ERROR", "Failed to delete workflow rule", {"error": str(e)})
         )
+
+
+@router.post("/{rule_id}/apply", response_model=WorkflowApplyResponse)
+async def apply_workflow_rule(
+    rule_id: str,
+    dry_run: bool = Query(False, alias="dryRun", description="Only count the matching tickets"),
+    current_user_data: dict = Depends(require_permission("write:workflows")),
+    workflow_service=Depends(get_workflow_service)
+):
+    """Apply a rule to existing matching tickets, or only count them with dryRun (admin only)."""
+    try:
+        # Chunked bulk updates can take a while; keep them off the event loop
+        return await run_in_threadpool(
+            workflow_service.apply_rule, rule_id, current_user_data.get("user_id"), dry_run)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=build_error_response(
+                "E_INTERNAL_ERROR", "Failed to apply workflow rule", {"error": str(e)})
+        )
@@ -17,6 +17,33 @@ class Settings:
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS: int = int(
+        os.getenv("REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS", "3600"))
+    REFRESH_TOKEN_SWEEP_BATCH_SIZE: int = int(
+        os.getenv("REFRESH_TOKEN_SWEEP_BATCH_SIZE", "1000"))
+    TOKEN_REVOCATION_POLL_SECONDS: float = float(
+        os.getenv("TOKEN_REVOCATION_POLL_SECONDS", "5"))
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+    # Rate limiting: per route, (per client IP, per account) as "count/seconds"
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_COMPACT_INTERVAL_SECONDS: int = int(
+        os.getenv("RATE_LIMIT_COMPACT_INTERVAL_SECONDS", "60"))
+    RATE_LIMITS = {
+        "login": (os.getenv("RATE_LIMIT_LOGIN_IP", "30/60"),
+                  os.getenv("RATE_LIMIT_LOGIN_ACCOUNT", "5/60")),
+        "register": (os.getenv("RATE_LIMIT_REGISTER_IP", "10/3600"),
+                     os.getenv("RATE_LIMIT_REGISTER_ACCOUNT", "3/3600")),
+        "verify-email": (os.getenv("RATE_LIMIT_VERIFY_EMAIL_IP", "30/60"),
+                         os.getenv("RATE_LIMIT_VERIFY_EMAIL_ACCOUNT", "5/300")),
+        "resend-otp": (os.getenv("RATE_LIMIT_RESEND_OTP_IP", "10/3600"),
+                       os.getenv("RATE_LIMIT_RESEND_OTP_ACCOUNT", "3/900")),
+    }
+
+    # Password hashing
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    PASSWORD_HASH_QUEUE_LIMIT: int = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
 
     # CORS Configuration
     ALLOWED_ORIGINS: List[str] = [
@@ -58,9 +85,73 @@ class Settings:
         "sqlite:///./ticketing_system.db"
     )
 
+    # Seconds a SQLite writer waits for another connection's write lock
+    SQLITE_BUSY_TIMEOUT_SECONDS: float = float(os.getenv("SQLITE_BUSY_TIMEOUT_SECONDS", "30"))
+
     # For testing, use SQLite
     TEST_DATABASE_URL: str = "sqlite:///./test.db"
 
+    # Ticket History Configuration
+    HISTORY_ROLLUP_INTERVAL_SECONDS: int = int(
+        os.getenv("HISTORY_ROLLUP_INTERVAL_SECONDS", str(6 * 60 * 60)))
+
+    HISTORY_CHECKPOINT_INTERVAL: int = int(
+        os.getenv("HISTORY_CHECKPOINT_INTERVAL", "50"))
+
+    # Seconds between checks for workflow rule changes made by other workers
+    WORKFLOW_RULES_POLL_SECONDS: float = float(os.getenv("WORKFLOW_RULES_POLL_SECONDS", "5"))
+    # Rule chains longer than this (actions triggering rules triggering actions) are cut off
+    WORKFLOW_MAX_DEPTH: int = int(os.getenv("WORKFLOW_MAX_DEPTH", "3"))
+    WORKFLOW_ACTION_BATCH_SIZE: int = int(os.getenv("WORKFLOW_ACTION_BATCH_SIZE", "100"))
+    WORKFLOW_APPLY_CHUNK_SIZE: int = int(os.getenv("WORKFLOW_APPLY_CHUNK_SIZE", "500"))
+    # User that ticket changes and comments made by workflow actions are attributed to
+    WORKFLOW_ACTOR_EMAIL: str = os.getenv("WORKFLOW_ACTOR_EMAIL", "admin@company.com")
+
+    # SLA targets in minutes per priority, from creation to first response
+    # (leaving "open") and to resolution ("closed")
+    SLA_RESPONSE_MINUTES = {
+        "critical": int(os.getenv("SLA_RESPONSE_MINUTES_CRITICAL", "15")),
+        "high": int(os.getenv("SLA_RESPONSE_MINUTES_HIGH", "60")),
+        "medium": int(os.getenv("SLA_RESPONSE_MINUTES_MEDIUM", "240")),
+        "low": int(os.getenv("SLA_RESPONSE_MINUTES_LOW", "480")),
+    }
+    SLA_RESOLUTION_MINUTES = {
+        "critical": int(os.getenv("SLA_RESOLUTION_MINUTES_CRITICAL", "240")),
+        "high": int(os.getenv("SLA_RESOLUTION_MINUTES_HIGH", "1440")),
+        "medium": int(os.getenv("SLA_RESOLUTION_MINUTES_MEDIUM", "4320")),
+        "low": int(os.getenv("SLA_RESOLUTION_MINUTES_LOW", "10080")),
+    }
+    SLA_TICK_SECONDS: float = float(os.getenv("SLA_TICK_SECONDS", "1"))
+
+    # Event bus: "async" delivers on per-listener worker threads, "sync" inside publish
+    EVENT_BUS_MODE: str = os.getenv("EVENT_BUS_MODE", "async")
+    EVENT_BUS_QUEUE_SIZE: int = int(os.getenv("EVENT_BUS_QUEUE_SIZE", "1000"))
+    EVENT_BUS_BACKPRESSURE: str = os.getenv("EVENT_BUS_BACKPRESSURE", "block")  # block, drop, spill
+    EVENT_BUS_BATCH_SIZE: int = int(os.getenv("EVENT_BUS_BATCH_SIZE", "50"))
+    EVENT_BUS_SPILL_DIR: str = os.getenv("EVENT_BUS_SPILL_DIR", "")
+    # Seconds to merge rapid ticket.updated events per ticket and editor (0 disables)
+    EVENT_COALESCE_WINDOW_SECONDS: float = float(os.getenv("EVENT_COALESCE_WINDOW_SECONDS", "0"))
+    EVENT_RELAY_INTERVAL_SECONDS: float = float(os.getenv("EVENT_RELAY_INTERVAL_SECONDS", "0.5"))
+    EVENT_RELAY_BATCH_SIZE: int = int(os.getenv("EVENT_RELAY_BATCH_SIZE", "200"))
+    # How long a missing outbox id is waited for before events after it are delivered
+    EVENT_RELAY_GAP_GRACE_SECONDS: float = float(os.getenv("EVENT_RELAY_GAP_GRACE_SECONDS", "60"))
+
+    # Attachment storage: content-addressed blobs under this directory
+    ATTACHMENT_STORAGE_DIR: str = os.getenv("ATTACHMENT_STORAGE_DIR", "./storage/attachments")
+    ATTACHMENT_MAX_BYTES: int = int(os.getenv("ATTACHMENT_MAX_BYTES", str(5 * 1024 ** 3)))
+    # Encoding of compressible files at rest: auto (zstd if installed, else gzip), zstd, gzip, none
+    ATTACHMENT_COMPRESSION: str = os.getenv("ATTACHMENT_COMPRESSION", "auto")
+    # Resumable upload sessions idle for longer than this are deleted
+    UPLOAD_SESSION_TTL_SECONDS: int = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", "86400"))
+    UPLOAD_GC_INTERVAL_SECONDS: int = int(os.getenv("UPLOAD_GC_INTERVAL_SECONDS", "3600"))
+    # Files no attachment refers to are deleted once unused for this long
+    ATTACHMENT_ORPHAN_GRACE_SECONDS: int = int(os.getenv("ATTACHMENT_ORPHAN_GRACE_SECONDS", "3600"))
+    # Attachment previews, rendered in worker processes
+    PREVIEW_WORKERS: int = int(os.getenv("PREVIEW_WORKERS", "2"))
+    PREVIEW_IMAGE_SIZE: int = int(os.getenv("PREVIEW_IMAGE_SIZE", "320"))
+    PREVIEW_TEXT_BYTES: int = int(os.getenv("PREVIEW_TEXT_BYTES", "8192"))
+    PREVIEW_TEXT_LINES: int = int(os.getenv("PREVIEW_TEXT_LINES", "100"))
+
     # Email/SMTP Configuration
     SMTP_SERVER: str = os.getenv("SMTP_SERVER", "smtp.gmail.com")
     SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
@@ -68,6 +159,12 @@ class Settings:
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "brsvsncnxxzdfihy")
     FROM_EMAIL: str = os.getenv("FROM_EMAIL", "nishunara862@gmail.com")
     FROM_NAME: str = os.getenv("FROM_NAME", "Ticket")
+    SMTP_USE_TLS: bool = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+    EMAIL_OUTBOX_POLL_SECONDS: float = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "2"))
+    EMAIL_OUTBOX_BATCH_SIZE: int = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
+    NOTIFICATION_DIGEST_WINDOW_SECONDS: float = float(
+        os.getenv("NOTIFICATION_DIGEST_WINDOW_SECONDS", "900"))
 
 
 settings = Settings()
@@ -0,0 +1,98 @@
+"""Role-based access policy compiled to integer bitmasks.
+
+Every permission gets one bit and every role gets the OR of its permission
+bits, so a permission check is a dict lookup and a bitwise AND. The role
+table below is the single source of truth for who may do what.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+# Wildcard granting every permission, including ones registered later
+ALL_PERMISSIONS = "*"
+
+ROLE_PERMISSIONS: Dict[str, Tuple[str, ...]] = {
+    "admin": (ALL_PERMISSIONS,),
+    "manager": (
+        "read:tickets", "write:tickets", "assign:tickets",
+        "read:users", "write:users",
+        "read:reports", "read:dashboard",
+        "read:projects", "write:projects",
+        "read:workflows", "write:workflows",
+    ),
+    "developer": (
+        "read:tickets", "write:tickets",
+        "read:projects",
+        "read:dashboard",
+    ),
+    "support": (
+        "read:tickets", "write:tickets", "assign:tickets",
+        "read:dashboard",
+    ),
+    "it": (
+        "read:tickets", "write:tickets", "assign:tickets",
+        "read:users", "write:users",
+        "read:projects", "write:projects",
+        "read:workflows", "write:workflows",
+        "read:reports", "read:dashboard",
+    ),
+    "client": (
+        "read:tickets", "write:tickets",  # Only their own tickets
+        "read:dashboard",
+    ),
+}
+
+# Role that passes every role requirement
+SUPERUSER_ROLE = "admin"
+
+
+class Policy:
+    """Compiled permission and role bitmasks."""
+
+    def __init__(self, role_permissions: Dict[str, Iterable[str]]):
+        self.role_permissions = {role: tuple(perms) for role, perms in role_permissions.items()}
+        self.permission_bits: Dict[str, int] = {}
+        for perms in self.role_permissions.values():
+            for permission in perms:
+                if permission != ALL_PERMISSIONS:
+                    self.permission_bit(permission)
+
+        # -1 has every bit set, so wildcard roles also cover permissions added later
+        self.role_masks: Dict[str, int] = {}
+        for role, perms in self.role_permissions.items():
+            mask = 0
+            for permission in perms:
+                mask |= -1 if permission == ALL_PERMISSIONS else self.permission_bits[permission]
+            self.role_masks[role] = mask
+
+        self.role_bits = {role: 1 << index for index, role in enumerate(self.role_permissions)}
+
+    def permission_bit(self, permission: str) -> int:
+        """Get the bit for a permission, assigning one if it is new."""
+        bit = self.permission_bits.get(permission)
+        if bit is None:
+            bit = 1 << len(self.permission_bits)
+            self.permission_bits[permission] = bit
+        return bit
+
+    def roles_mask(self, roles: Iterable[str]) -> int:
+        """Get the combined bit of a set of roles (unknown roles are ignored)."""
+        mask = 0
+        for role in roles:
+            mask |= self.role_bits.get(role, 0)
+        return mask
+
+    def permissions_for(self, role: str) -> List[str]:
+        """Get the permission names granted to a role."""
+        return list(self.role_permissions.get(role, ()))
+
+    def allows(self, role: str, permission_bit: int) -> bool:
+        """Check whether a role holds a permission bit."""
+        return self.role_masks.get(role, 0) & permission_bit != 0
+
+    def role_in(self, role: str, roles_mask: int) -> bool:
+        """Check whether a role is in a roles mask; the superuser always is."""
+        return role == SUPERUSER_ROLE or self.role_bits.get(role, 0) & roles_mask != 0
+
+
+# Compiled once at import; all authorization dependencies share it
+policy = Policy(ROLE_PERMISSIONS)
@@ -0,0 +1,141 @@
+"""Access token revocation with an in-process Bloom filter fast path.
+
+Revoked token ids (``jti`` claims) are stored in ``revoked_tokens``. Each
+worker keeps a Bloom filter of the unexpired ones, so a token the filter
+rules out needs no I/O; only filter hits are confirmed against the table.
+Each revocation bumps the ``revoked_tokens`` row of ``cache_versions`` in
+its transaction. Workers poll that version and rebuild the filter when it
+moves, so a revocation made anywhere is honoured everywhere within one
+poll interval. Ids would not do: on Postgres they can commit out of
+order.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.database.base import SessionLocal
+from app.database.models import RevokedToken
+from app.database.repositories.cache_version_repository import CacheVersionRepository
+
+logger = logging.getLogger(__name__)
+
+# Name of the revocation list's row in cache_versions
+REVOCATIONS_VERSION = "revoked_tokens"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.sha256(value.encode()).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:16], "little") | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def add(self, value: str):
+        """Add a value to the filter."""
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(value))
+
+
+class RevocationList:
+    """Revoked access tokens shared through the database."""
+
+    # Filters are sized with headroom so local additions stay accurate until the next rebuild
+    MIN_CAPACITY = 1024
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._filter = BloomFilter(self.MIN_CAPACITY)
+        self._version: Optional[int] = None
+
+    def _build(self, jtis: Iterable[str], count: int) -> BloomFilter:
+        bloom = BloomFilter(max(count * 2, self.MIN_CAPACITY))
+        for jti in jtis:
+            bloom.add(jti)
+        return bloom
+
+    def refresh(self) -> bool:
+        """Rebuild the filter if the revocation table changed. Returns True if rebuilt."""
+        db = self.session_factory()
+        try:
+            version = CacheVersionRepository(db).get(REVOCATIONS_VERSION)
+            if version == self._version:
+                return False
+
+            now = datetime.utcnow()
+            jtis = [jti for (jti,) in db.query(RevokedToken.jti).filter(
+                RevokedToken.expires_at > now).all()]
+        finally:
+            db.close()
+
+        bloom = self._build(jtis, len(jtis))
+        with self._lock:
+            self._filter = bloom
+            self._version = version
+        logger.debug("Rebuilt token revocation filter with %s entries", len(jtis))
+        return True
+
+    def revoke(self, jti: str, expires_at: datetime, user_id: Optional[str] = None):
+        """Revoke a token until it expires."""
+        db = self.session_factory()
+        try:
+            db.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+            db.flush()
+            CacheVersionRepository(db).bump(REVOCATIONS_VERSION)
+            db.commit()
+        except IntegrityError:
+            # Already revoked
+            db.rollback()
+        finally:
+            db.close()
+
+        # Take effect in this worker immediately; others pick it up on their next poll
+        with self._lock:
+            self._filter.add(jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        """Check whether a token id has been revoked."""
+        if jti not in self._filter:
+            return False
+
+        db = self.session_factory()
+        try:
+            return db.query(RevokedToken.id).filter(
+                RevokedToken.jti == jti).first() is not None
+        finally:
+            db.close()
+
+    def delete_expired(self) -> int:
+        """Delete revocations of tokens that have expired anyway."""
+        db = self.session_factory()
+        try:
+            deleted = db.query(RevokedToken).filter(
+                RevokedToken.expires_at <= datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+
+# Revocation list shared by the auth dependencies of this worker
+revocation_list = RevocationList()
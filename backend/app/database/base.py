@@ -1,12 +1,19 @@
 """Database configuration and session management."""
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.core.config import settings
 
+def _is_memory_sqlite(db_url: str) -> bool:
+    """Check whether a SQLite URL names an in-memory database."""
+    database = make_url(db_url).database
+    return not database or database == ":memory:" or "mode=memory" in db_url
+
+
 # Create database engine
 def get_engine():
     """Get database engine based on configuration."""
@@ -14,10 +21,18 @@ def get_engine():
     
     if "sqlite" in db_url:
         # SQLite configuration
+        if _is_memory_sqlite(db_url):
+            # An in-memory database exists only on its one connection
+            return create_engine(
+                db_url,
+                connect_args={"check_same_thread": False},
+                poolclass=StaticPool,
+            )
+        # A connection per session, so one thread's commit or rollback never
+        # ends another's transaction; writers wait for the file lock instead
         return create_engine(
             db_url,
-            connect_args={"check_same_thread": False},
-            poolclass=StaticPool,
+            connect_args={"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_SECONDS},
         )
     else:
         # PostgreSQL configuration
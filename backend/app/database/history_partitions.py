@@ -0,0 +1,121 @@
+"""Monthly partitioning of ticket history.
+
+The ``ticket_history`` table only keeps recent rows. Rows from months before
+the current one are rolled into per-month archive tables named
+``ticket_history_YYYYMM`` which share the compact column layout, and each
+archive table is recorded in ``ticket_history_partitions``. Readers query
+the live table plus every registered archive.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import (
+    BigInteger, Column, DateTime, Integer, MetaData, String, Table, and_, func, select
+)
+from sqlalchemy.orm import Session
+
+from app.database.base import SessionLocal
+from app.database.models import (
+    TICKET_HISTORY_ACTION_CODES, TicketHistory, TicketHistoryAction, TicketHistoryPartition
+)
+from app.database.types import CodedEnum, CompressedText
+
+logger = logging.getLogger(__name__)
+
+# Archive tables are created on demand, so they live outside Base.metadata
+archive_metadata = MetaData()
+
+
+def _next_month(month_start: datetime) -> datetime:
+    """Get the first day of the month following month_start."""
+    if month_start.month == 12:
+        return month_start.replace(year=month_start.year + 1, month=1)
+    return month_start.replace(month=month_start.month + 1)
+
+
+def archive_table(month: str) -> Table:
+    """Get the archive table definition for a YYYYMM month."""
+    name = f"ticket_history_{month}"
+    if name in archive_metadata.tables:
+        return archive_metadata.tables[name]
+
+    return Table(
+        name,
+        archive_metadata,
+        Column("id", BigInteger().with_variant(Integer, "sqlite"),
+               primary_key=True, autoincrement=False),
+        Column("ticket_id", String(36), nullable=False, index=True),
+        Column("user_id", String(36), nullable=False),
+        Column("action", CodedEnum(TicketHistoryAction, TICKET_HISTORY_ACTION_CODES),
+               nullable=False),
+        Column("old_value", CompressedText()),
+        Column("new_value", CompressedText()),
+        Column("created_at", DateTime(timezone=True)),
+    )
+
+
+def history_tables(db: Session) -> List[Table]:
+    """Get the live history table followed by all archive tables."""
+    months = db.query(TicketHistoryPartition.month).order_by(
+        TicketHistoryPartition.month
+    ).all()
+    return [TicketHistory.__table__] + [archive_table(month) for (month,) in months]
+
+
+def roll_up_history(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Move history rows older than the current month into monthly archives.
+
+    Returns the number of rows moved per YYYYMM month.
+    """
+    now = now or datetime.utcnow()
+    current_month = datetime(now.year, now.month, 1)
+    source = TicketHistory.__table__
+
+    moved: Dict[str, int] = {}
+    while True:
+        # Jump straight to the next month holding rows so empty months are skipped
+        oldest = db.query(func.min(source.c.created_at)).filter(
+            source.c.created_at < current_month
+        ).scalar()
+        if oldest is None:
+            break
+
+        month_start = datetime(oldest.year, oldest.month, 1)
+        month_end = _next_month(month_start)
+        month = month_start.strftime("%Y%m")
+        window = and_(source.c.created_at >= month_start,
+                      source.c.created_at < month_end)
+
+        table = archive_table(month)
+        table.create(bind=db.connection(), checkfirst=True)
+
+        # Copy the stored bytes as-is; values stay compressed and coded
+        columns = [column.name for column in table.columns]
+        db.execute(table.insert().from_select(
+            columns, select(*[source.c[name] for name in columns]).where(window)
+        ))
+        count = db.execute(source.delete().where(window)).rowcount
+
+        partition = db.get(TicketHistoryPartition, month)
+        if partition:
+            partition.row_count += count
+        else:
+            db.add(TicketHistoryPartition(
+                month=month, table_name=table.name, row_count=count))
+        moved[month] = count
+
+    db.commit()
+    return moved
+
+
+def run_history_rollup():
+    """Roll up history using a dedicated session (background task entry point)."""
+    db = SessionLocal()
+    try:
+        moved = roll_up_history(db)
+        if moved:
+            logger.info("Rolled ticket history into monthly partitions: %s", moved)
+    finally:
+        db.close()
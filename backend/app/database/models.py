@@ -1,15 +1,17 @@
 """SQLAlchemy database models."""
 
 from sqlalchemy import (
-    Column, String, Boolean, DateTime, Text, Integer,
-    ForeignKey, Table, JSON, Enum as SQLEnum
+    Column, String, Boolean, DateTime, Text, Integer, BigInteger,
+    ForeignKey, Table, JSON, Index, LargeBinary, Enum as SQLEnum
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime
 import uuid
 import enum
 
 from app.database.base import Base
+from app.database.types import CodedEnum, CompressedText
 
 
 def generate_uuid():
@@ -58,6 +60,30 @@ class WorkflowTrigger(str, enum.Enum):
     TICKET_CREATED = "ticket_created"
     TICKET_UPDATED = "ticket_updated"
     STATUS_CHANGED = "status_changed"
+    SLA_BREACHED = "sla_breached"
+
+
+class TicketHistoryAction(str, enum.Enum):
+    """Ticket history action enumeration."""
+    CREATED = "created"
+    UPDATED_TITLE = "updated_title"
+    UPDATED_DESCRIPTION = "updated_description"
+    UPDATED_STATUS = "updated_status"
+    UPDATED_PRIORITY = "updated_priority"
+    UPDATED_DEPARTMENT = "updated_department"
+    UPDATED_ASSIGNEES = "updated_assignees"
+
+
+# Stable storage codes for history actions; never renumber existing entries
+TICKET_HISTORY_ACTION_CODES = {
+    TicketHistoryAction.CREATED: 1,
+    TicketHistoryAction.UPDATED_TITLE: 2,
+    TicketHistoryAction.UPDATED_DESCRIPTION: 3,
+    TicketHistoryAction.UPDATED_STATUS: 4,
+    TicketHistoryAction.UPDATED_PRIORITY: 5,
+    TicketHistoryAction.UPDATED_DEPARTMENT: 6,
+    TicketHistoryAction.UPDATED_ASSIGNEES: 7,
+}
 
 
 class UserVerificationStatus(str, enum.Enum):
@@ -127,6 +153,16 @@ class Ticket(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # SLA deadlines; sla_due_at is the earliest one not yet escalated
+    response_due_at = Column(DateTime(timezone=True))
+    resolution_due_at = Column(DateTime(timezone=True))
+    sla_due_at = Column(DateTime(timezone=True))
+
+    # Covers the SLA timer rehydration query, so it never reads the table itself
+    __table_args__ = (
+        Index("ix_tickets_sla_due_at_id", "sla_due_at", "id"),
+    )
+
     # Relationships
     reporter = relationship("User", foreign_keys=[
                             reporter_id], back_populates="reported_tickets")
@@ -139,18 +175,32 @@ class Ticket(Base):
         "Attachment", back_populates="ticket", cascade="all, delete-orphan")
     comments = relationship(
         "TicketComment", back_populates="ticket", cascade="all, delete-orphan")
+    snapshots = relationship(
+        "TicketSnapshot", cascade="all, delete-orphan")
 
 
 class TicketHistory(Base):
-    """Ticket history model."""
+    """Ticket history model.
+
+    Stored compactly: an integer surrogate key, the action as a small integer
+    code and old/new values compressed once they exceed a few hundred bytes.
+    Rows from past months are rolled into monthly archive tables, see
+    ``app.database.history_partitions``.
+    """
     __tablename__ = "ticket_history"
+    __table_args__ = (
+        Index("ix_ticket_history_ticket_id_id", "ticket_id", "id"),
+        Index("ix_ticket_history_created_at", "created_at"),
+    )
 
-    id = Column(String(36), primary_key=True, default=generate_uuid)
+    id = Column(BigInteger().with_variant(Integer, "sqlite"),
+                primary_key=True, autoincrement=True)
     ticket_id = Column(String(36), ForeignKey("tickets.id"), nullable=False)
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
-    action = Column(String(100), nullable=False)
-    old_value = Column(Text)
-    new_value = Column(Text)
+    action = Column(CodedEnum(TicketHistoryAction, TICKET_HISTORY_ACTION_CODES),
+                    nullable=False)
+    old_value = Column(CompressedText())
+    new_value = Column(CompressedText())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -158,15 +208,52 @@ class TicketHistory(Base):
     user = relationship("User", back_populates="ticket_history")
 
 
+class TicketSnapshot(Base):
+    """Checkpoint of a ticket's full state after a given history entry.
+
+    Written on creation and then every HISTORY_CHECKPOINT_INTERVAL history
+    entries, so point-in-time reconstruction replays at most one interval.
+    """
+    __tablename__ = "ticket_snapshots"
+    __table_args__ = (
+        Index("ix_ticket_snapshots_ticket_id_history_id", "ticket_id", "history_id"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"),
+                primary_key=True, autoincrement=True)
+    ticket_id = Column(String(36), ForeignKey("tickets.id"), nullable=False)
+    history_id = Column(BigInteger, nullable=False)
+    taken_at = Column(DateTime(timezone=True), nullable=False)
+    state = Column(JSON, nullable=False)
+
+
+class TicketHistoryPartition(Base):
+    """Registry of monthly ticket history archive tables."""
+    __tablename__ = "ticket_history_partitions"
+
+    month = Column(String(6), primary_key=True)  # YYYYMM
+    table_name = Column(String(64), nullable=False, unique=True)
+    row_count = Column(Integer, nullable=False, default=0)
+    rolled_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class TicketComment(Base):
-    """Ticket comment model."""
+    """Ticket comment model.
+
+    Comments are paged by (created_at, id) within a ticket, which the
+    index covers. created_at is set in Python so it has sub-second
+    precision on every backend.
+    """
     __tablename__ = "ticket_comments"
+    __table_args__ = (
+        Index("ix_ticket_comments_ticket_id_created_at", "ticket_id", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     ticket_id = Column(String(36), ForeignKey("tickets.id"), nullable=False)
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
@@ -179,11 +266,15 @@ class Attachment(Base):
     __tablename__ = "attachments"
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    ticket_id = Column(String(36), ForeignKey("tickets.id"), nullable=False)
+    ticket_id = Column(String(36), ForeignKey("tickets.id"), nullable=False, index=True)
     filename = Column(String(255), nullable=False)
     content_type = Column(String(100), nullable=False)
     size = Column(Integer, nullable=False)
-    file_key = Column(String(500), nullable=False)
+    # Bytes on disk and how they are encoded, when the file is compressed at rest
+    stored_size = Column(BigInteger)
+    content_encoding = Column(String(16))
+    # Content hash of the stored file; identical files share one blob
+    file_key = Column(String(500), nullable=False, index=True)
     uploaded_by = Column(String(36), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -192,6 +283,38 @@ class Attachment(Base):
     uploaded_by_user = relationship("User", back_populates="attachments")
 
 
+class UploadSession(Base):
+    """Resumable upload of one file, assembled under the blob store's uploads dir.
+
+    Chunks are written straight to their offset in a preallocated file, and
+    each one is recorded as a row, so chunks may arrive in any order or in
+    parallel without rewriting shared state.
+    """
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    created_by = Column(String(36), ForeignKey("users.id"), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    # Decides whether the file is compressed when the upload completes
+    content_type = Column(String(100))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Last chunk received; sessions idle for longer than the TTL are deleted
+    updated_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class UploadChunk(Base):
+    """Byte range received for an upload session."""
+    __tablename__ = "upload_chunks"
+    __table_args__ = (
+        Index("ix_upload_chunks_session_id_offset", "session_id", "offset"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    session_id = Column(String(36), ForeignKey("upload_sessions.id", ondelete="CASCADE"), nullable=False)
+    offset = Column(BigInteger, nullable=False)
+    length = Column(BigInteger, nullable=False)
+
+
 class WorkflowRule(Base):
     """Workflow rule model."""
     __tablename__ = "workflow_rules"
@@ -207,20 +330,115 @@ class WorkflowRule(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 
+class WorkflowActionLog(Base):
+    """Workflow action applied to a ticket, keyed for idempotency.
+
+    The key is derived from the triggering event, the rule and the action,
+    so an action is applied at most once however often its event arrives.
+    """
+    __tablename__ = "workflow_action_log"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    idempotency_key = Column(String(64), nullable=False, unique=True)
+    ticket_id = Column(String(36), nullable=False, index=True)
+    rule_id = Column(String(36), nullable=False)
+    action = Column(String(32), nullable=False)
+    executed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class CacheVersion(Base):
+    """Version counter of a data set cached in every worker.
+
+    Writers bump the version in the same transaction as the change, and
+    workers reload their copy when the version they hold is stale.
+    """
+    __tablename__ = "cache_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
 class RefreshToken(Base):
-    """Refresh token model."""
+    """Refresh token model.
+
+    Each row is one signed-in session (device). Only the SHA-256 digest of
+    the token is stored, so lookups use a fixed 32-byte key.
+    """
     __tablename__ = "refresh_tokens"
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
-    token = Column(String(500), nullable=False, unique=True)
-    expires_at = Column(DateTime(timezone=True), nullable=False)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(LargeBinary(32), nullable=False, unique=True)
+    device = Column(String(255))
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True))
 
     # Relationships
     user = relationship("User")
 
 
+class EmailOutbox(Base):
+    """Email waiting to be delivered by the background sender."""
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default="pending")  # pending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
+
+
+class EventOutbox(Base):
+    """Domain event recorded in the same transaction as the change it describes.
+
+    Ids are never reused, so they give a total order that relays and
+    replaying consumers track as offsets.
+    """
+    __tablename__ = "event_outbox"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event_type = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class EventConsumerOffset(Base):
+    """Last event id processed by a named event consumer."""
+    __tablename__ = "event_consumer_offsets"
+
+    consumer = Column(String(100), primary_key=True)
+    last_event_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class RevokedToken(Base):
+    """Access token revoked before its expiry, identified by its jti claim.
+
+    Rows are append-only until they expire, so the largest id doubles as a
+    version number workers poll to notice new revocations.
+    """
+    __tablename__ = "revoked_tokens"
+    # Never reuse ids, or a deleted-then-reinserted newest row would hide a change
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    jti = Column(String(36), nullable=False, unique=True)
+    user_id = Column(String(36), ForeignKey("users.id"))
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class Department(Base):
     """Department model."""
     __tablename__ = "departments"
@@ -1,6 +1,7 @@
 """Attachment repository for database operations."""
 
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
 from app.database.models import Attachment
@@ -13,27 +14,31 @@ class AttachmentRepository:
     def __init__(self, db: Session):
         self.db = db
     
-    def create(self, attachment_data: AttachmentCreate, uploaded_by_id: str, file_key: str) -> Attachment:
-        """Create a new attachment."""
+    def create(self, attachment_data: AttachmentCreate, uploaded_by_id: str, file_key: str,
+               size: Optional[int] = None, stored_size: Optional[int] = None,
+               content_encoding: Optional[str] = None, commit: bool = True) -> Attachment:
+        """Create a new attachment (flushed only when commit=False)."""
         db_attachment = Attachment(
             ticket_id=attachment_data.ticketId,
             filename=attachment_data.filename,
             content_type=attachment_data.contentType,
-            size=attachment_data.size,
+            size=attachment_data.size if size is None else size,
+            stored_size=stored_size,
+            content_encoding=content_encoding,
             file_key=file_key,
             uploaded_by=uploaded_by_id
         )
         self.db.add(db_attachment)
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         self.db.refresh(db_attachment)
         return db_attachment
     
     def get_by_id(self, attachment_id: str) -> Optional[Attachment]:
         """Get attachment by ID."""
-        return self.db.query(Attachment).options(
-            joinedload(Attachment.uploaded_by_user),
-            joinedload(Attachment.ticket)
-        ).filter(Attachment.id == attachment_id).first()
+        return self.db.query(Attachment).filter(Attachment.id == attachment_id).first()
     
     def get_by_ticket_id(self, ticket_id: str) -> List[Attachment]:
         """Get all attachments for a ticket."""
@@ -42,13 +47,60 @@ class AttachmentRepository:
         ).filter(Attachment.ticket_id == ticket_id).order_by(
             Attachment.created_at
         ).all()
+
+    def count_by_file_key(self, file_key: str) -> int:
+        """Count attachments referring to a stored file."""
+        return self.db.query(func.count(Attachment.id)).filter(
+            Attachment.file_key == file_key).scalar()
+
+    def get_referenced_file_keys(self, file_keys: Iterable[str]) -> Set[str]:
+        """Get which of some stored files at least one attachment refers to."""
+        return {file_key for (file_key,) in self.db.query(Attachment.file_key).filter(
+            Attachment.file_key.in_(list(file_keys))).distinct()}
+
+    def get_stats_by_ticket_ids(self, ticket_ids: Iterable[str],
+                                chunk_size: int = 500) -> Dict[str, Dict[str, int]]:
+        """Get attachment count and total size per ticket with one grouped query per chunk.
+
+        Tickets without attachments are left out.
+        """
+        ticket_ids = list(ticket_ids)
+        stats = {}
+        for start in range(0, len(ticket_ids), chunk_size):
+            rows = self.db.query(
+                Attachment.ticket_id, func.count(Attachment.id), func.sum(Attachment.size)
+            ).filter(
+                Attachment.ticket_id.in_(ticket_ids[start:start + chunk_size])
+            ).group_by(Attachment.ticket_id).all()
+            for ticket_id, count, total_size in rows:
+                stats[ticket_id] = {"count": count, "total_size": total_size or 0}
+        return stats
     
-    def delete(self, attachment_id: str) -> bool:
+    def get_compression_stats(self) -> List[Dict[str, Any]]:
+        """Get attachment count, size and bytes on disk per content type."""
+        stored_size = func.coalesce(Attachment.stored_size, Attachment.size)
+        rows = self.db.query(
+            Attachment.content_type,
+            func.count(Attachment.id),
+            func.count(Attachment.content_encoding),
+            func.sum(Attachment.size),
+            func.sum(stored_size)
+        ).group_by(Attachment.content_type).order_by(func.sum(Attachment.size).desc()).all()
+        return [
+            {"content_type": content_type, "count": count, "compressed_count": compressed_count,
+             "total_size": total_size or 0, "stored_size": total_stored or 0}
+            for content_type, count, compressed_count, total_size, total_stored in rows
+        ]
+
+    def delete(self, attachment_id: str, commit: bool = True) -> bool:
         """Delete attachment."""
         db_attachment = self.get_by_id(attachment_id)
         if not db_attachment:
             return False
         
         self.db.delete(db_attachment)
-        self.db.commit()
-        return True
\ No newline at end of file
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
+        return True
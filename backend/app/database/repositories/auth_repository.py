@@ -1,6 +1,7 @@
 """Authentication repository for database operations."""
 
-from typing import Optional
+import hashlib
+from typing import List, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 
@@ -8,48 +9,92 @@ from app.database.models import RefreshToken, User
 from app.core.config import settings
 
 
+def hash_refresh_token(token: str) -> bytes:
+    """Get the fixed-length digest under which a refresh token is stored."""
+    return hashlib.sha256(token.encode()).digest()
+
+
 class AuthRepository:
     """Repository for authentication database operations."""
-    
+
     def __init__(self, db: Session):
         self.db = db
-    
-    def create_refresh_token(self, user_id: str, token: str) -> RefreshToken:
-        """Create a refresh token."""
-        # Delete existing refresh tokens for this user
-        self.db.query(RefreshToken).filter(RefreshToken.user_id == user_id).delete()
-        
-        # Create new refresh token
+
+    def create_refresh_token(self, user_id: str, token: str, device: Optional[str] = None) -> RefreshToken:
+        """Create a refresh token for a new session."""
         expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
         db_token = RefreshToken(
             user_id=user_id,
-            token=token,
+            token_hash=hash_refresh_token(token),
+            device=device[:255] if device else None,
             expires_at=expires_at
         )
         self.db.add(db_token)
         self.db.commit()
         self.db.refresh(db_token)
         return db_token
-    
+
+    def rotate_refresh_token(self, db_token: RefreshToken, token: str) -> RefreshToken:
+        """Replace a session's refresh token, keeping the session itself."""
+        now = datetime.utcnow()
+        db_token.token_hash = hash_refresh_token(token)
+        db_token.expires_at = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        db_token.last_used_at = now
+        self.db.commit()
+        self.db.refresh(db_token)
+        return db_token
+
     def get_refresh_token(self, token: str) -> Optional[RefreshToken]:
         """Get refresh token by token string."""
         return self.db.query(RefreshToken).filter(
-            RefreshToken.token == token,
+            RefreshToken.token_hash == hash_refresh_token(token),
             RefreshToken.expires_at > datetime.utcnow()
         ).first()
-    
-    def delete_refresh_token(self, user_id: str) -> bool:
-        """Delete refresh token for user (logout)."""
+
+    def get_user_sessions(self, user_id: str) -> List[RefreshToken]:
+        """Get a user's active sessions, most recently created first."""
+        return self.db.query(RefreshToken).filter(
+            RefreshToken.user_id == user_id,
+            RefreshToken.expires_at > datetime.utcnow()
+        ).order_by(RefreshToken.created_at.desc()).all()
+
+    def revoke_session(self, user_id: str, session_id: str) -> bool:
+        """Revoke one of a user's sessions (sign out a single device)."""
         deleted_count = self.db.query(RefreshToken).filter(
+            RefreshToken.id == session_id,
             RefreshToken.user_id == user_id
         ).delete()
         self.db.commit()
         return deleted_count > 0
-    
-    def delete_expired_tokens(self) -> int:
-        """Delete expired refresh tokens."""
+
+    def revoke_refresh_token(self, token: str) -> bool:
+        """Revoke the session holding a refresh token."""
+        deleted_count = self.db.query(RefreshToken).filter(
+            RefreshToken.token_hash == hash_refresh_token(token)
+        ).delete()
+        self.db.commit()
+        return deleted_count > 0
+
+    def delete_refresh_token(self, user_id: str) -> bool:
+        """Delete all refresh tokens for user (sign out everywhere)."""
         deleted_count = self.db.query(RefreshToken).filter(
-            RefreshToken.expires_at <= datetime.utcnow()
+            RefreshToken.user_id == user_id
         ).delete()
         self.db.commit()
-        return deleted_count
\ No newline at end of file
+        return deleted_count > 0
+
+    def delete_expired_tokens(self, batch_size: int = 1000) -> int:
+        """Delete expired refresh tokens in batches, committing after each."""
+        total = 0
+        while True:
+            expired_ids = [token_id for (token_id,) in self.db.query(RefreshToken.id).filter(
+                RefreshToken.expires_at <= datetime.utcnow()
+            ).limit(batch_size).all()]
+            if not expired_ids:
+                return total
+
+            self.db.query(RefreshToken).filter(
+                RefreshToken.id.in_(expired_ids)
+            ).delete(synchronize_session=False)
+            self.db.commit()
+            total += len(expired_ids)
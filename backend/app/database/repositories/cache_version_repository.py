@@ -0,0 +1,25 @@
+"""Cache version repository for database operations."""
+
+from sqlalchemy.orm import Session
+
+from app.database.models import CacheVersion
+
+
+class CacheVersionRepository:
+    """Repository for the version counters of data sets cached in every worker."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, name: str) -> int:
+        """Get a data set's version (0 if it was never bumped)."""
+        version = self.db.query(CacheVersion.version).filter(CacheVersion.name == name).scalar()
+        return version or 0
+
+    def bump(self, name: str):
+        """Increment a data set's version in the current transaction."""
+        bumped = self.db.query(CacheVersion).filter(CacheVersion.name == name).update(
+            {CacheVersion.version: CacheVersion.version + 1}, synchronize_session=False)
+        if not bumped:
+            self.db.add(CacheVersion(name=name, version=1))
+            self.db.flush()
@@ -0,0 +1,80 @@
+"""Email outbox repository for database operations."""
+
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database.models import EmailOutbox
+
+
+class EmailOutboxRepository:
+    """Repository for queued outgoing email."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, recipient: str, subject: str, body: str, commit: bool = True) -> EmailOutbox:
+        """Queue an email for the background sender (flushed only when commit=False)."""
+        message = EmailOutbox(
+            recipient=recipient,
+            subject=subject,
+            body=body,
+            status="pending",
+            attempts=0,
+            next_attempt_at=datetime.utcnow()
+        )
+        self.db.add(message)
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
+        self.db.refresh(message)
+        return message
+
+    def get_due(self, limit: int) -> List[EmailOutbox]:
+        """Get pending emails whose next attempt is due, oldest first."""
+        return self.db.query(EmailOutbox).filter(
+            EmailOutbox.status == "pending",
+            EmailOutbox.next_attempt_at <= datetime.utcnow()
+        ).order_by(EmailOutbox.next_attempt_at, EmailOutbox.id).limit(limit).all()
+
+    def claim(self, message: EmailOutbox, lease_seconds: float) -> bool:
+        """Claim an email for sending.
+
+        Pushes its next attempt out by the lease so other workers skip it,
+        and a crashed sender's claim expires on its own. Returns False if
+        another sender claimed it first.
+        """
+        claimed = self.db.query(EmailOutbox).filter(
+            EmailOutbox.id == message.id,
+            EmailOutbox.status == "pending",
+            EmailOutbox.next_attempt_at == message.next_attempt_at
+        ).update({
+            EmailOutbox.attempts: EmailOutbox.attempts + 1,
+            EmailOutbox.next_attempt_at: datetime.utcnow() + timedelta(seconds=lease_seconds)
+        }, synchronize_session=False)
+        self.db.commit()
+        if claimed:
+            self.db.refresh(message)
+        return claimed == 1
+
+    def mark_sent(self, message: EmailOutbox):
+        """Record a successful delivery."""
+        message.status = "sent"
+        message.sent_at = datetime.utcnow()
+        message.last_error = None
+        self.db.commit()
+
+    def mark_failed(self, message: EmailOutbox, error: str, retry_at: Optional[datetime]):
+        """Record a failed attempt, scheduling a retry or giving up if retry_at is None."""
+        message.last_error = error
+        if retry_at is None:
+            message.status = "failed"
+        else:
+            message.next_attempt_at = retry_at
+        self.db.commit()
+
+    def count_by_status(self, status: str) -> int:
+        """Count emails in a status."""
+        return self.db.query(EmailOutbox).filter(EmailOutbox.status == status).count()
@@ -0,0 +1,66 @@
+"""Event outbox repository for database operations."""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database.models import EventConsumerOffset, EventOutbox
+
+
+class EventOutboxRepository:
+    """Repository for recorded domain events and consumer offsets."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, event_type: str, data: Dict[str, Any]) -> EventOutbox:
+        """Add an event to the current transaction without committing it."""
+        event = EventOutbox(
+            event_type=event_type,
+            # Normalise enums, datetimes and the like to plain JSON up front
+            payload=json.loads(json.dumps(data, default=str)),
+            created_at=datetime.utcnow()
+        )
+        self.db.add(event)
+        return event
+
+    def get_after(self, after_id: int, limit: int) -> List[EventOutbox]:
+        """Get events after an id, in order."""
+        return self.db.query(EventOutbox).filter(
+            EventOutbox.id > after_id
+        ).order_by(EventOutbox.id).limit(limit).all()
+
+    def get_offset(self, consumer: str) -> int:
+        """Get the last event id a consumer processed (0 if it never ran)."""
+        offset = self.db.get(EventConsumerOffset, consumer)
+        return offset.last_event_id if offset else 0
+
+    def set_offset(self, consumer: str, last_event_id: int):
+        """Record the last event id a consumer processed."""
+        offset = self.db.get(EventConsumerOffset, consumer)
+        if offset:
+            offset.last_event_id = last_event_id
+        else:
+            self.db.add(EventConsumerOffset(consumer=consumer, last_event_id=last_event_id))
+        self.db.commit()
+
+    def advance_offset(self, consumer: str, expected: int, last_event_id: int) -> bool:
+        """Move a consumer's offset only if nobody else moved it since it was read."""
+        if not expected and self.db.get(EventConsumerOffset, consumer) is None:
+            self.db.add(EventConsumerOffset(consumer=consumer, last_event_id=last_event_id))
+            try:
+                self.db.commit()
+            except IntegrityError:
+                # Another worker created the offset first
+                self.db.rollback()
+                return False
+            return True
+        moved = self.db.query(EventConsumerOffset).filter(
+            EventConsumerOffset.consumer == consumer,
+            EventConsumerOffset.last_event_id == expected
+        ).update({EventConsumerOffset.last_event_id: last_event_id}, synchronize_session=False)
+        self.db.commit()
+        return moved == 1
@@ -1,10 +1,17 @@
 """Ticket repository for database operations."""
 
+from collections import Counter
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, desc, func
+from sqlalchemy import Integer, and_, cast, or_, desc, func, select, union_all
 
-from app.database.models import Ticket, TicketHistory, TicketComment, User, TicketStatus, TicketPriority
+from app.core.config import settings
+from app.database.history_partitions import history_tables
+from app.database.models import (
+    Ticket, TicketHistory, TicketHistoryAction, TicketComment, TicketSnapshot, User,
+    TicketStatus, TicketPriority
+)
 from app.models.ticket import TicketCreate, TicketUpdate
 
 
@@ -14,8 +21,9 @@ class TicketRepository:
     def __init__(self, db: Session):
         self.db = db
     
-    def create(self, ticket_data: TicketCreate, reporter_id: str, ticket_key: str) -> Ticket:
-        """Create a new ticket."""
+    def create(self, ticket_data: TicketCreate, reporter_id: str, ticket_key: str,
+               commit: bool = True) -> Ticket:
+        """Create a new ticket (flushed only when commit=False)."""
         db_ticket = Ticket(
             key=ticket_key,
             title=ticket_data.title,
@@ -33,7 +41,10 @@ class TicketRepository:
             db_ticket.assignees = assignees
         
         self.db.add(db_ticket)
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         self.db.refresh(db_ticket)
         return db_ticket
     
@@ -90,8 +101,8 @@ class TicketRepository:
             )
         ).order_by(desc(Ticket.created_at)).all()
     
-    def update(self, ticket_id: str, ticket_data: TicketUpdate) -> Optional[Ticket]:
-        """Update ticket."""
+    def update(self, ticket_id: str, ticket_data: TicketUpdate, commit: bool = True) -> Optional[Ticket]:
+        """Update ticket (flushed only when commit=False)."""
         db_ticket = self.get_by_id(ticket_id)
         if not db_ticket:
             return None
@@ -107,7 +118,10 @@ class TicketRepository:
             ).all()
             db_ticket.assignees = assignees
         
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         self.db.refresh(db_ticket)
         return db_ticket
     
@@ -123,17 +137,16 @@ class TicketRepository:
     
     def get_next_ticket_number(self) -> int:
         """Get next ticket number for key generation."""
-        last_ticket = self.db.query(Ticket).order_by(desc(Ticket.created_at)).first()
-        if not last_ticket:
-            return 1001
-        
-        # Extract number from key (e.g., TSK-1001 -> 1001)
-        try:
-            last_number = int(last_ticket.key.split('-')[1])
-            return last_number + 1
-        except (IndexError, ValueError):
+        # Take the highest number rather than the newest ticket: tickets
+        # created within the same second share a created_at timestamp
+        prefix = f"{settings.TICKET_KEY_PREFIX}-"
+        last_number = self.db.query(
+            func.max(cast(func.substr(Ticket.key, len(prefix) + 1), Integer))
+        ).filter(Ticket.key.like(f"{prefix}%")).scalar()
+        if not last_number:
             return 1001
-    
+        return last_number + 1
+
     def get_stats(self) -> Dict[str, Any]:
         """Get ticket statistics."""
         total_tickets = self.db.query(Ticket).count()
@@ -161,6 +174,76 @@ class TicketRepository:
             "by_department": dict(dept_counts)
         }
 
+    def get_board_snapshot(self, as_of: datetime) -> Dict[str, Any]:
+        """Get ticket counts by status, priority and department as of a point in time.
+
+        Computed set-based: for every field the value at ``as_of`` is the new
+        value of the last change at or before it, else the old value of the
+        first change after it, else the ticket's current value.
+        """
+        selects = [
+            select(table.c.id, table.c.ticket_id, table.c.action, table.c.created_at)
+            for table in history_tables(self.db)
+        ]
+        history = (selects[0] if len(selects) == 1 else union_all(*selects)).subquery()
+
+        fields = {
+            "status": TicketHistoryAction.UPDATED_STATUS,
+            "priority": TicketHistoryAction.UPDATED_PRIORITY,
+            "department": TicketHistoryAction.UPDATED_DEPARTMENT,
+        }
+        columns = [Ticket.id, Ticket.status, Ticket.priority, Ticket.department]
+        query_joins = []
+        for field, action in fields.items():
+            before = select(
+                history.c.ticket_id, func.max(history.c.id).label("history_id")
+            ).where(
+                history.c.action == action, history.c.created_at <= as_of
+            ).group_by(history.c.ticket_id).subquery(f"{field}_before")
+            after = select(
+                history.c.ticket_id, func.min(history.c.id).label("history_id")
+            ).where(
+                history.c.action == action, history.c.created_at > as_of
+            ).group_by(history.c.ticket_id).subquery(f"{field}_after")
+            columns += [before.c.history_id, after.c.history_id]
+            query_joins += [before, after]
+
+        query = select(*columns)
+        for subquery in query_joins:
+            query = query.outerjoin(subquery, subquery.c.ticket_id == Ticket.id)
+        rows = self.db.execute(query.where(Ticket.created_at <= as_of)).all()
+
+        # Resolve all referenced history values in a handful of IN queries
+        history_ids = {value for row in rows for value in row[4:] if value is not None}
+        values = TicketHistoryRepository(self.db).get_values(history_ids)
+
+        counts = {field: Counter() for field in fields}
+        for row in rows:
+            current = {
+                "status": row.status.value,
+                "priority": row.priority.value,
+                "department": row.department,
+            }
+            for index, field in enumerate(fields):
+                before_id, after_id = row[4 + 2 * index], row[5 + 2 * index]
+                if before_id is not None:
+                    value = values[before_id][1]
+                elif after_id is not None:
+                    value = values[after_id][0]
+                else:
+                    value = current[field]
+                if field == "department":
+                    value = value or "Unassigned"
+                counts[field][value] += 1
+
+        return {
+            "as_of": as_of,
+            "total": len(rows),
+            "by_status": dict(counts["status"]),
+            "by_priority": dict(counts["priority"]),
+            "by_department": dict(counts["department"])
+        }
+
 
 class TicketHistoryRepository:
     """Repository for ticket history operations."""
@@ -169,8 +252,9 @@ class TicketHistoryRepository:
         self.db = db
     
     def create(self, ticket_id: str, user_id: str, action: str, 
-               old_value: Optional[str] = None, new_value: Optional[str] = None) -> TicketHistory:
-        """Create ticket history entry."""
+               old_value: Optional[str] = None, new_value: Optional[str] = None,
+               commit: bool = True) -> TicketHistory:
+        """Create ticket history entry (flushed only when commit=False)."""
         db_history = TicketHistory(
             ticket_id=ticket_id,
             user_id=user_id,
@@ -179,17 +263,121 @@ class TicketHistoryRepository:
             new_value=new_value
         )
         self.db.add(db_history)
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         self.db.refresh(db_history)
         return db_history
     
+    def _select(self, *criteria) -> Any:
+        """Select entries matching criteria across the live table and archives."""
+        selects = [
+            select(table.c.id, table.c.ticket_id, table.c.user_id, table.c.action,
+                   table.c.old_value, table.c.new_value, table.c.created_at
+                   ).where(*[criterion(table) for criterion in criteria])
+            for table in history_tables(self.db)
+        ]
+        if len(selects) == 1:
+            return selects[0]
+        return union_all(*selects).subquery().select()
+
     def get_by_ticket_id(self, ticket_id: str) -> List[TicketHistory]:
-        """Get history for a ticket."""
-        return self.db.query(TicketHistory).options(
-            joinedload(TicketHistory.user)
-        ).filter(
-            TicketHistory.ticket_id == ticket_id
-        ).order_by(TicketHistory.created_at).all()
+        """Get history for a ticket across the live table and monthly archives."""
+        query = self._select(lambda t: t.c.ticket_id == ticket_id)
+        # Surrogate keys are monotonic, so they order entries without a sort on time
+        return self.db.execute(query.order_by("id")).all()
+
+    def get_by_ticket_ids(self, ticket_ids: List[str]) -> List[TicketHistory]:
+        """Get history for many tickets, grouped by ticket and ordered by id."""
+        query = self._select(lambda t: t.c.ticket_id.in_(ticket_ids))
+        return self.db.execute(query.order_by("ticket_id", "id")).all()
+
+    def get_range(self, ticket_id: str, after_id: Optional[int] = None,
+                  upto_id: Optional[int] = None, since: Optional[datetime] = None,
+                  until: Optional[datetime] = None, newest_first: bool = False,
+                  limit: Optional[int] = None) -> List[TicketHistory]:
+        """Get a ticket's entries bounded by history id and/or time.
+
+        ``after_id`` and ``since`` are exclusive, ``upto_id`` and ``until`` inclusive.
+        """
+        criteria = [lambda t: t.c.ticket_id == ticket_id]
+        if after_id is not None:
+            criteria.append(lambda t: t.c.id > after_id)
+        if upto_id is not None:
+            criteria.append(lambda t: t.c.id <= upto_id)
+        if since is not None:
+            criteria.append(lambda t: t.c.created_at > since)
+        if until is not None:
+            criteria.append(lambda t: t.c.created_at <= until)
+
+        order = desc("id") if newest_first else "id"
+        return self.db.execute(
+            self._select(*criteria).order_by(order).limit(limit)
+        ).all()
+
+    def count_since(self, ticket_id: str, after_id: int) -> int:
+        """Count a ticket's entries newer than a history id."""
+        return sum(
+            self.db.query(func.count(table.c.id)).filter(
+                table.c.ticket_id == ticket_id, table.c.id > after_id
+            ).scalar()
+            for table in history_tables(self.db)
+        )
+
+    def get_values(self, history_ids, chunk_size: int = 500) -> Dict[int, tuple]:
+        """Get (old_value, new_value) for many history ids."""
+        history_ids = list(history_ids)
+        values = {}
+        for start in range(0, len(history_ids), chunk_size):
+            chunk = history_ids[start:start + chunk_size]
+            for row in self.db.execute(self._select(lambda t: t.c.id.in_(chunk))):
+                values[row.id] = (row.old_value, row.new_value)
+        return values
+
+
+class TicketSnapshotRepository:
+    """Repository for ticket state checkpoints."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, ticket_id: str, history_id: int, taken_at: datetime,
+               state: Dict[str, Any], commit: bool = True) -> TicketSnapshot:
+        """Create a ticket checkpoint (flushed only when commit=False)."""
+        db_snapshot = TicketSnapshot(
+            ticket_id=ticket_id,
+            history_id=history_id,
+            taken_at=taken_at,
+            state=state
+        )
+        self.db.add(db_snapshot)
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
+        self.db.refresh(db_snapshot)
+        return db_snapshot
+
+    def get_latest(self, ticket_id: str) -> Optional[TicketSnapshot]:
+        """Get the most recent checkpoint for a ticket."""
+        return self.db.query(TicketSnapshot).filter(
+            TicketSnapshot.ticket_id == ticket_id
+        ).order_by(desc(TicketSnapshot.history_id)).first()
+
+    def get_latest_before(self, ticket_id: str, as_of: datetime) -> Optional[TicketSnapshot]:
+        """Get the last checkpoint taken at or before as_of."""
+        return self.db.query(TicketSnapshot).filter(
+            TicketSnapshot.ticket_id == ticket_id,
+            TicketSnapshot.taken_at <= as_of
+        ).order_by(desc(TicketSnapshot.history_id)).first()
+
+    def get_earliest_after(self, ticket_id: str, as_of: datetime) -> Optional[TicketSnapshot]:
+        """Get the first checkpoint taken after as_of."""
+        return self.db.query(TicketSnapshot).filter(
+            TicketSnapshot.ticket_id == ticket_id,
+            TicketSnapshot.taken_at > as_of
+        ).order_by(TicketSnapshot.history_id).first()
 
 
 class TicketCommentRepository:
@@ -198,49 +386,78 @@ class TicketCommentRepository:
     def __init__(self, db: Session):
         self.db = db
     
-    def create(self, ticket_id: str, user_id: str, content: str) -> TicketComment:
-        """Create ticket comment."""
+    def create(self, ticket_id: str, user_id: str, content: str, commit: bool = True) -> TicketComment:
+        """Create ticket comment (flushed only when commit=False)."""
         db_comment = TicketComment(
             ticket_id=ticket_id,
             user_id=user_id,
             content=content
         )
         self.db.add(db_comment)
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         self.db.refresh(db_comment)
         return db_comment
     
-    def get_by_ticket_id(self, ticket_id: str) -> List[TicketComment]:
-        """Get comments for a ticket."""
-        return self.db.query(TicketComment).options(
-            joinedload(TicketComment.user)
-        ).filter(
-            TicketComment.ticket_id == ticket_id
-        ).order_by(TicketComment.created_at).all()
-    
-    def update(self, comment_id: str, content: str) -> Optional[TicketComment]:
-        """Update comment."""
-        db_comment = self.db.query(TicketComment).filter(
-            TicketComment.id == comment_id
-        ).first()
-        
+    def get_by_id(self, comment_id: str) -> Optional[TicketComment]:
+        """Get comment by ID."""
+        return self.db.get(TicketComment, comment_id)
+
+    def get_page(self, ticket_id: str, limit: int,
+                 after: Optional[tuple] = None) -> List[TicketComment]:
+        """Get up to limit comments for a ticket, oldest first.
+
+        ``after`` is the (created_at, id) of the last comment of the
+        previous page; the index on (ticket_id, created_at, id) makes each
+        page a range scan however deep it is. Authors are not loaded.
+        """
+        query = self.db.query(TicketComment).filter(TicketComment.ticket_id == ticket_id)
+        if after is not None:
+            created_at, comment_id = after
+            query = query.filter(or_(
+                TicketComment.created_at > created_at,
+                and_(TicketComment.created_at == created_at, TicketComment.id > comment_id)
+            ))
+        return query.order_by(TicketComment.created_at, TicketComment.id).limit(limit).all()
+
+    def count_by_ticket_ids(self, ticket_ids: List[str], chunk_size: int = 500) -> Dict[str, int]:
+        """Count comments per ticket with one grouped query per chunk.
+
+        Tickets without comments are left out.
+        """
+        counts = {}
+        for start in range(0, len(ticket_ids), chunk_size):
+            rows = self.db.query(TicketComment.ticket_id, func.count(TicketComment.id)).filter(
+                TicketComment.ticket_id.in_(ticket_ids[start:start + chunk_size])
+            ).group_by(TicketComment.ticket_id).all()
+            counts.update(rows)
+        return counts
+
+    def update(self, comment_id: str, content: str, commit: bool = True) -> Optional[TicketComment]:
+        """Update comment (flushed only when commit=False)."""
+        db_comment = self.get_by_id(comment_id)
         if not db_comment:
             return None
-        
+
         db_comment.content = content
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         self.db.refresh(db_comment)
         return db_comment
-    
-    def delete(self, comment_id: str) -> bool:
+
+    def delete(self, comment_id: str, commit: bool = True) -> bool:
         """Delete comment."""
-        db_comment = self.db.query(TicketComment).filter(
-            TicketComment.id == comment_id
-        ).first()
-        
+        db_comment = self.get_by_id(comment_id)
         if not db_comment:
             return False
-        
+
         self.db.delete(db_comment)
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         return True
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""Upload session repository for database operations."""
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.database.models import UploadChunk, UploadSession
+
+
+class UploadRepository:
+    """Repository for resumable upload sessions and their received chunks."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, created_by: str, size: int, content_type: Optional[str] = None,
+               commit: bool = True) -> UploadSession:
+        """Create an upload session (flushed only when commit=False)."""
+        session = UploadSession(created_by=created_by, size=size, content_type=content_type,
+                                updated_at=datetime.utcnow())
+        self.db.add(session)
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
+        self.db.refresh(session)
+        return session
+
+    def get_by_id(self, session_id: str) -> Optional[UploadSession]:
+        """Get upload session by ID."""
+        return self.db.get(UploadSession, session_id)
+
+    def add_chunk(self, session: UploadSession, offset: int, length: int, commit: bool = True):
+        """Record a received byte range and mark the session active."""
+        self.db.add(UploadChunk(session_id=session.id, offset=offset, length=length))
+        session.updated_at = datetime.utcnow()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
+
+    def get_chunks(self, session_id: str) -> List[Tuple[int, int]]:
+        """Get the (offset, length) of received chunks, by offset."""
+        return self.db.query(UploadChunk.offset, UploadChunk.length).filter(
+            UploadChunk.session_id == session_id
+        ).order_by(UploadChunk.offset).all()
+
+    def get_stale_ids(self, updated_before: datetime, limit: int) -> List[str]:
+        """Get IDs of sessions with no chunk received since updated_before."""
+        rows = self.db.query(UploadSession.id).filter(
+            UploadSession.updated_at < updated_before
+        ).order_by(UploadSession.updated_at).limit(limit).all()
+        return [row.id for row in rows]
+
+    def delete(self, session_ids: List[str], commit: bool = True) -> int:
+        """Delete upload sessions and their chunks. Returns the number of sessions deleted."""
+        self.db.query(UploadChunk).filter(
+            UploadChunk.session_id.in_(session_ids)).delete(synchronize_session=False)
+        deleted = self.db.query(UploadSession).filter(
+            UploadSession.id.in_(session_ids)).delete(synchronize_session=False)
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
+        return deleted
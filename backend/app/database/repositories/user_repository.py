@@ -1,6 +1,6 @@
 """User repository for database operations."""
 
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
@@ -15,8 +15,8 @@ class UserRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create(self, user_data: UserCreate, password_hash: str, verification_token: str = None, verification_expires: datetime = None) -> User:
-        """Create a new user."""
+    def create(self, user_data: UserCreate, password_hash: str, verification_token: str = None, verification_expires: datetime = None, commit: bool = True) -> User:
+        """Create a new user (flushed only when commit=False)."""
         from datetime import datetime
         db_user = User(
             name=user_data.name,
@@ -29,7 +29,10 @@ class UserRepository:
             verification_token_expires=verification_expires
         )
         self.db.add(db_user)
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         self.db.refresh(db_user)
         return db_user
 
@@ -37,6 +40,13 @@ class UserRepository:
         """Get user by ID."""
         return self.db.query(User).filter(User.id == user_id).first()
 
+    def get_by_ids(self, user_ids: Iterable[str]) -> List[User]:
+        """Get the users with the given IDs in one query."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return []
+        return self.db.query(User).filter(User.id.in_(user_ids)).all()
+
     def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email."""
         return self.db.query(User).filter(User.email == email).first()
@@ -48,8 +58,8 @@ class UserRepository:
             query = query.filter(User.active == True)
         return query.all()
 
-    def update(self, user_id: str, user_data: UserUpdate) -> Optional[User]:
-        """Update user."""
+    def update(self, user_id: str, user_data: UserUpdate, commit: bool = True) -> Optional[User]:
+        """Update user (flushed only when commit=False)."""
         db_user = self.get_by_id(user_id)
         if not db_user:
             return None
@@ -58,18 +68,30 @@ class UserRepository:
         for field, value in update_data.items():
             setattr(db_user, field, value)
 
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         self.db.refresh(db_user)
         return db_user
 
-    def delete(self, user_id: str) -> bool:
-        """Delete user."""
+    def update_password_hash(self, user: User, password_hash: str) -> User:
+        """Replace a user's stored password hash."""
+        user.password_hash = password_hash
+        self.db.commit()
+        return user
+
+    def delete(self, user_id: str, commit: bool = True) -> bool:
+        """Delete user (flushed only when commit=False)."""
         db_user = self.get_by_id(user_id)
         if not db_user:
             return False
 
         self.db.delete(db_user)
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         return True
 
     def get_by_role(self, role: UserRole) -> List[User]:
@@ -85,8 +107,8 @@ class UserRepository:
             query = query.filter(User.id != exclude_user_id)
         return query.first() is not None
 
-    def verify_email(self, email: str, otp: str) -> Optional[User]:
-        """Verify email with OTP."""
+    def verify_email(self, email: str, otp: str, commit: bool = True) -> Optional[User]:
+        """Verify email with OTP (flushed only when commit=False)."""
         from datetime import datetime
         user = self.db.query(User).filter(
             and_(
@@ -101,7 +123,10 @@ class UserRepository:
             user.email_verified = True
             user.verification_token = None
             user.verification_token_expires = None
-            self.db.commit()
+            if commit:
+                self.db.commit()
+            else:
+                self.db.flush()
             self.db.refresh(user)
 
         return user
@@ -4,17 +4,22 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from app.database.models import WorkflowRule, WorkflowTrigger
+from app.database.repositories.cache_version_repository import CacheVersionRepository
 from app.models.workflow import WorkflowRuleCreate, WorkflowRuleUpdate
 
 
+# Name of the rule set's row in cache_versions
+RULES_VERSION = "workflow_rules"
+
+
 class WorkflowRepository:
     """Repository for workflow rule database operations."""
     
     def __init__(self, db: Session):
         self.db = db
     
-    def create(self, rule_data: WorkflowRuleCreate) -> WorkflowRule:
-        """Create a new workflow rule."""
+    def create(self, rule_data: WorkflowRuleCreate, commit: bool = True) -> WorkflowRule:
+        """Create a new workflow rule (flushed only when commit=False)."""
         db_rule = WorkflowRule(
             name=rule_data.name,
             description=rule_data.description,
@@ -24,7 +29,10 @@ class WorkflowRepository:
             active=rule_data.active
         )
         self.db.add(db_rule)
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         self.db.refresh(db_rule)
         return db_rule
     
@@ -39,6 +47,10 @@ class WorkflowRepository:
             query = query.filter(WorkflowRule.active == True)
         return query.order_by(WorkflowRule.name).all()
     
+    def get_all_in_order(self) -> List[WorkflowRule]:
+        """Get all workflow rules in creation order, the order they run in."""
+        return self.db.query(WorkflowRule).order_by(WorkflowRule.created_at, WorkflowRule.id).all()
+    
     def get_by_trigger(self, trigger: WorkflowTrigger, active_only: bool = True) -> List[WorkflowRule]:
         """Get workflow rules by trigger type."""
         query = self.db.query(WorkflowRule).filter(WorkflowRule.trigger == trigger)
@@ -46,26 +58,41 @@ class WorkflowRepository:
             query = query.filter(WorkflowRule.active == True)
         return query.all()
     
-    def update(self, rule_id: str, rule_data: WorkflowRuleUpdate) -> Optional[WorkflowRule]:
-        """Update workflow rule."""
+    def update(self, rule_id: str, rule_data: WorkflowRuleUpdate,
+               commit: bool = True) -> Optional[WorkflowRule]:
+        """Update workflow rule (flushed only when commit=False)."""
         db_rule = self.get_by_id(rule_id)
         if not db_rule:
             return None
         
-        update_data = rule_data.dict(exclude_unset=True)
+        update_data = rule_data.dict(exclude_unset=True, exclude_none=True)
         for field, value in update_data.items():
             setattr(db_rule, field, value)
         
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         self.db.refresh(db_rule)
         return db_rule
     
-    def delete(self, rule_id: str) -> bool:
-        """Delete workflow rule."""
+    def delete(self, rule_id: str, commit: bool = True) -> bool:
+        """Delete workflow rule (flushed only when commit=False)."""
         db_rule = self.get_by_id(rule_id)
         if not db_rule:
             return False
         
         self.db.delete(db_rule)
-        self.db.commit()
-        return True
\ No newline at end of file
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
+        return True
+    
+    def get_version(self) -> int:
+        """Get the rule set version."""
+        return CacheVersionRepository(self.db).get(RULES_VERSION)
+    
+    def bump_version(self):
+        """Increment the rule set version in the current transaction."""
+        CacheVersionRepository(self.db).bump(RULES_VERSION)
\ No newline at end of file
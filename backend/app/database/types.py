@@ -0,0 +1,79 @@
+"""Custom column types for compact storage."""
+
+import enum
+import zlib
+from typing import Dict, Optional, Type
+
+from sqlalchemy import LargeBinary, SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+# Leading byte of every CompressedText value describing how it is stored
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+
+
+def encode_text(value: Optional[str], threshold: int = 256) -> Optional[bytes]:
+    """Encode text, compressing it when large enough to benefit."""
+    if value is None:
+        return None
+
+    data = value.encode("utf-8")
+    if len(data) >= threshold:
+        compressed = zlib.compress(data, 6)
+        if len(compressed) < len(data):
+            return _ZLIB + compressed
+    return _RAW + data
+
+
+def decode_text(value: Optional[bytes]) -> Optional[str]:
+    """Decode a value produced by encode_text."""
+    if value is None:
+        return None
+
+    value = bytes(value)
+    marker, payload = value[:1], value[1:]
+    if marker == _ZLIB:
+        payload = zlib.decompress(payload)
+    return payload.decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """Text stored as bytes, zlib-compressed above a size threshold."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, threshold: int = 256, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threshold = threshold
+
+    def process_bind_param(self, value, dialect):
+        return encode_text(value, self.threshold)
+
+    def process_result_value(self, value, dialect):
+        return decode_text(value)
+
+
+class CodedEnum(TypeDecorator):
+    """Enum stored as a small integer code instead of its string value."""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class: Type[enum.Enum], codes: Dict[enum.Enum, int], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.enum_class = enum_class
+        # Kept hashable so SQLAlchemy can cache statements using this type
+        self.codes = tuple(sorted(codes.items(), key=lambda item: item[1]))
+        self._code_by_member = dict(codes)
+        self._member_by_code = {code: member for member, code in codes.items()}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self._code_by_member[self.enum_class(value)]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._member_by_code[value]
@@ -3,12 +3,28 @@
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1 import auth, users, tickets, projects, attachments, workflows, reports
 from app.core.config import settings
+from app.core.revocation import revocation_list
+from app.core.security import password_pool, require_permission
+from app.database.history_partitions import run_history_rollup
 from app.database.setup import setup_database
+from app.services.auth_service_db import run_refresh_token_sweep
+from app.services.email_outbox import email_outbox_sender
+from app.services.event_relay import event_relay
+from app.services.notification_digest import notification_digest_service
+from app.services.preview_service import preview_generator
+from app.services.sla_service import sla_scheduler
+from app.services.upload_service import run_upload_gc
+from app.services.workflow_actions import workflow_action_executor
+from app.services.workflow_service_db import workflow_rule_set
+from app.utils.background import background_tasks
+from app.utils.events import event_bus
+from app.utils.metrics import metrics
+from app.utils.rate_limit import rate_limiter
 
 
 # Configure logging
@@ -18,6 +34,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Background maintenance jobs
+background_tasks.add("event-relay", settings.EVENT_RELAY_INTERVAL_SECONDS,
+                     event_relay.relay)
+background_tasks.add("workflow-rules-sync", settings.WORKFLOW_RULES_POLL_SECONDS,
+                     workflow_rule_set.refresh)
+background_tasks.add("sla-timers", settings.SLA_TICK_SECONDS,
+                     sla_scheduler.fire_due)
+background_tasks.add("history-rollup", settings.HISTORY_ROLLUP_INTERVAL_SECONDS,
+                     run_history_rollup)
+background_tasks.add("refresh-token-sweep", settings.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS,
+                     run_refresh_token_sweep)
+background_tasks.add("token-revocation-sync", settings.TOKEN_REVOCATION_POLL_SECONDS,
+                     revocation_list.refresh)
+background_tasks.add("rate-limit-compaction", settings.RATE_LIMIT_COMPACT_INTERVAL_SECONDS,
+                     rate_limiter.compact)
+background_tasks.add("upload-gc", settings.UPLOAD_GC_INTERVAL_SECONDS,
+                     run_upload_gc)
+background_tasks.add("email-outbox", settings.EMAIL_OUTBOX_POLL_SECONDS,
+                     email_outbox_sender.drain)
+background_tasks.add("notification-digest", settings.NOTIFICATION_DIGEST_WINDOW_SECONDS,
+                     notification_digest_service.flush)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -25,8 +63,22 @@ async def lifespan(app: FastAPI):
     logger.info("Starting up ticketing system API")
     # Setup database on startup
     setup_database()
+    revocation_list.refresh()
+    workflow_rule_set.refresh()
+    sla_scheduler.rehydrate()
+    background_tasks.start()
     yield
     logger.info("Shutting down ticketing system API")
+    await background_tasks.stop()
+    password_pool.shutdown()
+    preview_generator.shutdown()
+    # Publish events committed since the last relay before listeners stop
+    event_relay.relay()
+    event_bus.stop()
+    workflow_action_executor.stop()
+    # Queue partially collected digests so they go out after restart
+    notification_digest_service.flush()
+    email_outbox_sender.close()
 
 
 def create_app() -> FastAPI:
@@ -80,6 +132,10 @@ def create_app() -> FastAPI:
     async def health_check():
         return {"status": "healthy"}
 
+    @app.get("/metrics")
+    async def get_metrics(user_data: dict = Depends(require_permission("read:metrics"))):
+        return metrics.snapshot()
+
     return app
 
 
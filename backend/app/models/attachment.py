@@ -1,7 +1,7 @@
 """Attachment-related Pydantic models."""
 
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 
 class AttachmentBase(BaseModel):
@@ -41,6 +41,45 @@ class AttachmentInternal(BaseModel):
 
 
 class PresignedUrlResponse(BaseModel):
-    """Presigned URL response for file uploads."""
+    """Presigned URL response for file uploads.
+
+    Files are stored by content hash, so the key is returned by the upload.
+    """
     uploadUrl: str
-    fileKey: str
\ No newline at end of file
+    fileKey: Optional[str] = None
+
+
+class BlobUploadResponse(BaseModel):
+    """Stored file response (camelCase for API)."""
+    fileKey: str
+    size: int
+
+class UploadSessionCreate(BaseModel):
+    """Resumable upload creation model."""
+    size: int = Field(..., ge=0)
+    contentType: Optional[str] = None
+
+
+class CompressionStats(BaseModel):
+    """Attachment storage per content type (camelCase for API)."""
+    contentType: str
+    attachments: int
+    compressed: int
+    bytes: int
+    storedBytes: int
+    ratio: float
+
+
+class ByteRange(BaseModel):
+    """Received bytes from start up to, not including, end."""
+    start: int
+    end: int
+
+
+class UploadSessionResponse(BaseModel):
+    """Resumable upload response model (camelCase for API)."""
+    uploadId: str
+    size: int
+    receivedBytes: int
+    receivedRanges: List[ByteRange]
+    expiresAt: str
@@ -1,5 +1,6 @@
 """Authentication-related Pydantic models."""
 
+from typing import Optional
 from pydantic import BaseModel, EmailStr
 
 
@@ -24,4 +25,13 @@ class RefreshTokenRequest(BaseModel):
 class RefreshTokenResponse(BaseModel):
     """Refresh token response model."""
     accessToken: str
-    refreshToken: str
\ No newline at end of file
+    refreshToken: str
+
+
+class SessionResponse(BaseModel):
+    """Signed-in session (device) response model."""
+    id: str
+    device: Optional[str] = None
+    createdAt: Optional[str] = None
+    lastUsedAt: Optional[str] = None
+    expiresAt: str
@@ -43,4 +43,13 @@ class RecentActivity(BaseModel):
 class ReportResponse(BaseModel):
     """Generic report response."""
     data: List[Dict[str, Any]]
-    metadata: Dict[str, Any]
\ No newline at end of file
+    metadata: Dict[str, Any]
+
+
+class BoardSnapshot(BaseModel):
+    """Ticket board counts as of a point in time."""
+    asOf: str
+    totalTickets: int
+    ticketsByStatus: List[Dict[str, Any]]
+    ticketsByPriority: List[Dict[str, Any]]
+    ticketsByDepartment: List[Dict[str, Any]]
@@ -1,7 +1,7 @@
 """Ticket-related Pydantic models."""
 
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
 from datetime import datetime
 
@@ -54,6 +54,12 @@ class TicketResponse(TicketBase):
     status: TicketStatus
     createdAt: str
     updatedAt: Optional[str] = None
+    responseDueAt: Optional[str] = None
+    resolutionDueAt: Optional[str] = None
+    # Only filled in on list endpoints when requested with ?include=
+    attachmentCount: Optional[int] = None
+    attachmentBytes: Optional[int] = None
+    commentCount: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -78,4 +84,30 @@ class TicketHistoryEntry(BaseModel):
     action: str
     oldValue: Optional[str] = None
     newValue: Optional[str] = None
-    createdAt: str
\ No newline at end of file
+    createdAt: str
+
+class TicketCommentCreate(BaseModel):
+    """Ticket comment creation model."""
+    content: str = Field(..., min_length=1)
+
+
+class TicketCommentUpdate(BaseModel):
+    """Ticket comment update model."""
+    content: str = Field(..., min_length=1)
+
+
+class TicketCommentResponse(BaseModel):
+    """Ticket comment response model (camelCase for API)."""
+    id: str
+    ticketId: str
+    userId: str
+    authorName: Optional[str] = None
+    content: str
+    createdAt: str
+    updatedAt: Optional[str] = None
+
+
+class TicketCommentPage(BaseModel):
+    """A page of ticket comments; pass nextCursor as cursor for the next one."""
+    items: List[TicketCommentResponse]
+    nextCursor: Optional[str] = None
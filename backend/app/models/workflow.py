@@ -1,6 +1,6 @@
 """Workflow-related Pydantic models."""
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel
 from enum import Enum
 
@@ -10,12 +10,14 @@ class WorkflowTrigger(str, Enum):
     TICKET_CREATED = "ticket_created"
     TICKET_UPDATED = "ticket_updated"
     STATUS_CHANGED = "status_changed"
+    SLA_BREACHED = "sla_breached"
 
 
 class WorkflowAction(str, Enum):
     """Workflow action types."""
     ASSIGN_USER = "assign_user"
     CHANGE_STATUS = "change_status"
+    SET_PRIORITY = "set_priority"
     ADD_COMMENT = "add_comment"
     SEND_NOTIFICATION = "send_notification"
 
@@ -58,4 +60,15 @@ class WorkflowRuleInternal(WorkflowRuleBase):
     """Internal workflow rule model (snake_case)."""
     id: str
     created_at: str
-    updated_at: Optional[str] = None
\ No newline at end of file
+    updated_at: Optional[str] = None
+
+
+class WorkflowApplyResponse(BaseModel):
+    """Result of applying a rule to existing tickets (camelCase for API)."""
+    dryRun: bool
+    matched: int
+    updated: int = 0
+    historyEntries: int = 0
+    comments: int = 0
+    chunks: int = 0
+    skippedActions: List[str] = []
@@ -0,0 +1,98 @@
+"""Attachment management service with database storage."""
+
+from typing import Any, Dict, Iterable, List
+from sqlalchemy.orm import Session
+from fastapi import Depends
+
+from app.core.config import settings
+from app.database.base import get_db
+from app.database.models import Attachment
+from app.database.repositories.attachment_repository import AttachmentRepository
+from app.database.repositories.ticket_repository import TicketRepository
+from app.models.attachment import AttachmentCreate, PresignedUrlResponse
+from app.services.blob_store import blob_store
+from app.services.preview_service import preview_generator, preview_kind
+from app.utils.errors import ErrorCodes, create_http_exception
+
+
+class AttachmentServiceDB:
+    """Attachment records in the database; files live in the local blob store."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.attachment_repo = AttachmentRepository(db)
+        self.ticket_repo = TicketRepository(db)
+
+    def generate_presigned_url(self, filename: str, content_type: str) -> PresignedUrlResponse:
+        """Get the URL to PUT a file's bytes to; the upload returns its file key."""
+        return PresignedUrlResponse(uploadUrl=f"{settings.API_V1_STR}/attachments/blobs")
+
+    def _check_ticket(self, ticket_id: str):
+        if not self.ticket_repo.get_by_id(ticket_id):
+            raise create_http_exception(
+                404,
+                ErrorCodes.E_TICKET_NOT_FOUND,
+                "Ticket not found"
+            )
+
+    def create_attachment(self, attachment_data: AttachmentCreate, uploaded_by_id: str,
+                          file_key: str) -> Attachment:
+        """Create attachment record after successful upload."""
+        self._check_ticket(attachment_data.ticketId)
+        # Marks the file as in use, so a concurrent delete or sweep leaves it alone
+        blob_store.touch(file_key)
+        blob = blob_store.stat(file_key)
+        if blob is None:
+            raise create_http_exception(
+                400,
+                ErrorCodes.E_VALIDATION_ERROR,
+                "No uploaded file has this file key"
+            )
+        attachment = self.attachment_repo.create(
+            attachment_data, uploaded_by_id, file_key, size=blob.size,
+            stored_size=blob.stored_size, content_encoding=blob.encoding)
+        preview_generator.schedule(file_key, preview_kind(attachment.content_type, attachment.filename))
+        return attachment
+
+    def get_attachment(self, attachment_id: str) -> Attachment:
+        """Get attachment by ID."""
+        attachment = self.attachment_repo.get_by_id(attachment_id)
+        if not attachment:
+            raise create_http_exception(
+                404,
+                ErrorCodes.E_ATTACHMENT_NOT_FOUND,
+                "Attachment not found"
+            )
+        return attachment
+
+    def get_ticket_attachments(self, ticket_id: str) -> List[Attachment]:
+        """Get all attachments for a ticket."""
+        self._check_ticket(ticket_id)
+        return self.attachment_repo.get_by_ticket_id(ticket_id)
+
+    def get_attachment_stats(self, ticket_ids: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """Get attachment count and total size per ticket."""
+        return self.attachment_repo.get_stats_by_ticket_ids(ticket_ids)
+
+    def get_compression_stats(self) -> List[Dict[str, Any]]:
+        """Get how well attachments compress at rest, per content type."""
+        return self.attachment_repo.get_compression_stats()
+
+    def delete_attachment(self, attachment_id: str, deleted_by_id: str) -> bool:
+        """Delete attachment, and its file once no attachment refers to it.
+
+        A file uploaded or attached within ATTACHMENT_ORPHAN_GRACE_SECONDS
+        may be about to be attached again (an upload of the same content is
+        deduplicated onto it), so it is left for the orphan sweep instead.
+        """
+        attachment = self.get_attachment(attachment_id)
+        file_key = attachment.file_key
+        self.attachment_repo.delete(attachment_id)
+        if self.attachment_repo.count_by_file_key(file_key) == 0:
+            blob_store.delete_if_idle(file_key, settings.ATTACHMENT_ORPHAN_GRACE_SECONDS)
+        return True
+
+
+def get_attachment_service(db: Session = Depends(get_db)) -> AttachmentServiceDB:
+    """Get attachment service instance."""
+    return AttachmentServiceDB(db)
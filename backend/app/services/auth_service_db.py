@@ -1,18 +1,23 @@
 """Authentication service with database storage."""
 
-from typing import Optional
+import logging
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from fastapi import Depends
 
-from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token
-from app.database.base import get_db
+from app.core.config import settings
+from app.core.revocation import revocation_list
+from app.core.security import get_password_hash, create_access_token, create_refresh_token, password_pool
+from app.database.base import SessionLocal, get_db
 from app.database.repositories.user_repository import UserRepository
 from app.database.repositories.auth_repository import AuthRepository
-from app.database.models import User, UserRole
+from app.database.models import RefreshToken, User, UserRole
 from app.models.auth import LoginResponse
 from app.utils.errors import ErrorCodes, create_http_exception
 from app.utils.events import event_bus, EventTypes
 
+logger = logging.getLogger(__name__)
+
 
 class AuthServiceDB:
     """Authentication service with database storage."""
@@ -22,24 +27,29 @@ class AuthServiceDB:
         self.user_repo = UserRepository(db)
         self.auth_repo = AuthRepository(db)
 
-    def authenticate_user(self, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user by email and password."""
         user = self.user_repo.get_by_email(email)
         if not user or not user.active:
             return None
 
-        if not verify_password(password, user.password_hash):
+        verified, new_hash = await password_pool.verify_and_update(password, user.password_hash)
+        if not verified:
             return None
 
+        # Rehash transparently when the configured bcrypt cost has changed
+        if new_hash:
+            self.user_repo.update_password_hash(user, new_hash)
+
         # Check if user email is verified
         if not user.email_verified:
             return None
 
         return user
 
-    def login(self, email: str, password: str) -> LoginResponse:
+    async def login(self, email: str, password: str, device: Optional[str] = None) -> LoginResponse:
         """Login user and return tokens."""
-        user = self.authenticate_user(email, password)
+        user = await self.authenticate_user(email, password)
         if not user:
             raise create_http_exception(
                 401,
@@ -53,8 +63,8 @@ class AuthServiceDB:
         access_token = create_access_token(token_data)
         refresh_token = create_refresh_token(token_data)
 
-        # Store refresh token in database
-        self.auth_repo.create_refresh_token(str(user.id), refresh_token)
+        # Store refresh token in database as a new session
+        self.auth_repo.create_refresh_token(str(user.id), refresh_token, device)
 
         # Convert to response format (camelCase)
         user_response = {
@@ -99,8 +109,8 @@ class AuthServiceDB:
         new_access_token = create_access_token(token_data)
         new_refresh_token = create_refresh_token(token_data)
 
-        # Update stored refresh token
-        self.auth_repo.create_refresh_token(str(user.id), new_refresh_token)
+        # Rotate the token within the same session
+        self.auth_repo.rotate_refresh_token(db_token, new_refresh_token)
 
         return {
             "accessToken": new_access_token,
@@ -111,9 +121,22 @@ class AuthServiceDB:
         """Get user by ID."""
         return self.user_repo.get_by_id(user_id)
 
-    def logout(self, user_id: str):
-        """Logout user by removing refresh token."""
-        self.auth_repo.delete_refresh_token(user_id)
+    def logout(self, refresh_token: str):
+        """Logout the session holding a refresh token."""
+        self.auth_repo.revoke_refresh_token(refresh_token)
+
+    def get_sessions(self, user_id: str) -> List[RefreshToken]:
+        """Get a user's active sessions."""
+        return self.auth_repo.get_user_sessions(user_id)
+
+    def revoke_session(self, user_id: str, session_id: str):
+        """Revoke one of a user's sessions."""
+        if not self.auth_repo.revoke_session(user_id, session_id):
+            raise create_http_exception(
+                404,
+                ErrorCodes.E_AUTH_TOKEN_INVALID,
+                "Session not found"
+            )
 
     def create_default_admin(self):
         """Create default admin user if it doesn't exist."""
@@ -131,6 +154,21 @@ class AuthServiceDB:
             self.user_repo.create(admin_data, password_hash)
 
 
+def run_refresh_token_sweep():
+    """Delete expired refresh tokens and revocations (background task entry point)."""
+    db = SessionLocal()
+    try:
+        deleted = AuthRepository(db).delete_expired_tokens(settings.REFRESH_TOKEN_SWEEP_BATCH_SIZE)
+        if deleted:
+            logger.info("Deleted %s expired refresh tokens", deleted)
+    finally:
+        db.close()
+
+    deleted = revocation_list.delete_expired()
+    if deleted:
+        logger.info("Deleted %s expired access token revocations", deleted)
+
+
 # Global auth service instance
 def get_auth_service(db: Session = Depends(get_db)) -> AuthServiceDB:
     """Get auth service instance."""
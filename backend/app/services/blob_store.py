@@ -0,0 +1,358 @@
+"""Local content-addressed storage for attachment files.
+
+A blob is stored once under the SHA-256 of its content, at
+``<root>/<aa>/<bb>/<digest>``; the digest is the blob's key. Uploads are
+written chunk by chunk to a temporary file while being hashed, then
+renamed into place, so memory use does not depend on file size and a
+reader never sees a partial blob. Uploading a file that is already stored
+just drops the temporary copy. Files assembled elsewhere under the store
+root (resumable uploads) are moved in with import_file(). Files derived
+from a blob, like previews, live beside it as ``<digest>.<suffix>`` and
+are deleted with it.
+
+A blob's modification time is when it was last stored or touched (attached
+to something), so it can be told apart from a blob that another request is
+about to attach: only blobs idle for a grace period are deleted once
+nothing refers to them.
+
+Compressible content types (text, logs, JSON...) are compressed on the
+way in and stored as ``<digest>.gz`` or ``<digest>.zst``, with the
+uncompressed size in ``<digest>.size``. The key is still the hash of the
+uncompressed content, and reads decompress as they stream.
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import AsyncIterator, Iterator, NamedTuple, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.utils import compression
+from app.utils.errors import ErrorCodes, create_http_exception
+
+logger = logging.getLogger(__name__)
+
+# Bytes buffered before each write, and read per chunk when streaming a blob out
+CHUNK_SIZE = 1024 * 1024
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# Besides text/*, +json and +xml types
+COMPRESSIBLE_TYPES = {
+    "application/json", "application/xml", "application/javascript", "application/x-ndjson",
+    "application/x-yaml", "application/yaml", "application/sql", "application/x-sh",
+    "image/svg+xml",
+}
+
+
+def is_blob_key(key: str) -> bool:
+    """Check whether a string is a well-formed blob key."""
+    return bool(_KEY_PATTERN.match(key or ""))
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """Check whether files of a content type are worth compressing."""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    return (content_type.startswith("text/") or content_type in COMPRESSIBLE_TYPES
+            or content_type.endswith("+json") or content_type.endswith("+xml"))
+
+
+def resolve_compression(name: str) -> Optional[str]:
+    """Get the encoding for the ATTACHMENT_COMPRESSION setting, or None for none."""
+    name = (name or "none").lower()
+    if name == "none":
+        return None
+    if name == "auto":
+        return compression.ZSTD if compression.is_available(compression.ZSTD) else compression.GZIP
+    if not compression.is_available(name):
+        logger.warning("Attachment compression %r is unavailable, using gzip", name)
+        return compression.GZIP
+    return name
+
+
+class BlobInfo(NamedTuple):
+    """How a blob is stored."""
+    path: str
+    size: int
+    stored_size: int
+    encoding: Optional[str]
+
+
+def _write_atomic(path: str, data: bytes):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def _file_into_store(store: "BlobStore", temp_path: str, key: str, size: int,
+                     encoding: Optional[str]):
+    if store.touch(key):
+        # Identical content is already stored
+        os.remove(temp_path)
+        return
+    path = store.path_for(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if encoding is None:
+        os.replace(temp_path, path)
+    else:
+        # The size goes first, so a visible blob always has one
+        _write_atomic(path + ".size", str(size).encode())
+        os.replace(temp_path, path + compression.SUFFIXES[encoding])
+
+
+class BlobWriter:
+    """A blob being written; commit() files it under its content hash."""
+
+    def __init__(self, store: "BlobStore", encoding: Optional[str] = None):
+        self.store = store
+        self.encoding = encoding
+        self.size = 0
+        self._hash = hashlib.sha256()
+        fd, self._temp_path = tempfile.mkstemp(dir=store.temp_dir)
+        self._file = os.fdopen(fd, "wb")
+        self._out = compression.open_writer(self._file, encoding) if encoding else self._file
+
+    def write(self, data: bytes):
+        self._hash.update(data)
+        self._out.write(data)
+        self.size += len(data)
+
+    def commit(self) -> Tuple[str, int]:
+        """Move the written data into the store. Returns (key, size)."""
+        self._out.close()
+        self._file.close()
+        key = self._hash.hexdigest()
+        _file_into_store(self.store, self._temp_path, key, self.size, self.encoding)
+        return key, self.size
+
+    def abort(self):
+        """Discard the written data."""
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+
+class BlobStore:
+    """Content-addressed blobs in a local directory."""
+
+    def __init__(self, root: str, compression_encoding: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.compression = compression_encoding
+        self.temp_dir = os.path.join(self.root, "tmp")
+        self.upload_dir = os.path.join(self.root, "uploads")
+        os.makedirs(self.temp_dir, exist_ok=True)
+        os.makedirs(self.upload_dir, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        """Get the file path of a blob (stored uncompressed)."""
+        if not is_blob_key(key):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def stat(self, key: str) -> Optional[BlobInfo]:
+        """Get how a blob is stored, or None if it is not."""
+        if not is_blob_key(key):
+            return None
+        path = self.path_for(key)
+        try:
+            size = os.path.getsize(path)
+            return BlobInfo(path, size, size, None)
+        except FileNotFoundError:
+            pass
+        for encoding, suffix in compression.SUFFIXES.items():
+            try:
+                stored_size = os.path.getsize(path + suffix)
+                with open(path + ".size", "rb") as f:
+                    size = int(f.read())
+                return BlobInfo(path + suffix, size, stored_size, encoding)
+            except FileNotFoundError:
+                continue
+        return None
+
+    def exists(self, key: str) -> bool:
+        """Check whether a blob is stored."""
+        return self.stat(key) is not None
+
+    def touch(self, key: str) -> bool:
+        """Mark a blob as just used, so it is not deleted as idle. Returns True if it is stored."""
+        info = self.stat(key)
+        if info is None:
+            return False
+        try:
+            os.utime(info.path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def idle_keys(self, min_age_seconds: float) -> Iterator[str]:
+        """Get the keys of blobs not stored or touched within min_age_seconds."""
+        cutoff = time.time() - min_age_seconds
+        suffixes = ("",) + tuple(compression.SUFFIXES.values())
+        for first in os.scandir(self.root):
+            if not first.is_dir() or len(first.name) != 2:
+                continue
+            for second in os.scandir(first.path):
+                if not second.is_dir():
+                    continue
+                for entry in os.scandir(second.path):
+                    key, dot, suffix = entry.name.partition(".")
+                    if not is_blob_key(key) or dot + suffix not in suffixes:
+                        continue
+                    try:
+                        if entry.stat().st_mtime < cutoff:
+                            yield key
+                    except FileNotFoundError:
+                        # Deleted meanwhile
+                        pass
+
+    def delete_if_idle(self, key: str, min_age_seconds: float) -> bool:
+        """Delete a blob unless it was stored or touched within min_age_seconds.
+
+        Returns True if it was deleted.
+        """
+        info = self.stat(key)
+        try:
+            if info is None or os.path.getmtime(info.path) >= time.time() - min_age_seconds:
+                return False
+        except FileNotFoundError:
+            return False
+        return self.delete(key)
+
+    def size(self, key: str) -> int:
+        """Get the uncompressed size of a stored blob in bytes."""
+        info = self.stat(key)
+        if info is None:
+            raise FileNotFoundError(key)
+        return info.size
+
+    def encoding_for(self, content_type: Optional[str]) -> Optional[str]:
+        """Get the encoding new blobs of a content type are stored with."""
+        return self.compression if is_compressible(content_type) else None
+
+    def writer(self, content_type: Optional[str] = None) -> BlobWriter:
+        """Start writing a new blob."""
+        return BlobWriter(self, self.encoding_for(content_type))
+
+    async def save_stream(self, chunks: AsyncIterator[bytes], max_bytes: Optional[int] = None,
+                          content_type: Optional[str] = None) -> Tuple[str, int]:
+        """Store an async stream of bytes, e.g. a request body. Returns (key, size).
+
+        Disk writes (and compression) run in the threadpool, a buffer of
+        CHUNK_SIZE at a time.
+        """
+        writer = await run_in_threadpool(self.writer, content_type)
+        try:
+            buffer = bytearray()
+            received = 0
+            async for chunk in chunks:
+                received += len(chunk)
+                if max_bytes is not None and received > max_bytes:
+                    raise create_http_exception(
+                        413,
+                        ErrorCodes.E_ATTACHMENT_TOO_LARGE,
+                        "Attachment is too large",
+                        {"maxBytes": max_bytes}
+                    )
+                buffer += chunk
+                if len(buffer) >= CHUNK_SIZE:
+                    await run_in_threadpool(writer.write, bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                await run_in_threadpool(writer.write, bytes(buffer))
+            return await run_in_threadpool(writer.commit)
+        except BaseException:
+            await run_in_threadpool(writer.abort)
+            raise
+
+    def import_file(self, path: str, content_type: Optional[str] = None) -> Tuple[str, int]:
+        """Move a file under the store root into the store. Returns (key, size).
+
+        The file is hashed a chunk at a time, then renamed, not copied;
+        compressible files are compressed in the same pass instead.
+        """
+        if self.encoding_for(content_type) is not None:
+            writer = self.writer(content_type)
+            try:
+                with open(path, "rb") as f:
+                    for data in iter(lambda: f.read(CHUNK_SIZE), b""):
+                        writer.write(data)
+                result = writer.commit()
+            except BaseException:
+                writer.abort()
+                raise
+            os.remove(path)
+            return result
+
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            for data in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(data)
+                size += len(data)
+        key = digest.hexdigest()
+        _file_into_store(self, path, key, size, None)
+        return key, size
+
+    def sweep_temp(self, max_age_seconds: float) -> int:
+        """Delete temporary files left by interrupted writes. Returns the number deleted."""
+        cutoff = time.time() - max_age_seconds
+        deleted = 0
+        for entry in os.scandir(self.temp_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                    deleted += 1
+                except FileNotFoundError:
+                    pass
+        return deleted
+
+    def iter_range(self, key: str, start: int, length: int) -> Iterator[bytes]:
+        """Read length uncompressed bytes of a blob from start, a chunk at a time.
+
+        Compressed blobs are decompressed from the beginning, discarding
+        the bytes before start.
+        """
+        info = self.stat(key)
+        if info is None:
+            raise FileNotFoundError(key)
+        with open(info.path, "rb") as f:
+            reader = compression.open_reader(f, info.encoding)
+            if info.encoding is None:
+                f.seek(start)
+            else:
+                while start > 0:
+                    skipped = len(reader.read(min(CHUNK_SIZE, start)))
+                    if not skipped:
+                        return
+                    start -= skipped
+            while length > 0:
+                data = reader.read(min(CHUNK_SIZE, length))
+                if not data:
+                    break
+                length -= len(data)
+                yield data
+
+    def delete(self, key: str) -> bool:
+        """Delete a blob and the files derived from it. Returns True if it was stored."""
+        if not is_blob_key(key):
+            return False
+        stored = self.exists(key)
+        path = self.path_for(key)
+        for derived in glob.glob(glob.escape(path) + ".*") + [path]:
+            try:
+                os.remove(derived)
+            except FileNotFoundError:
+                pass
+        return stored
+
+
+# Blob store shared by the attachment endpoints
+blob_store = BlobStore(settings.ATTACHMENT_STORAGE_DIR,
+                       resolve_compression(settings.ATTACHMENT_COMPRESSION))
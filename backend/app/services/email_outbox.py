@@ -0,0 +1,181 @@
+"""Background delivery of queued email.
+
+Requests only write rows to ``email_outbox``. A periodic task drains due
+rows through a single SMTP connection that is kept open and reused between
+messages, retrying failures with exponential backoff.
+"""
+
+import logging
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from email.mime.text import MIMEText
+from typing import Optional
+
+from app.core.config import settings
+from app.database.base import SessionLocal
+from app.database.repositories.email_outbox_repository import EmailOutboxRepository
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPTransport:
+    """Persistent SMTP connection, reconnecting when the server drops it."""
+
+    def __init__(self, host: str, port: int, username: str = "", password: str = "",
+                 use_tls: bool = True, timeout: float = 30, max_idle_seconds: float = 60):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_idle_seconds = max_idle_seconds
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        smtp.ehlo()
+        if self.use_tls and smtp.has_extn("starttls"):
+            smtp.starttls()
+            smtp.ehlo()
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        metrics.increment("smtp_connections_opened")
+        return smtp
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is not None and time.monotonic() - self._last_used > self.max_idle_seconds:
+            # Servers drop idle clients; probe before reusing
+            try:
+                self._smtp.noop()
+            except smtplib.SMTPException:
+                self._discard()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def _discard(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.close()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def send(self, sender: str, recipient: str, message: str):
+        """Send one message, reconnecting once if the connection went away."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    self._connection().sendmail(sender, [recipient], message)
+                    self._last_used = time.monotonic()
+                    return
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    self._discard()
+                    if attempt:
+                        raise
+
+    def close(self):
+        """Close the connection politely."""
+        with self._lock:
+            if self._smtp is not None:
+                try:
+                    self._smtp.quit()
+                except Exception:
+                    pass
+                self._smtp = None
+
+
+class ConsoleTransport:
+    """Prints messages instead of sending them, for development without SMTP."""
+
+    def send(self, sender: str, recipient: str, message: str):
+        print(f"\n📧 EMAIL (Console Mode)\nTo: {recipient}\n{message}\n")
+
+    def close(self):
+        pass
+
+
+class EmailOutboxSender:
+    """Drains the email outbox through a transport."""
+
+    def __init__(self, transport, session_factory=SessionLocal, batch_size: int = 50,
+                 max_attempts: int = 8, backoff_seconds: float = 30,
+                 max_backoff_seconds: float = 3600, lease_seconds: float = 120):
+        self.transport = transport
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.lease_seconds = lease_seconds
+
+    def _format(self, message) -> str:
+        mime = MIMEText(message.body, "plain")
+        mime["From"] = f"{settings.FROM_NAME} <{settings.FROM_EMAIL}>"
+        mime["To"] = message.recipient
+        mime["Subject"] = message.subject
+        return mime.as_string()
+
+    def _retry_at(self, attempts: int) -> Optional[datetime]:
+        if attempts >= self.max_attempts:
+            return None
+        delay = min(self.backoff_seconds * 2 ** (attempts - 1), self.max_backoff_seconds)
+        return datetime.utcnow() + timedelta(seconds=delay)
+
+    def drain(self) -> int:
+        """Send every due email. Returns the number sent."""
+        sent = 0
+        db = self.session_factory()
+        try:
+            repo = EmailOutboxRepository(db)
+            while True:
+                due = repo.get_due(self.batch_size)
+                claimed = 0
+                for message in due:
+                    if not repo.claim(message, self.lease_seconds):
+                        continue
+                    claimed += 1
+                    try:
+                        self.transport.send(settings.FROM_EMAIL, message.recipient, self._format(message))
+                    except Exception as e:
+                        retry_at = self._retry_at(message.attempts)
+                        repo.mark_failed(message, str(e), retry_at)
+                        metrics.increment("email_send_failures")
+                        logger.warning("Email %s to %s failed (attempt %s): %s",
+                                       message.id, message.recipient, message.attempts, e)
+                        continue
+                    repo.mark_sent(message)
+                    metrics.increment("emails_sent")
+                    sent += 1
+
+                if not claimed:
+                    return sent
+        finally:
+            db.close()
+
+    def close(self):
+        """Release the transport's connection."""
+        self.transport.close()
+
+
+def build_transport():
+    """Get the transport for the configured SMTP settings."""
+    if not (settings.SMTP_USERNAME and settings.SMTP_PASSWORD):
+        return ConsoleTransport()
+    return SMTPTransport(settings.SMTP_SERVER, settings.SMTP_PORT,
+                         settings.SMTP_USERNAME, settings.SMTP_PASSWORD,
+                         use_tls=settings.SMTP_USE_TLS)
+
+
+# Outbox sender run by the background task registry
+email_outbox_sender = EmailOutboxSender(
+    build_transport(),
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+)
@@ -1,43 +1,16 @@
 """Email service for sending verification emails."""
 
-import smtplib
 import random
 import string
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Optional
 from datetime import datetime, timedelta
 
-from app.core.config import settings
+from sqlalchemy.orm import Session
 
+from app.database.repositories.email_outbox_repository import EmailOutboxRepository
 
-class EmailService:
-    """Email service for sending verification emails."""
-
-    def __init__(self):
-        # For demo purposes, we'll use a mock email service
-        # In production, you would configure SMTP settings
-        self.smtp_server = getattr(settings, 'SMTP_SERVER', 'smtp.gmail.com')
-        self.smtp_port = getattr(settings, 'SMTP_PORT', 587)
-        self.smtp_username = getattr(settings, 'SMTP_USERNAME', '')
-        self.smtp_password = getattr(settings, 'SMTP_PASSWORD', '')
-        self.from_email = getattr(
-            settings, 'FROM_EMAIL', 'noreply@ticketflow.com')
+VERIFICATION_SUBJECT = "Verify your TicketFlow account"
 
-    def generate_otp(self, length: int = 6) -> str:
-        """Generate a random OTP."""
-        return ''.join(random.choices(string.digits, k=length))
-
-    def send_verification_email(self, email: str, otp: str, name: str) -> bool:
-        """Send verification email with OTP."""
-        try:
-            # Create email message
-            msg = MIMEMultipart()
-            msg['From'] = f"{getattr(settings, 'FROM_NAME', 'Ticket')} <{self.from_email}>"
-            msg['To'] = email
-            msg['Subject'] = "Verify your TicketFlow account"
-
-            body = f"""
+VERIFICATION_BODY = """
 Hi {name},
 
 Welcome to TicketFlow! Please verify your email address by entering the following code:
@@ -52,39 +25,29 @@ Best regards,
 The TicketFlow Team
 """
 
-            msg.attach(MIMEText(body, 'plain'))
-
-            # Send email via SMTP
-            if self.smtp_username and self.smtp_password:
-                print(f"\n📧 Sending verification email to: {email}")
-                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                text = msg.as_string()
-                server.sendmail(self.from_email, email, text)
-                server.quit()
-                print(f"✅ Email sent successfully!\n")
-            else:
-                # Fallback to console logging if SMTP not configured
-                print(f"\n📧 EMAIL VERIFICATION (Console Mode)")
-                print(f"To: {email}")
-                print(f"Name: {name}")
-                print(f"OTP: {otp}")
-                print(f"Subject: Verify your TicketFlow account")
-                print(f"Body: Hi {name}, your verification code is: {otp}")
-                print(f"This code will expire in 10 minutes.\n")
-
-            return True
-
-        except Exception as e:
-            print(f"❌ Failed to send email: {str(e)}")
-            # Fallback to console logging on error
-            print(f"\n📧 EMAIL VERIFICATION (Fallback - Console Mode)")
-            print(f"To: {email}")
-            print(f"Name: {name}")
-            print(f"OTP: {otp}")
-            print(f"This code will expire in 10 minutes.\n")
-            return True  # Return True so registration can continue
+
+class EmailService:
+    """Email service for sending verification emails.
+
+    Emails are queued in the outbox within the caller's session and
+    delivered by the background sender in app.services.email_outbox.
+    """
+
+    def generate_otp(self, length: int = 6) -> str:
+        """Generate a random OTP."""
+        return ''.join(random.choices(string.digits, k=length))
+
+    def queue_email(self, db: Session, recipient: str, subject: str, body: str,
+                    commit: bool = True) -> bool:
+        """Queue an email for background delivery."""
+        EmailOutboxRepository(db).enqueue(recipient, subject, body, commit=commit)
+        return True
+
+    def send_verification_email(self, db: Session, email: str, otp: str, name: str,
+                                commit: bool = True) -> bool:
+        """Queue verification email with OTP."""
+        return self.queue_email(db, email, VERIFICATION_SUBJECT,
+                                VERIFICATION_BODY.format(name=name, otp=otp), commit=commit)
 
     def get_otp_expiry_time(self) -> datetime:
         """Get OTP expiry time (10 minutes from now)."""
@@ -0,0 +1,172 @@
+"""Relay of outbox events to the event bus and durable consumers.
+
+Services record events in ``event_outbox`` in the same transaction as the
+change they describe, so an event exists exactly when its change does. The
+relay publishes new rows to the in-process event bus in id order, in
+batches. Its position is stored as the ``event-bus`` consumer offset and
+is moved with a compare-and-set only after a batch is published, so
+delivery is at-least-once: a worker that dies mid-batch leaves the batch
+to be published again, and workers racing on the same batch may both
+publish it. Listeners must tolerate duplicates (workflow actions are
+deduplicated by their idempotency keys). Events the bus holds back for
+coalescing are flushed at the end of each batch, before the offset
+moves, so merging never spans batches.
+
+Ids are taken when an event is inserted, not when it commits, so on
+Postgres a later id can become visible before an earlier one. Offsets
+only move past a missing id once the event after it is older than
+EVENT_RELAY_GAP_GRACE_SECONDS; by then the transaction holding the id
+has committed or rolled back.
+
+Durable consumers (projections such as counters or feeds) register a
+handler and keep their own offset. Resetting a consumer's offset replays
+the log to it from that point.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.database.base import SessionLocal
+from app.database.models import EventOutbox
+from app.database.repositories.event_repository import EventOutboxRepository
+from app.utils.events import event_bus
+from app.utils.metrics import metrics
+from app.utils.timestamps import as_naive_utc
+
+logger = logging.getLogger(__name__)
+
+# Offset name of the live event bus relay
+BUS_CONSUMER = "event-bus"
+
+
+def to_event(row: EventOutbox) -> Dict[str, Any]:
+    """Convert an outbox row to the event dict listeners receive."""
+    return {
+        "id": row.id,
+        "type": row.event_type,
+        "timestamp": row.created_at.isoformat(),
+        "data": row.payload
+    }
+
+
+class EventRelay:
+    """Publishes outbox events and feeds durable consumers."""
+
+    def __init__(self, bus=event_bus, session_factory=SessionLocal, batch_size: int = 200,
+                 gap_grace_seconds: float = 60):
+        self.bus = bus
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.gap_grace_seconds = gap_grace_seconds
+        self.consumers: Dict[str, Callable[[List[Dict[str, Any]]], None]] = {}
+        self._lock = threading.Lock()
+
+    def register_consumer(self, name: str, handler: Callable[[List[Dict[str, Any]]], None]):
+        """Register a durable consumer called with batches of events in order."""
+        self.consumers[name] = handler
+
+    def relay(self) -> int:
+        """Publish new events and catch up every durable consumer.
+
+        Returns the number of events published to the bus.
+        """
+        # Another thread is already relaying; it will pick up anything new
+        if not self._lock.acquire(blocking=False):
+            return 0
+        try:
+            published = self._publish_pending()
+            for name, handler in list(self.consumers.items()):
+                try:
+                    self.replay(name, handler)
+                except Exception as e:
+                    logger.error("Event consumer %s failed: %s", name, e)
+            return published
+        finally:
+            self._lock.release()
+
+    def _ready(self, offset: int, rows: List[EventOutbox]) -> List[EventOutbox]:
+        """Get the leading rows after offset that can be delivered without skipping a pending id."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.gap_grace_seconds)
+        ready = []
+        expected = offset + 1
+        for row in rows:
+            if row.id != expected and as_naive_utc(row.created_at) > cutoff:
+                # An earlier id may still commit; wait for it
+                break
+            ready.append(row)
+            expected = row.id + 1
+        return ready
+
+    def _publish_pending(self) -> int:
+        published = 0
+        db = self.session_factory()
+        try:
+            repo = EventOutboxRepository(db)
+            while True:
+                offset = repo.get_offset(BUS_CONSUMER)
+                rows = self._ready(offset, repo.get_after(offset, self.batch_size))
+                if not rows:
+                    return published
+                events = [to_event(row) for row in rows]
+                for event in events:
+                    self.bus.publish(event["type"], event["data"],
+                                     timestamp=event["timestamp"], event_id=event["id"])
+                # Events held for coalescing exist only in memory; deliver them
+                # before the offset moves past them
+                self.bus.flush_coalesced()
+                published += len(events)
+                # Only once published, so a batch is never lost; if another worker
+                # moved the offset meanwhile, it published this batch too
+                repo.advance_offset(BUS_CONSUMER, offset, rows[-1].id)
+                metrics.increment("events_relayed", len(events))
+                metrics.set_gauge("event_relay_offset", rows[-1].id)
+        finally:
+            db.close()
+
+    def replay(self, consumer: str, handler: Callable[[List[Dict[str, Any]]], None],
+               from_event_id: Optional[int] = None) -> int:
+        """Feed events after a consumer's offset (or from_event_id) to handler.
+
+        The offset is saved after each batch the handler accepts, so a
+        failing handler resumes from the batch that failed. Returns the
+        number of events delivered.
+        """
+        delivered = 0
+        db = self.session_factory()
+        try:
+            repo = EventOutboxRepository(db)
+            offset = repo.get_offset(consumer) if from_event_id is None else from_event_id
+            while True:
+                rows = self._ready(offset, repo.get_after(offset, self.batch_size))
+                if not rows:
+                    return delivered
+                handler([to_event(row) for row in rows])
+                offset = rows[-1].id
+                repo.set_offset(consumer, offset)
+                delivered += len(rows)
+        finally:
+            db.close()
+
+    def reset_consumer(self, consumer: str, event_id: int = 0):
+        """Move a consumer's offset so the next relay replays everything after event_id."""
+        db = self.session_factory()
+        try:
+            EventOutboxRepository(db).set_offset(consumer, event_id)
+        finally:
+            db.close()
+
+    def get_offset(self, consumer: str) -> int:
+        """Get a consumer's last processed event id."""
+        db = self.session_factory()
+        try:
+            return EventOutboxRepository(db).get_offset(consumer)
+        finally:
+            db.close()
+
+
+# Relay run by the background task registry
+event_relay = EventRelay(batch_size=settings.EVENT_RELAY_BATCH_SIZE,
+                         gap_grace_seconds=settings.EVENT_RELAY_GAP_GRACE_SECONDS)
@@ -0,0 +1,150 @@
+"""Ticket notification digests.
+
+Ticket events are folded into one small entry per (recipient, ticket), no
+matter how many events arrive, and each window every recipient with
+entries gets a single combined email through the outbox. SMTP volume
+therefore grows with recipients rather than with events.
+"""
+
+import logging
+import threading
+from string import Template
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.database.base import SessionLocal
+from app.database.models import User
+from app.database.repositories.email_outbox_repository import EmailOutboxRepository
+from app.utils.events import event_bus, EventTypes
+
+logger = logging.getLogger(__name__)
+
+# Templates are compiled once at import and only substituted per digest
+SUBJECT_TEMPLATE = Template("TicketFlow: updates on $count ticket$plural")
+GREETING_TEMPLATE = Template("Hi $name,\n\nHere is what changed on your tickets:\n")
+CREATED_LINE_TEMPLATE = Template("- $key: created")
+UPDATED_LINE_TEMPLATE = Template("- $key: $updates update$plural to $fields")
+STATUS_SUFFIX_TEMPLATE = Template(" (status is now $status)")
+FOOTER = "\nBest regards,\nThe TicketFlow Team\n"
+
+
+class DigestEntry:
+    """Everything a recipient needs to hear about one ticket in a window."""
+
+    __slots__ = ("key", "created", "updates", "fields", "status")
+
+    def __init__(self, key: str):
+        self.key = key
+        self.created = False
+        self.updates = 0
+        self.fields: Set[str] = set()
+        self.status: Optional[str] = None
+
+
+def render_digest(name: str, entries: Iterable[DigestEntry]) -> Tuple[str, str]:
+    """Render the subject and body of a digest email."""
+    entries = sorted(entries, key=lambda entry: entry.key)
+    lines = [GREETING_TEMPLATE.substitute(name=name)]
+    for entry in entries:
+        if entry.created:
+            lines.append(CREATED_LINE_TEMPLATE.substitute(key=entry.key))
+        if entry.updates:
+            line = UPDATED_LINE_TEMPLATE.substitute(
+                key=entry.key,
+                updates=entry.updates,
+                plural="" if entry.updates == 1 else "s",
+                fields=", ".join(sorted(entry.fields))
+            )
+            if entry.status:
+                line += STATUS_SUFFIX_TEMPLATE.substitute(status=entry.status)
+            lines.append(line)
+    lines.append(FOOTER)
+
+    subject = SUBJECT_TEMPLATE.substitute(count=len(entries), plural="" if len(entries) == 1 else "s")
+    return subject, "\n".join(lines)
+
+
+class NotificationDigestService:
+    """Collects ticket events per recipient and flushes them as digests."""
+
+    def __init__(self, bus=event_bus, session_factory=SessionLocal):
+        self.bus = bus
+        self.session_factory = session_factory
+        self._pending: Dict[str, Dict[str, DigestEntry]] = {}
+        self._lock = threading.Lock()
+        self._setup_event_listeners()
+
+    def _setup_event_listeners(self):
+        """Setup event listeners for notification events."""
+        self.bus.subscribe(EventTypes.TICKET_CREATED, self._handle_ticket_events, batch=True)
+        self.bus.subscribe(EventTypes.TICKET_UPDATED, self._handle_ticket_events, batch=True)
+
+    @staticmethod
+    def _recipients(data: Dict, actor_id: Optional[str]) -> Set[str]:
+        recipients = set(data.get("assignee_ids") or [])
+        if data.get("reporter_id"):
+            recipients.add(data["reporter_id"])
+        recipients.discard(actor_id)
+        return recipients
+
+    def _entries(self, recipients: Set[str], ticket_id: str, key: str):
+        for recipient in recipients:
+            tickets = self._pending.setdefault(recipient, {})
+            entry = tickets.get(ticket_id)
+            if entry is None:
+                entry = tickets[ticket_id] = DigestEntry(key)
+            yield entry
+
+    def _handle_ticket_events(self, events: List[Dict]):
+        """Fold a batch of ticket events into the pending digests under one lock."""
+        with self._lock:
+            for event_data in events:
+                if event_data["type"] == EventTypes.TICKET_CREATED:
+                    self._fold_created(event_data["data"])
+                else:
+                    self._fold_updated(event_data["data"])
+
+    def _fold_created(self, data: Dict):
+        recipients = self._recipients(data, data.get("reporter_id"))
+        for entry in self._entries(recipients, data["ticket_id"], data.get("ticket_key", "")):
+            entry.created = True
+
+    def _fold_updated(self, data: Dict):
+        recipients = self._recipients(data, data.get("updated_by"))
+        changes = data.get("changes", [])
+        status = next((c["new"] for c in changes if c["field"] == "status"), None)
+        for entry in self._entries(recipients, data["ticket_id"], data.get("ticket_key", "")):
+            entry.updates += 1
+            entry.fields.update(change["field"] for change in changes)
+            if status:
+                entry.status = status
+
+    def pending_recipients(self) -> int:
+        """Get the number of recipients with an unsent digest."""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Queue one digest email per recipient. Returns the number queued."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        db = self.session_factory()
+        try:
+            users = db.query(User.id, User.name, User.email).filter(
+                User.id.in_(list(pending)), User.active == True
+            ).all()
+            outbox = EmailOutboxRepository(db)
+            for user_id, name, email in users:
+                subject, body = render_digest(name, pending[str(user_id)].values())
+                outbox.enqueue(email, subject, body)
+        finally:
+            db.close()
+
+        logger.info("Queued %s notification digests", len(users))
+        return len(users)
+
+
+# Global notification digest service instance
+notification_digest_service = NotificationDigestService()
@@ -0,0 +1,142 @@
+"""Attachment previews: image thumbnails and the head of text files.
+
+Previews are rendered in a process pool, never on the event loop, and
+cached next to the blob they are made from (``<blob>.thumb.png``,
+``<blob>.head.txt``). Blobs are keyed by content hash, so a preview is
+made once per distinct file and deleted with its blob. Rendering starts
+when an attachment is created; a request for a preview that is still
+being rendered waits for the same job.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.services.blob_store import BlobStore, blob_store
+from app.utils import previews
+from app.utils.errors import ErrorCodes, create_http_exception
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+IMAGE = "image"
+TEXT = "text"
+
+PREVIEW_SUFFIXES = {IMAGE: ".thumb.png", TEXT: ".head.txt"}
+PREVIEW_MEDIA_TYPES = {IMAGE: "image/png", TEXT: "text/plain; charset=utf-8"}
+
+_TEXT_TYPES = {"application/json", "application/xml", "application/x-ndjson", "application/x-yaml"}
+_TEXT_EXTENSIONS = {".txt", ".log", ".csv", ".md", ".json", ".xml", ".yaml", ".yml", ".ini", ".conf"}
+
+
+def preview_kind(content_type: str, filename: str) -> Optional[str]:
+    """Get the kind of preview a file can have, or None."""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in previews.IMAGE_TYPES:
+        return IMAGE if previews.Image is not None else None
+    if content_type.startswith("text/") or content_type in _TEXT_TYPES:
+        return TEXT
+    if os.path.splitext(filename or "")[1].lower() in _TEXT_EXTENSIONS:
+        return TEXT
+    return None
+
+
+class PreviewGenerator:
+    """Renders previews in worker processes and caches them beside the blob."""
+
+    def __init__(self, store: BlobStore, max_workers: int):
+        self.store = store
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str, kind: str) -> str:
+        """Get the file path of a blob's cached preview."""
+        return self.store.path_for(key) + PREVIEW_SUFFIXES[kind]
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned, not forked: the API process runs threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def _render_args(self, key: str, kind: str):
+        blob = self.store.stat(key)
+        if blob is None:
+            raise FileNotFoundError(key)
+        dest = self.path_for(key, kind)
+        if kind == IMAGE:
+            return (previews.render_thumbnail, blob.path, dest, settings.PREVIEW_IMAGE_SIZE,
+                    blob.encoding)
+        return (previews.render_text_head, blob.path, dest,
+                settings.PREVIEW_TEXT_BYTES, settings.PREVIEW_TEXT_LINES, blob.encoding)
+
+    def _submit(self, key: str, kind: str) -> Future:
+        dest = self.path_for(key, kind)
+        with self._lock:
+            future = self._pending.get(dest)
+            if future is not None:
+                return future
+            func, *args = self._render_args(key, kind)
+            try:
+                future = self._get_executor().submit(func, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory on a huge image); start afresh
+                self._executor = None
+                future = self._get_executor().submit(func, *args)
+            self._pending[dest] = future
+        future.add_done_callback(lambda done: self._finished(dest, done))
+        return future
+
+    def _finished(self, dest: str, future: Future):
+        with self._lock:
+            self._pending.pop(dest, None)
+        if future.cancelled():
+            return
+        if future.exception() is None:
+            metrics.increment("previews_rendered")
+        else:
+            metrics.increment("preview_failures")
+            logger.warning("Preview %s failed: %s", dest, future.exception())
+
+    def schedule(self, key: str, kind: Optional[str]):
+        """Start rendering a blob's preview unless it is cached."""
+        if kind and not os.path.exists(self.path_for(key, kind)):
+            self._submit(key, kind)
+
+    async def get(self, key: str, kind: str) -> str:
+        """Get the path of a blob's preview, rendering it first if needed."""
+        path = self.path_for(key, kind)
+        if os.path.exists(path):
+            metrics.increment("preview_cache_hits")
+            return path
+        try:
+            await asyncio.wrap_future(self._submit(key, kind))
+        except Exception as e:
+            raise create_http_exception(
+                422,
+                ErrorCodes.E_PREVIEW_UNAVAILABLE,
+                "Preview could not be generated",
+                {"error": str(e)}
+            )
+        return path
+
+    def shutdown(self):
+        """Stop the worker processes, letting started renders finish."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        # Outside the lock: the pool's done-callbacks (_finished) take it
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Preview pool shared by the attachment endpoints
+preview_generator = PreviewGenerator(blob_store, settings.PREVIEW_WORKERS)
@@ -0,0 +1,196 @@
+"""Ticket SLA deadlines and breach escalation.
+
+Each ticket gets a response deadline (it must leave "open") and a
+resolution deadline (it must be closed), set from its priority when it is
+created and moved when its status or priority changes. ``sla_due_at``
+holds the earliest deadline not yet escalated.
+
+Pending deadlines live in an in-process timer wheel, loaded at startup
+from the ``(sla_due_at, id)`` index and kept current from ticket events,
+so finding breaches never reads the tickets table. When a timer fires the
+ticket is loaded by primary key and ``sla_due_at`` is moved on with a
+compare-and-set, so each breach is escalated once even though every worker
+rehydrates every timer. Escalations are ``ticket.sla_breached`` events
+recorded in the outbox, which workflow rules can trigger on.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.database.base import SessionLocal
+from app.database.models import Ticket, TicketStatus
+from app.database.repositories.event_repository import EventOutboxRepository
+from app.utils.events import EventTypes, event_bus
+from app.utils.metrics import metrics
+from app.utils.timer_wheel import TimerWheel
+from app.utils.timestamps import as_naive_utc
+
+logger = logging.getLogger(__name__)
+
+
+def _targets(priority) -> Dict[str, timedelta]:
+    return {
+        "response": timedelta(minutes=settings.SLA_RESPONSE_MINUTES[priority.value]),
+        "resolution": timedelta(minutes=settings.SLA_RESOLUTION_MINUTES[priority.value]),
+    }
+
+
+def _deadlines(ticket: Ticket) -> Dict[str, Optional[datetime]]:
+    return {"response": as_naive_utc(ticket.response_due_at),
+            "resolution": as_naive_utc(ticket.resolution_due_at)}
+
+
+def _earliest(ticket: Ticket, not_before: datetime) -> Optional[datetime]:
+    return min((due for due in _deadlines(ticket).values() if due is not None and due >= not_before),
+               default=None)
+
+
+def set_deadlines(ticket: Ticket, now: datetime):
+    """Set a new ticket's deadlines from its priority."""
+    targets = _targets(ticket.priority)
+    ticket.response_due_at = now + targets["response"]
+    ticket.resolution_due_at = now + targets["resolution"]
+    ticket.sla_due_at = _earliest(ticket, now)
+
+
+def update_deadlines(ticket: Ticket, old_status: TicketStatus, priority_changed: bool, now: datetime):
+    """Move a ticket's deadlines after a status or priority change.
+
+    Leaving "open" meets the response deadline and closing meets the
+    resolution deadline; reopening a closed ticket starts a new resolution
+    deadline. A priority change re-targets the deadlines still pending from
+    when they started. Deadlines already escalated are not escalated again.
+    """
+    sla_due_at = as_naive_utc(ticket.sla_due_at)
+    pending_from = min(sla_due_at, now) if sla_due_at else now
+    targets = _targets(ticket.priority)
+    if priority_changed:
+        created_at = as_naive_utc(ticket.created_at) or now
+        if ticket.response_due_at is not None:
+            ticket.response_due_at = created_at + targets["response"]
+        if ticket.resolution_due_at is not None:
+            ticket.resolution_due_at = created_at + targets["resolution"]
+
+    if ticket.status != TicketStatus.OPEN:
+        ticket.response_due_at = None
+    if ticket.status == TicketStatus.CLOSED:
+        ticket.resolution_due_at = None
+    elif old_status == TicketStatus.CLOSED:
+        ticket.resolution_due_at = now + targets["resolution"]
+        pending_from = min(pending_from, ticket.resolution_due_at)
+    ticket.sla_due_at = _earliest(ticket, pending_from)
+
+
+def _epoch(value: datetime) -> float:
+    """Seconds since the epoch of a timestamp, naive ones being UTC as stored."""
+    return as_naive_utc(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _parse(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class SlaScheduler:
+    """This worker's timers for pending SLA deadlines."""
+
+    def __init__(self, session_factory=SessionLocal, tick: float = 1.0):
+        self.session_factory = session_factory
+        self.wheel = TimerWheel(tick=tick)
+
+    def stats(self) -> Dict[str, int]:
+        """Pending timer count for the metrics endpoint."""
+        return {"pending_timers": len(self.wheel)}
+
+    def rehydrate(self) -> int:
+        """Load every pending deadline into the wheel. Returns the number loaded."""
+        db = self.session_factory()
+        try:
+            # Only reads the (sla_due_at, id) index
+            rows = db.query(Ticket.sla_due_at, Ticket.id).filter(Ticket.sla_due_at.isnot(None)).all()
+        finally:
+            db.close()
+        for due, ticket_id in rows:
+            self.wheel.schedule(ticket_id, _epoch(due))
+        logger.info("Loaded %s SLA timers", len(rows))
+        return len(rows)
+
+    def schedule(self, ticket_id: str, due: Optional[datetime]):
+        """Set or clear the timer of a ticket's next deadline."""
+        if due is None:
+            self.wheel.cancel(ticket_id)
+        else:
+            self.wheel.schedule(ticket_id, _epoch(due))
+
+    def handle_ticket_event(self, event_data: Dict):
+        """Keep the timer of a created or updated ticket current."""
+        data = event_data["data"]
+        if "sla_due_at" in data:
+            self.schedule(data["ticket_id"], _parse(data["sla_due_at"]))
+
+    def fire_due(self, now: Optional[float] = None) -> int:
+        """Escalate every deadline due by now. Returns the number of breaches escalated."""
+        fired = self.wheel.advance(now)
+        if not fired:
+            return 0
+
+        escalated = 0
+        db = self.session_factory()
+        try:
+            for ticket_id, _ in fired:
+                try:
+                    escalated += self._escalate(db, ticket_id)
+                except Exception as e:
+                    db.rollback()
+                    logger.error("SLA escalation of ticket %s failed: %s", ticket_id, e)
+        finally:
+            db.close()
+        metrics.increment("sla_breaches_escalated", escalated)
+        return escalated
+
+    def _escalate(self, db, ticket_id: str) -> int:
+        ticket = db.get(Ticket, ticket_id)
+        now = datetime.utcnow()
+        if ticket is None or ticket.sla_due_at is None:
+            return 0
+        due = as_naive_utc(ticket.sla_due_at)
+        if due > now:
+            # The deadline moved later (possibly in another worker); follow it
+            self.schedule(ticket_id, due)
+            return 0
+
+        breached = [kind for kind, deadline in _deadlines(ticket).items() if deadline == due]
+        next_due = min((d for d in _deadlines(ticket).values() if d is not None and d > due), default=None)
+        claimed = db.query(Ticket).filter(Ticket.id == ticket_id,
+                                          Ticket.sla_due_at == ticket.sla_due_at).update(
+            {"sla_due_at": next_due, "updated_at": Ticket.updated_at}, synchronize_session=False)
+        if not claimed:
+            # Another worker escalated it first
+            db.rollback()
+            return 0
+
+        events = EventOutboxRepository(db)
+        for kind in breached:
+            events.record(EventTypes.TICKET_SLA_BREACHED, {
+                "ticket_id": ticket_id,
+                "ticket_key": ticket.key,
+                "sla": kind,
+                "due_at": due.isoformat(),
+                "reporter_id": str(ticket.reporter_id),
+                "assignee_ids": [str(a.id) for a in ticket.assignees],
+                "department": ticket.department,
+                "priority": ticket.priority.value,
+                "status": ticket.status.value
+            })
+        db.commit()
+        self.schedule(ticket_id, next_due)
+        logger.info("Ticket %s breached its %s SLA", ticket.key, "/".join(breached))
+        return len(breached)
+
+
+# SLA timers of this worker
+sla_scheduler = SlaScheduler(tick=settings.SLA_TICK_SECONDS)
+metrics.register_collector("sla_timers", sla_scheduler.stats)
+event_bus.subscribe(EventTypes.TICKET_CREATED, sla_scheduler.handle_ticket_event)
+event_bus.subscribe(EventTypes.TICKET_UPDATED, sla_scheduler.handle_ticket_event)
@@ -1,17 +1,45 @@
 """Ticket management service with database storage."""
 
-from typing import List, Optional, Dict, Any
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from fastapi import Depends
 
 from app.core.config import settings
 from app.database.base import get_db
-from app.database.repositories.ticket_repository import TicketRepository, TicketHistoryRepository
+from app.database.repositories.ticket_repository import (
+    TicketRepository, TicketHistoryRepository, TicketSnapshotRepository, TicketCommentRepository
+)
 from app.database.repositories.user_repository import UserRepository
-from app.database.models import Ticket, TicketHistory, TicketStatus
-from app.models.ticket import TicketCreate, TicketUpdate
+from app.database.repositories.event_repository import EventOutboxRepository
+from app.database.repositories.attachment_repository import AttachmentRepository
+from app.database.models import Ticket, TicketComment, TicketHistory, TicketHistoryAction, TicketStatus, User
+from app.models.ticket import TicketCreate, TicketUpdate, TicketInternal
 from app.utils.errors import ErrorCodes, create_http_exception
-from app.utils.events import event_bus, EventTypes
+from app.services.sla_service import set_deadlines, update_deadlines
+from app.utils.events import EventTypes
+from app.utils.timestamps import as_naive_utc
+
+
+# Ticket state field changed by each history action
+HISTORY_ACTION_FIELDS = {
+    TicketHistoryAction.UPDATED_TITLE: "title",
+    TicketHistoryAction.UPDATED_DESCRIPTION: "description",
+    TicketHistoryAction.UPDATED_STATUS: "status",
+    TicketHistoryAction.UPDATED_PRIORITY: "priority",
+    TicketHistoryAction.UPDATED_DEPARTMENT: "department",
+    TicketHistoryAction.UPDATED_ASSIGNEES: "assignee_ids",
+}
+
+# Valid status transitions
+VALID_TRANSITIONS = {
+    TicketStatus.OPEN: [TicketStatus.IN_PROGRESS, TicketStatus.CLOSED],
+    TicketStatus.IN_PROGRESS: [TicketStatus.OPEN, TicketStatus.CLOSED, TicketStatus.BLOCKED],
+    TicketStatus.BLOCKED: [TicketStatus.IN_PROGRESS, TicketStatus.OPEN],
+    TicketStatus.CLOSED: [TicketStatus.OPEN, TicketStatus.IN_PROGRESS]
+}
 
 
 class TicketServiceDB:
@@ -21,15 +49,12 @@ class TicketServiceDB:
         self.db = db
         self.ticket_repo = TicketRepository(db)
         self.history_repo = TicketHistoryRepository(db)
+        self.snapshot_repo = TicketSnapshotRepository(db)
         self.user_repo = UserRepository(db)
-        
-        # Valid status transitions
-        self.valid_transitions = {
-            TicketStatus.OPEN: [TicketStatus.IN_PROGRESS, TicketStatus.CLOSED],
-            TicketStatus.IN_PROGRESS: [TicketStatus.OPEN, TicketStatus.CLOSED, TicketStatus.BLOCKED],
-            TicketStatus.BLOCKED: [TicketStatus.IN_PROGRESS, TicketStatus.OPEN],
-            TicketStatus.CLOSED: [TicketStatus.OPEN, TicketStatus.IN_PROGRESS]
-        }
+        self.event_repo = EventOutboxRepository(db)
+        self.attachment_repo = AttachmentRepository(db)
+        self.comment_repo = TicketCommentRepository(db)
+        self.valid_transitions = VALID_TRANSITIONS
     
     def _generate_ticket_key(self) -> str:
         """Generate unique ticket key."""
@@ -56,19 +81,23 @@ class TicketServiceDB:
         # Generate ticket key
         ticket_key = self._generate_ticket_key()
         
-        # Create ticket
-        ticket = self.ticket_repo.create(ticket_data, reporter_id, ticket_key)
+        # Create ticket, its history, checkpoint and event in one transaction
+        ticket = self.ticket_repo.create(ticket_data, reporter_id, ticket_key, commit=False)
+        set_deadlines(ticket, datetime.utcnow())
+        created_entry = self.history_repo.create(str(ticket.id), reporter_id, "created", commit=False)
+        self._record_checkpoint(ticket, created_entry, commit=False)
         
-        # Add history entry
-        self.history_repo.create(str(ticket.id), reporter_id, "created")
-        
-        # Publish event
-        event_bus.publish(EventTypes.TICKET_CREATED, {
+        self.event_repo.record(EventTypes.TICKET_CREATED, {
             "ticket_id": str(ticket.id),
             "ticket_key": ticket.key,
             "reporter_id": reporter_id,
-            "assignee_ids": [str(a.id) for a in ticket.assignees]
+            "assignee_ids": [str(a.id) for a in ticket.assignees],
+            "department": ticket.department,
+            "priority": ticket.priority.value,
+            "status": ticket.status.value,
+            "sla_due_at": ticket.sla_due_at.isoformat() if ticket.sla_due_at else None
         })
+        self.db.commit()
         
         return ticket
     
@@ -88,8 +117,13 @@ class TicketServiceDB:
         """Get tickets assigned to or reported by user."""
         return self.ticket_repo.get_user_tickets(user_id)
     
-    def update_ticket(self, ticket_id: str, ticket_data: TicketUpdate, updated_by_id: str) -> Ticket:
-        """Update ticket."""
+    def update_ticket(self, ticket_id: str, ticket_data: TicketUpdate, updated_by_id: str,
+                      commit: bool = True, workflow_depth: int = 0) -> Ticket:
+        """Update ticket.
+
+        Workflow actions pass the depth of the rule chain that led to the
+        update; it is carried on the resulting events to stop rule loops.
+        """
         ticket = self.ticket_repo.get_by_id(ticket_id)
         if not ticket:
             raise create_http_exception(
@@ -137,33 +171,131 @@ class TicketServiceDB:
             if current_assignee_ids != new_assignee_ids:
                 changes.append(("assignees", ",".join(current_assignee_ids), ",".join(new_assignee_ids)))
         
-        # Update ticket
-        updated_ticket = self.ticket_repo.update(ticket_id, ticket_data)
+        # Update ticket, history and events in one transaction
+        old_status = ticket.status
+        updated_ticket = self.ticket_repo.update(ticket_id, ticket_data, commit=False)
+        changed_fields = {field for field, _, _ in changes}
+        if changed_fields & {"status", "priority"}:
+            update_deadlines(updated_ticket, old_status, "priority" in changed_fields, datetime.utcnow())
         
         # Add history entries for changes
         for field, old_value, new_value in changes:
-            self.history_repo.create(ticket_id, updated_by_id, f"updated_{field}", old_value, new_value)
+            entry = self.history_repo.create(
+                ticket_id, updated_by_id, f"updated_{field}", old_value, new_value, commit=False)
+        if changes:
+            self._maybe_checkpoint(updated_ticket, entry, commit=False)
         
-        # Publish events
+        # Record events
         if changes:
-            event_bus.publish(EventTypes.TICKET_UPDATED, {
+            caused_by = {"workflow_depth": workflow_depth} if workflow_depth else {}
+            self.event_repo.record(EventTypes.TICKET_UPDATED, {
+                **caused_by,
                 "ticket_id": ticket_id,
+                "ticket_key": updated_ticket.key,
                 "updated_by": updated_by_id,
+                "reporter_id": str(updated_ticket.reporter_id),
+                "assignee_ids": [str(a.id) for a in updated_ticket.assignees],
+                "department": updated_ticket.department,
+                "priority": updated_ticket.priority.value,
+                "status": updated_ticket.status.value,
+                "sla_due_at": updated_ticket.sla_due_at.isoformat() if updated_ticket.sla_due_at else None,
                 "changes": [{"field": field, "old": old, "new": new} for field, old, new in changes]
             })
             
             # Check for status change
             status_change = next((c for c in changes if c[0] == "status"), None)
             if status_change:
-                event_bus.publish(EventTypes.TICKET_STATUS_CHANGED, {
+                self.event_repo.record(EventTypes.TICKET_STATUS_CHANGED, {
+                    **caused_by,
                     "ticket_id": ticket_id,
                     "old_status": status_change[1],
                     "new_status": status_change[2],
-                    "updated_by": updated_by_id
+                    "updated_by": updated_by_id,
+                    "department": updated_ticket.department,
+                    "priority": updated_ticket.priority.value
                 })
+        if commit:
+            self.db.commit()
         
         return updated_ticket
     
+    def get_list_extras(self, tickets: List[Ticket], include: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get optional per-ticket aggregates for a ticket list, one grouped query each.
+
+        ``include`` names the aggregates: "attachments" adds the attachment
+        count and total size, "comments" the comment count.
+        """
+        ticket_ids = [str(ticket.id) for ticket in tickets]
+        extras: Dict[str, Dict[str, Any]] = {ticket_id: {} for ticket_id in ticket_ids}
+        if "attachments" in include:
+            stats = self.attachment_repo.get_stats_by_ticket_ids(ticket_ids)
+            for ticket_id in ticket_ids:
+                counts = stats.get(ticket_id, {"count": 0, "total_size": 0})
+                extras[ticket_id]["attachmentCount"] = counts["count"]
+                extras[ticket_id]["attachmentBytes"] = counts["total_size"]
+        if "comments" in include:
+            counts = self.comment_repo.count_by_ticket_ids(ticket_ids)
+            for ticket_id in ticket_ids:
+                extras[ticket_id]["commentCount"] = counts.get(ticket_id, 0)
+        return extras
+
+    @staticmethod
+    def _encode_comment_cursor(comment: TicketComment) -> str:
+        position = json.dumps([comment.created_at.isoformat(), str(comment.id)])
+        return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_comment_cursor(cursor: str) -> Tuple[datetime, str]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, comment_id = json.loads(base64.urlsafe_b64decode(padded))
+            return datetime.fromisoformat(created_at), str(comment_id)
+        except (ValueError, TypeError):
+            raise create_http_exception(
+                400,
+                ErrorCodes.E_VALIDATION_ERROR,
+                "Invalid cursor"
+            )
+
+    def get_comments_page(self, ticket_id: str, limit: int, cursor: Optional[str] = None
+                          ) -> Tuple[List[TicketComment], Dict[str, User], Optional[str]]:
+        """Get a page of a ticket's comments, oldest first.
+
+        Returns the comments, their authors by ID (loaded in one query) and
+        the cursor of the next page, or None on the last page.
+        """
+        after = self._decode_comment_cursor(cursor) if cursor else None
+        comments = self.comment_repo.get_page(ticket_id, limit + 1, after)
+        next_cursor = None
+        if len(comments) > limit:
+            comments = comments[:limit]
+            next_cursor = self._encode_comment_cursor(comments[-1])
+        authors = self.user_repo.get_by_ids({str(comment.user_id) for comment in comments})
+        return comments, {str(user.id): user for user in authors}, next_cursor
+
+    def get_comment(self, ticket_id: str, comment_id: str) -> TicketComment:
+        """Get a comment of a ticket."""
+        comment = self.comment_repo.get_by_id(comment_id)
+        if not comment or str(comment.ticket_id) != ticket_id:
+            raise create_http_exception(
+                404,
+                ErrorCodes.E_COMMENT_NOT_FOUND,
+                "Comment not found"
+            )
+        return comment
+
+    def add_comment(self, ticket_id: str, user_id: str, content: str) -> TicketComment:
+        """Add a comment to a ticket."""
+        return self.comment_repo.create(ticket_id, user_id, content)
+
+    def update_comment(self, comment: TicketComment, content: str) -> TicketComment:
+        """Change a comment's text."""
+        return self.comment_repo.update(str(comment.id), content)
+
+    def delete_comment(self, comment: TicketComment) -> bool:
+        """Delete a comment."""
+        return self.comment_repo.delete(str(comment.id))
+
     def get_ticket_history(self, ticket_id: str) -> List[TicketHistory]:
         """Get ticket history."""
         return self.history_repo.get_by_ticket_id(ticket_id)
@@ -172,6 +304,90 @@ class TicketServiceDB:
         """Get ticket statistics."""
         return self.ticket_repo.get_stats()
 
+    def get_board_snapshot(self, as_of: datetime) -> Dict[str, Any]:
+        """Get ticket statistics as of a point in time."""
+        return self.ticket_repo.get_board_snapshot(as_naive_utc(as_of))
+
+    def _ticket_state(self, ticket: Ticket) -> Dict[str, Any]:
+        """Serialize the ticket fields tracked by history into a checkpoint state."""
+        return {
+            "id": str(ticket.id),
+            "key": ticket.key,
+            "title": ticket.title,
+            "description": ticket.description,
+            "status": ticket.status.value,
+            "priority": ticket.priority.value,
+            "department": ticket.department,
+            "reporter_id": str(ticket.reporter_id),
+            "assignee_ids": sorted(str(a.id) for a in ticket.assignees),
+            "created_at": ticket.created_at.isoformat(),
+            "updated_at": ticket.updated_at.isoformat() if ticket.updated_at else None
+        }
+
+    def _record_checkpoint(self, ticket: Ticket, entry: TicketHistory, commit: bool = True):
+        """Checkpoint the ticket's state as of a history entry."""
+        self.snapshot_repo.create(
+            str(ticket.id), entry.id, entry.created_at, self._ticket_state(ticket), commit=commit)
+
+    def _maybe_checkpoint(self, ticket: Ticket, entry: TicketHistory, commit: bool = True):
+        """Checkpoint once a full interval of entries has built up since the last one."""
+        last = self.snapshot_repo.get_latest(str(ticket.id))
+        pending = self.history_repo.count_since(str(ticket.id), last.history_id if last else 0)
+        if pending >= settings.HISTORY_CHECKPOINT_INTERVAL:
+            self._record_checkpoint(ticket, entry, commit=commit)
+
+    @staticmethod
+    def _apply_history_value(state: Dict[str, Any], entry, value: Optional[str]):
+        """Set the state field touched by a history entry to value."""
+        field = HISTORY_ACTION_FIELDS.get(entry.action)
+        if field == "assignee_ids":
+            state[field] = sorted(v for v in (value or "").split(",") if v)
+        elif field:
+            state[field] = value
+
+    def get_ticket_as_of(self, ticket_id: str, as_of: datetime) -> Optional[TicketInternal]:
+        """Reconstruct a ticket as it was at a point in time.
+
+        Replays forward from the last checkpoint at or before ``as_of``. Tickets
+        without such a checkpoint are rewound from the next checkpoint (or the
+        current state) by undoing later entries. Either way at most one
+        checkpoint interval of history is replayed.
+        """
+        as_of = as_naive_utc(as_of)
+        ticket = self.ticket_repo.get_by_id(ticket_id)
+        if not ticket or as_naive_utc(ticket.created_at) > as_of:
+            return None
+
+        checkpoint = self.snapshot_repo.get_latest_before(ticket_id, as_of)
+        if checkpoint:
+            state = dict(checkpoint.state)
+            for entry in self.history_repo.get_range(
+                    ticket_id, after_id=checkpoint.history_id, until=as_of):
+                self._apply_history_value(state, entry, entry.new_value)
+                state["updated_at"] = entry.created_at.isoformat()
+        else:
+            checkpoint = self.snapshot_repo.get_earliest_after(ticket_id, as_of)
+            if checkpoint:
+                state = dict(checkpoint.state)
+                upto_id = checkpoint.history_id
+            else:
+                state = self._ticket_state(ticket)
+                upto_id = None
+
+            for entry in self.history_repo.get_range(
+                    ticket_id, upto_id=upto_id, since=as_of, newest_first=True):
+                self._apply_history_value(state, entry, entry.old_value)
+
+            last_change = self.history_repo.get_range(
+                ticket_id, until=as_of, newest_first=True, limit=1)
+            state["updated_at"] = (
+                last_change[0].created_at.isoformat()
+                if last_change and last_change[0].action != TicketHistoryAction.CREATED
+                else None
+            )
+
+        return TicketInternal(**state)
+
 
 def get_ticket_service(db: Session = Depends(get_db)) -> TicketServiceDB:
     """Get ticket service instance."""
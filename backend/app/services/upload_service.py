@@ -0,0 +1,243 @@
+"""Resumable uploads of large attachment files.
+
+A session preallocates a file of the declared size under the blob store's
+uploads directory. Each PUT streams its body straight to its offset in
+that file, so chunks can arrive in any order, be retried, or be sent in
+parallel, and are never copied or held in memory. Completing the session
+hashes the file once and renames it into the blob store (or, for a
+compressible content type, compresses it into the store in that pass).
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.database.base import SessionLocal, get_db
+from app.database.models import UploadSession
+from app.database.repositories.attachment_repository import AttachmentRepository
+from app.database.repositories.upload_repository import UploadRepository
+from app.models.attachment import BlobUploadResponse, ByteRange, UploadSessionResponse
+from app.services.blob_store import CHUNK_SIZE, blob_store
+from app.utils.errors import ErrorCodes, create_http_exception
+
+logger = logging.getLogger(__name__)
+
+# Stale sessions deleted per transaction, and stored files looked up per query, by the GC
+GC_BATCH_SIZE = 100
+
+
+def merge_ranges(chunks: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge (offset, length) chunks sorted by offset into disjoint (start, end) ranges."""
+    ranges: List[Tuple[int, int]] = []
+    for offset, length in chunks:
+        if length <= 0:
+            continue
+        end = offset + length
+        if ranges and offset <= ranges[-1][1]:
+            if end > ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((offset, end))
+    return ranges
+
+
+def _part_path(session_id: str) -> str:
+    return os.path.join(blob_store.upload_dir, session_id)
+
+
+def _preallocate(path: str, size: int):
+    # Sparse where the filesystem supports it; chunks fill it in place
+    with open(path, "wb") as f:
+        f.truncate(size)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class UploadServiceDB:
+    """Resumable upload sessions with chunks assembled on disk."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.upload_repo = UploadRepository(db)
+
+    def create_session(self, size: int, created_by: str,
+                       content_type: Optional[str] = None) -> UploadSession:
+        """Start an upload of a file of the given size."""
+        if size > settings.ATTACHMENT_MAX_BYTES:
+            raise create_http_exception(
+                413,
+                ErrorCodes.E_ATTACHMENT_TOO_LARGE,
+                "Attachment is too large",
+                {"maxBytes": settings.ATTACHMENT_MAX_BYTES}
+            )
+        session = self.upload_repo.create(created_by, size, content_type, commit=False)
+        _preallocate(_part_path(session.id), size)
+        self.db.commit()
+        return session
+
+    def get_session(self, session_id: str, user_id: str) -> UploadSession:
+        """Get an upload session started by the user."""
+        session = self.upload_repo.get_by_id(session_id)
+        if not session or session.created_by != user_id:
+            raise create_http_exception(
+                404,
+                ErrorCodes.E_UPLOAD_NOT_FOUND,
+                "Upload not found"
+            )
+        return session
+
+    def get_ranges(self, session: UploadSession) -> List[Tuple[int, int]]:
+        """Get the byte ranges received so far."""
+        return merge_ranges(self.upload_repo.get_chunks(session.id))
+
+    async def write_chunk(self, session: UploadSession, offset: int,
+                          chunks: AsyncIterator[bytes]) -> int:
+        """Write a streamed chunk at its offset. Returns the bytes written.
+
+        Whatever reached the disk is recorded even if the stream breaks
+        off, so the client can resume after the last received byte.
+        """
+        if offset < 0 or offset > session.size:
+            raise create_http_exception(
+                400,
+                ErrorCodes.E_VALIDATION_ERROR,
+                "Offset is outside the upload",
+                {"size": session.size}
+            )
+        f = await run_in_threadpool(open, _part_path(session.id), "r+b")
+        written = 0
+        try:
+            await run_in_threadpool(f.seek, offset)
+            buffer = bytearray()
+            async for data in chunks:
+                if offset + written + len(buffer) + len(data) > session.size:
+                    raise create_http_exception(
+                        400,
+                        ErrorCodes.E_VALIDATION_ERROR,
+                        "Chunk extends past the end of the upload",
+                        {"size": session.size}
+                    )
+                buffer += data
+                if len(buffer) >= CHUNK_SIZE:
+                    await run_in_threadpool(f.write, bytes(buffer))
+                    written += len(buffer)
+                    buffer.clear()
+            if buffer:
+                await run_in_threadpool(f.write, bytes(buffer))
+                written += len(buffer)
+        finally:
+            await run_in_threadpool(f.close)
+            if written:
+                self.upload_repo.add_chunk(session, offset, written)
+        return written
+
+    async def complete(self, session: UploadSession) -> BlobUploadResponse:
+        """Move a fully received upload into the blob store."""
+        ranges = self.get_ranges(session)
+        if session.size and ranges != [(0, session.size)]:
+            raise create_http_exception(
+                409,
+                ErrorCodes.E_UPLOAD_INCOMPLETE,
+                "Upload has missing bytes",
+                {"receivedRanges": [{"start": start, "end": end} for start, end in ranges]}
+            )
+        session_id, content_type = session.id, session.content_type
+        # Hashing (and compressing) a large file takes a while; no transaction
+        # may be open meanwhile, or SQLite writers would time out on its lock
+        self.db.rollback()
+        try:
+            file_key, size = await run_in_threadpool(
+                blob_store.import_file, _part_path(session_id), content_type)
+        except FileNotFoundError:
+            # Completed or aborted by a concurrent request
+            raise create_http_exception(
+                404,
+                ErrorCodes.E_UPLOAD_NOT_FOUND,
+                "Upload not found"
+            )
+        # Already gone if completed or collected concurrently; the file is stored either way
+        self.upload_repo.delete([session_id])
+        return BlobUploadResponse(fileKey=file_key, size=size)
+
+    def abort(self, session: UploadSession):
+        """Discard an upload and what was received."""
+        self.upload_repo.delete([session.id])
+        _remove(_part_path(session.id))
+
+    def to_response(self, session: UploadSession) -> UploadSessionResponse:
+        """Convert an upload session to its response model."""
+        ranges = self.get_ranges(session)
+        expires_at = session.updated_at + timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS)
+        return UploadSessionResponse(
+            uploadId=session.id,
+            size=session.size,
+            receivedBytes=sum(end - start for start, end in ranges),
+            receivedRanges=[ByteRange(start=start, end=end) for start, end in ranges],
+            expiresAt=expires_at.isoformat()
+        )
+
+
+def _delete_orphan_blobs(db: Session) -> int:
+    repo = AttachmentRepository(db)
+    keys = blob_store.idle_keys(settings.ATTACHMENT_ORPHAN_GRACE_SECONDS)
+    deleted = 0
+    while True:
+        batch = list(islice(keys, GC_BATCH_SIZE))
+        if not batch:
+            return deleted
+        referenced = repo.get_referenced_file_keys(batch)
+        db.rollback()
+        for key in batch:
+            # Checked again right before deleting: an upload or attach may have just touched it
+            if key not in referenced and blob_store.delete_if_idle(
+                    key, settings.ATTACHMENT_ORPHAN_GRACE_SECONDS):
+                deleted += 1
+
+
+def run_upload_gc():
+    """Delete abandoned uploads, stray temp files and orphaned blobs (background task entry point)."""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS)
+    db = SessionLocal()
+    deleted = 0
+    try:
+        repo = UploadRepository(db)
+        while True:
+            session_ids = repo.get_stale_ids(cutoff, GC_BATCH_SIZE)
+            if not session_ids:
+                break
+            deleted += repo.delete(session_ids)
+            for session_id in session_ids:
+                _remove(_part_path(session_id))
+    finally:
+        db.close()
+    if deleted:
+        logger.info("Deleted %s abandoned uploads", deleted)
+
+    removed = blob_store.sweep_temp(settings.UPLOAD_SESSION_TTL_SECONDS)
+    if removed:
+        logger.info("Deleted %s stray attachment temp files", removed)
+
+    db = SessionLocal()
+    try:
+        orphans = _delete_orphan_blobs(db)
+    finally:
+        db.close()
+    if orphans:
+        logger.info("Deleted %s attachment files no attachment refers to", orphans)
+
+
+def get_upload_service(db: Session = Depends(get_db)) -> UploadServiceDB:
+    """Get upload service instance."""
+    return UploadServiceDB(db)
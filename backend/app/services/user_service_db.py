@@ -7,11 +7,12 @@ from fastapi import Depends
 from app.core.security import get_password_hash
 from app.database.base import get_db
 from app.database.repositories.user_repository import UserRepository
+from app.database.repositories.event_repository import EventOutboxRepository
 from app.database.models import User, UserRole
 from app.models.user import UserCreate, UserUpdate
 from app.services.email_service import email_service
 from app.utils.errors import ErrorCodes, create_http_exception
-from app.utils.events import event_bus, EventTypes
+from app.utils.events import EventTypes
 
 
 class UserServiceDB:
@@ -20,9 +21,15 @@ class UserServiceDB:
     def __init__(self, db: Session = Depends(get_db)):
         self.db = db
         self.user_repo = UserRepository(db)
+        self.event_repo = EventOutboxRepository(db)
 
-    def create_user(self, user_data: UserCreate, created_by_id: str, send_verification: bool = True) -> User:
-        """Create a new user."""
+    def create_user(self, user_data: UserCreate, created_by_id: str, send_verification: bool = True,
+                    password_hash: Optional[str] = None) -> User:
+        """Create a new user.
+
+        Callers on the request path pass a password_hash computed in the
+        password pool so bcrypt never runs on the event loop.
+        """
         # Check if email already exists
         if self.user_repo.email_exists(user_data.email):
             raise create_http_exception(
@@ -48,23 +55,23 @@ class UserServiceDB:
             verification_token = email_service.generate_otp()
             verification_expires = email_service.get_otp_expiry_time()
 
-        # Create user
-        password_hash = get_password_hash(user_data.password)
+        # Create user, verification email and event in one transaction
+        if password_hash is None:
+            password_hash = get_password_hash(user_data.password)
         user = self.user_repo.create(
-            user_data, password_hash, verification_token, verification_expires)
+            user_data, password_hash, verification_token, verification_expires, commit=False)
 
-        # Send verification email
         if send_verification:
             email_service.send_verification_email(
-                user.email, verification_token, user.name)
+                self.db, user.email, verification_token, user.name, commit=False)
 
-        # Publish event
-        event_bus.publish(EventTypes.USER_CREATED, {
+        self.event_repo.record(EventTypes.USER_CREATED, {
             "user_id": str(user.id),
             "email": user.email,
             "role": user.role.value,
             "created_by": created_by_id
         })
+        self.db.commit()
 
         return user
 
@@ -127,15 +134,14 @@ class UserServiceDB:
                 "Email already exists"
             )
 
-        # Update user
-        updated_user = self.user_repo.update(user_id, user_data)
-
-        # Publish event
-        event_bus.publish(EventTypes.USER_UPDATED, {
+        # Update user and record the event in one transaction
+        updated_user = self.user_repo.update(user_id, user_data, commit=False)
+        self.event_repo.record(EventTypes.USER_UPDATED, {
             "user_id": user_id,
             "updated_by": updated_by_id,
             "changes": user_data.dict(exclude_unset=True)
         })
+        self.db.commit()
 
         return updated_user
 
@@ -157,28 +163,28 @@ class UserServiceDB:
                 "Cannot delete permanent admin user"
             )
 
-        # Delete user
-        success = self.user_repo.delete(user_id)
+        # Delete user and record the event in one transaction
+        success = self.user_repo.delete(user_id, commit=False)
 
         if success:
-            # Publish event
-            event_bus.publish(EventTypes.USER_DELETED, {
+            self.event_repo.record(EventTypes.USER_DELETED, {
                 "user_id": user_id,
                 "deleted_by": deleted_by_id
             })
+            self.db.commit()
 
         return success
 
     def verify_email(self, email: str, otp: str) -> bool:
         """Verify user email with OTP."""
-        user = self.user_repo.verify_email(email, otp)
+        user = self.user_repo.verify_email(email, otp, commit=False)
         if user:
-            # Publish event
-            event_bus.publish(EventTypes.USER_UPDATED, {
+            self.event_repo.record(EventTypes.USER_UPDATED, {
                 "user_id": str(user.id),
                 "email": user.email,
                 "changes": {"email_verified": True}
             })
+            self.db.commit()
             return True
         return False
 
@@ -206,7 +212,7 @@ class UserServiceDB:
         # Update verification token
         if self.user_repo.update_verification_token(email, verification_token, verification_expires):
             # Send verification email
-            return email_service.send_verification_email(email, verification_token, user.name)
+            return email_service.send_verification_email(self.db, email, verification_token, user.name)
 
         return False
 
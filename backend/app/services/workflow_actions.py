@@ -0,0 +1,279 @@
+"""Background execution of workflow rule actions.
+
+The workflow engine only submits matched actions; a worker thread applies
+them, so action latency never lands on a request or an event listener.
+Each drain groups the pending actions by ticket and applies a ticket's
+actions as one unit of work: a single ticket update (assignees, status and
+priority merged), any comments and notifications, and one log row per
+action, committed together. Log rows carry an idempotency key derived from
+the event, rule and action, so an action that was already applied (its
+event replayed or delivered twice) is skipped.
+
+Changes made by actions publish ticket events of their own, which can match
+further rules. Those events carry ``workflow_depth``; the engine ignores
+events at ``WORKFLOW_MAX_DEPTH`` so rules cannot loop forever.
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.database.base import SessionLocal
+from app.database.models import Ticket, WorkflowActionLog
+from app.database.repositories.ticket_repository import TicketCommentRepository
+from app.database.repositories.user_repository import UserRepository
+from app.models.ticket import TicketUpdate
+from app.models.workflow import WorkflowAction, WorkflowRuleInternal
+from app.services.email_service import email_service
+from app.services.ticket_service_db import TicketServiceDB
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_SUBJECT = "[{key}] {rule}"
+
+NOTIFICATION_BODY = """
+The workflow rule "{rule}" ran on ticket {key}: {title}
+
+Status: {status}
+Priority: {priority}
+
+The TicketFlow Team
+"""
+
+# Sentinel telling the worker to exit
+_STOP = object()
+
+
+class PendingAction:
+    """One action of a matched rule, waiting to be applied."""
+
+    __slots__ = ("ticket_id", "rule_id", "rule_name", "action", "value", "key", "depth")
+
+    def __init__(self, ticket_id: str, rule: WorkflowRuleInternal, action: WorkflowAction,
+                 value: Any, key: str, depth: int):
+        self.ticket_id = ticket_id
+        self.rule_id = rule.id
+        self.rule_name = rule.name
+        self.action = action
+        self.value = value
+        self.key = key
+        self.depth = depth
+
+
+def idempotency_key(event: Dict[str, Any], rule_id: str, action: str, value: Any) -> str:
+    """Key an action by the event that triggered it, its rule and its value."""
+    # Relayed events have a durable outbox id; others are identified by content
+    event_ref = event.get("id") or [event["type"], event["timestamp"], event["data"].get("ticket_id")]
+    raw = json.dumps([event_ref, rule_id, action, value], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _as_list(value: Any) -> List[str]:
+    return [str(item) for item in value] if isinstance(value, (list, tuple)) else [str(value)]
+
+
+class WorkflowActionExecutor:
+    """Applies workflow actions off the request path, batched per ticket."""
+
+    def __init__(self, session_factory=SessionLocal, batch_size: int = 100, background: bool = True):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.background = background
+        self.queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._actor_id: Optional[str] = None
+
+    def submit(self, rule: WorkflowRuleInternal, event: Dict[str, Any]) -> int:
+        """Queue a matched rule's actions. Returns the number queued."""
+        ticket_id = event["data"].get("ticket_id")
+        if not ticket_id:
+            return 0
+
+        depth = event["data"].get("workflow_depth", 0) + 1
+        queued = 0
+        for name, value in rule.actions.items():
+            try:
+                action = WorkflowAction(name)
+            except ValueError:
+                logger.warning("Workflow rule '%s' has unknown action %s", rule.name, name)
+                continue
+            self.queue.put(PendingAction(
+                ticket_id, rule, action, value, idempotency_key(event, rule.id, name, value), depth))
+            queued += 1
+
+        if queued and self.background:
+            self._ensure_worker()
+        return queued
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="workflow-actions", daemon=True)
+                self._thread.start()
+
+    def _take_batch(self, block: bool) -> List[Any]:
+        batch = []
+        try:
+            batch.append(self.queue.get() if block else self.queue.get_nowait())
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch(block=True)
+            stopping = batch[-1] is _STOP
+            self.execute([item for item in batch if item is not _STOP])
+            if stopping:
+                return
+
+    def drain(self) -> int:
+        """Apply every queued action in the calling thread. Returns the number applied."""
+        applied = 0
+        while True:
+            batch = [item for item in self._take_batch(block=False) if item is not _STOP]
+            if not batch:
+                return applied
+            applied += self.execute(batch)
+
+    def stop(self, timeout: float = 5.0):
+        """Apply queued actions and stop the worker."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self.queue.put(_STOP)
+            thread.join(timeout)
+        self.drain()
+
+    def execute(self, batch: List[PendingAction]) -> int:
+        """Apply a batch of actions, one unit of work per ticket. Returns the number applied."""
+        by_ticket: Dict[str, List[PendingAction]] = {}
+        for item in batch:
+            by_ticket.setdefault(item.ticket_id, []).append(item)
+
+        applied = 0
+        for ticket_id, items in by_ticket.items():
+            try:
+                applied += self._apply(ticket_id, items)
+            except Exception as e:
+                metrics.increment("workflow_action_failures", len(items))
+                logger.error("Workflow actions for ticket %s failed: %s", ticket_id, e)
+        metrics.increment("workflow_actions_applied", applied)
+        return applied
+
+    def _get_actor_id(self, db) -> Optional[str]:
+        if self._actor_id is None:
+            actor = UserRepository(db).get_by_email(settings.WORKFLOW_ACTOR_EMAIL)
+            self._actor_id = str(actor.id) if actor else None
+        return self._actor_id
+
+    def _apply(self, ticket_id: str, items: List[PendingAction]) -> int:
+        db = self.session_factory()
+        try:
+            pending: Dict[str, PendingAction] = {}
+            for item in items:
+                pending.setdefault(item.key, item)
+            done = {key for (key,) in db.query(WorkflowActionLog.idempotency_key).filter(
+                WorkflowActionLog.idempotency_key.in_(list(pending))).all()}
+            todo = [item for key, item in pending.items() if key not in done]
+            metrics.increment("workflow_actions_deduplicated", len(items) - len(todo))
+            if not todo:
+                return 0
+
+            service = TicketServiceDB(db)
+            ticket = service.get_ticket(ticket_id)
+            actor_id = self._get_actor_id(db)
+            if not ticket or not actor_id:
+                logger.warning("Skipping workflow actions for ticket %s: ticket or actor missing", ticket_id)
+                return 0
+
+            self._update_ticket(service, ticket, todo, actor_id)
+
+            comments = TicketCommentRepository(db)
+            for item in todo:
+                if item.action == WorkflowAction.ADD_COMMENT:
+                    comments.create(ticket_id, actor_id, str(item.value), commit=False)
+                elif item.action == WorkflowAction.SEND_NOTIFICATION:
+                    self._notify(db, ticket, item)
+                db.add(WorkflowActionLog(idempotency_key=item.key, ticket_id=ticket_id,
+                                         rule_id=item.rule_id, action=item.action.value))
+            db.commit()
+            return len(todo)
+        except IntegrityError:
+            # Another worker applied the same actions concurrently
+            db.rollback()
+            return 0
+        finally:
+            db.close()
+
+    def _update_ticket(self, service: TicketServiceDB, ticket: Ticket,
+                       items: List[PendingAction], actor_id: str):
+        """Merge the ticket field actions into one update in the open transaction."""
+        update: Dict[str, Any] = {}
+        assignee_ids = None
+        for item in items:
+            if item.action == WorkflowAction.CHANGE_STATUS:
+                update["status"] = item.value
+            elif item.action == WorkflowAction.SET_PRIORITY:
+                update["priority"] = item.value
+            elif item.action == WorkflowAction.ASSIGN_USER:
+                if assignee_ids is None:
+                    assignee_ids = [str(a.id) for a in ticket.assignees]
+                assignee_ids.extend(v for v in _as_list(item.value) if v not in assignee_ids)
+
+        status = update.get("status")
+        if status is not None and (
+                status == ticket.status.value
+                or status not in {s.value for s in service.valid_transitions.get(ticket.status, [])}):
+            logger.warning("Workflow cannot move ticket %s from %s to %s",
+                           ticket.key, ticket.status.value, status)
+            del update["status"]
+        if assignee_ids is not None:
+            update["assigneeIds"] = assignee_ids
+        if not update:
+            return
+
+        depth = max(item.depth for item in items)
+        try:
+            service.update_ticket(str(ticket.id), TicketUpdate(**update), actor_id,
+                                  commit=False, workflow_depth=depth)
+        except Exception as e:
+            # Keep the unit of work going without the field changes
+            service.db.rollback()
+            logger.warning("Workflow update of ticket %s skipped: %s", ticket.key, e)
+
+    def _notify(self, db, ticket: Ticket, item: PendingAction):
+        """Queue a notification email to "reporter", "assignees", a user id or an address."""
+        recipients = []
+        for target in _as_list(item.value):
+            if target == "reporter":
+                recipients.append(ticket.reporter.email)
+            elif target == "assignees":
+                recipients.extend(a.email for a in ticket.assignees)
+            elif "@" in target:
+                recipients.append(target)
+            else:
+                user = UserRepository(db).get_by_id(target)
+                if user:
+                    recipients.append(user.email)
+
+        subject = NOTIFICATION_SUBJECT.format(key=ticket.key, rule=item.rule_name)
+        body = NOTIFICATION_BODY.format(rule=item.rule_name, key=ticket.key, title=ticket.title,
+                                        status=ticket.status.value, priority=ticket.priority.value)
+        for recipient in dict.fromkeys(recipients):
+            email_service.queue_email(db, recipient, subject, body, commit=False)
+
+
+# Executor shared by the workflow engine of this worker
+workflow_action_executor = WorkflowActionExecutor(batch_size=settings.WORKFLOW_ACTION_BATCH_SIZE)
@@ -0,0 +1,244 @@
+"""Retroactive application of workflow rules to stored tickets.
+
+A rule's equality conditions compile to a SQL WHERE clause over
+``tickets``, so matching tickets are found by the database instead of
+replaying events. Matches are processed in chunks of ticket ids (keyset
+paging, so tickets the rule changes are not revisited or skipped). Each
+chunk costs one SELECT of current values, one UPDATE per changed field
+value, bulk inserts for assignees, comments and history, and one commit.
+
+Field actions change nothing on tickets already holding their values, so
+applying a rule again is harmless. Comments are logged in
+``workflow_action_log`` like those added for live events, and tickets
+already carrying the rule's comment, from either path, are not commented on
+again.
+
+Retroactive changes write history but publish no per-ticket events, and
+notifications are not sent for existing tickets. SLA deadlines of tickets
+whose status or priority changed are recomputed in the same chunk and
+this worker's timers follow them; timers held by other workers re-read
+the ticket before escalating, so they never fire for a cleared deadline.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from app.database.models import (
+    Ticket, TicketComment, TicketHistory, TicketHistoryAction, WorkflowActionLog, ticket_assignees
+)
+from app.models.workflow import WorkflowAction, WorkflowRuleInternal
+from app.services.sla_service import sla_scheduler, update_deadlines
+from app.services.ticket_service_db import VALID_TRANSITIONS
+
+# Event data keys rules can condition on, and the ticket columns holding them
+CONDITION_COLUMNS = {
+    "ticket_id": Ticket.id,
+    "ticket_key": Ticket.key,
+    "reporter_id": Ticket.reporter_id,
+    "department": Ticket.department,
+    "priority": Ticket.priority,
+    "status": Ticket.status,
+}
+
+# Actions that only make sense as a reaction to a live event
+LIVE_ONLY_ACTIONS = {WorkflowAction.SEND_NOTIFICATION}
+
+
+def compile_conditions(conditions: Dict[str, Any]) -> List[Any]:
+    """Compile a rule's conditions to SQLAlchemy clauses over Ticket.
+
+    Raises ValueError for conditions stored tickets cannot be matched on.
+    """
+    clauses = []
+    for key, value in conditions.items():
+        column = CONDITION_COLUMNS.get(key)
+        if column is None:
+            raise ValueError(f"Condition on '{key}' cannot be applied to existing tickets")
+        enum_class = getattr(column.type, "enum_class", None)
+        if enum_class is not None:
+            try:
+                value = enum_class(value)
+            except ValueError:
+                raise ValueError(f"Invalid {key} value in condition: {value}")
+        clauses.append(column == value)
+    return clauses
+
+
+def apply_key(rule_id: str, ticket_id: str, action: str) -> str:
+    """Key an action applied to a stored ticket by its rule."""
+    raw = json.dumps(["apply", rule_id, ticket_id, action])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _as_list(value: Any) -> List[str]:
+    return [str(item) for item in value] if isinstance(value, (list, tuple)) else [str(value)]
+
+
+class RuleApplication:
+    """Applies one rule's actions to every stored ticket matching its conditions."""
+
+    def __init__(self, db: Session, rule: WorkflowRuleInternal, actor_id: str, chunk_size: int = 500):
+        self.db = db
+        self.rule = rule
+        self.actor_id = actor_id
+        self.chunk_size = chunk_size
+        self.clauses = compile_conditions(rule.conditions)
+
+        actions = {}
+        self.skipped_actions = []
+        for name, value in rule.actions.items():
+            try:
+                action = WorkflowAction(name)
+            except ValueError:
+                action = None
+            if action is None or action in LIVE_ONLY_ACTIONS:
+                self.skipped_actions.append(name)
+            else:
+                actions[action] = value
+
+        self.priority = actions.get(WorkflowAction.SET_PRIORITY)
+        self.status = actions.get(WorkflowAction.CHANGE_STATUS)
+        self.assignee_ids = _as_list(actions[WorkflowAction.ASSIGN_USER]) \
+            if WorkflowAction.ASSIGN_USER in actions else []
+        self.comment = actions.get(WorkflowAction.ADD_COMMENT)
+        try:
+            if self.priority is not None:
+                self.priority = Ticket.priority.type.enum_class(self.priority)
+            if self.status is not None:
+                self.status = Ticket.status.type.enum_class(self.status)
+        except ValueError as e:
+            raise ValueError(f"Invalid action value: {e}")
+
+    def count(self) -> int:
+        """Count the tickets the rule matches."""
+        return self.db.query(func.count(Ticket.id)).filter(*self.clauses).scalar()
+
+    def run(self) -> Dict[str, Any]:
+        """Apply the rule chunk by chunk, committing after each chunk."""
+        result = {"matched": 0, "updated": 0, "history_entries": 0, "comments": 0, "chunks": 0}
+        last_id = ""
+        while True:
+            rows = self.db.query(
+                Ticket.id, Ticket.status, Ticket.priority, Ticket.created_at,
+                Ticket.response_due_at, Ticket.resolution_due_at, Ticket.sla_due_at
+            ).filter(
+                *self.clauses, Ticket.id > last_id
+            ).order_by(Ticket.id).limit(self.chunk_size).all()
+            if not rows:
+                return result
+            last_id = rows[-1].id
+
+            history: List[Dict[str, Any]] = []
+            touched = set()
+            priority_changed = self._set_field(
+                rows, "priority", self.priority, TicketHistoryAction.UPDATED_PRIORITY,
+                lambda row: row.priority != self.priority, history, touched)
+            status_changed = self._set_field(
+                rows, "status", self.status, TicketHistoryAction.UPDATED_STATUS,
+                lambda row: self.status in VALID_TRANSITIONS.get(row.status, ()),
+                history, touched)
+            timers = self._update_deadlines(rows, status_changed, priority_changed)
+            self._add_assignees([row.id for row in rows], history, touched)
+
+            if self.comment is not None:
+                result["comments"] += self._add_comments([row.id for row in rows])
+            if history:
+                self.db.execute(insert(TicketHistory), history)
+            self.db.commit()
+            for ticket_id, due in timers.items():
+                sla_scheduler.schedule(ticket_id, due)
+
+            result["matched"] += len(rows)
+            result["updated"] += len(touched)
+            result["history_entries"] += len(history)
+            result["chunks"] += 1
+
+    def _set_field(self, rows, field: str, value, action: TicketHistoryAction, applies,
+                   history: List[Dict[str, Any]], touched: set) -> Set[str]:
+        """Set a ticket column on the rows it applies to with one UPDATE. Returns their ids."""
+        if value is None:
+            return set()
+        changed = [row for row in rows if applies(row)]
+        if not changed:
+            return set()
+        self.db.query(Ticket).filter(Ticket.id.in_([row.id for row in changed])).update(
+            {field: value}, synchronize_session=False)
+        for row in changed:
+            history.append({"ticket_id": row.id, "user_id": self.actor_id, "action": action,
+                            "old_value": getattr(row, field).value, "new_value": value.value})
+            touched.add(row.id)
+        return {row.id for row in changed}
+
+    def _update_deadlines(self, rows, status_changed: Set[str],
+                          priority_changed: Set[str]) -> Dict[str, Optional[datetime]]:
+        """Move the SLA deadlines of changed rows with one bulk UPDATE.
+
+        Returns each changed ticket's new sla_due_at, for its timer.
+        """
+        now = datetime.utcnow()
+        updates = []
+        for row in rows:
+            if row.id not in status_changed and row.id not in priority_changed:
+                continue
+            ticket = SimpleNamespace(
+                status=self.status if row.id in status_changed else row.status,
+                priority=self.priority if row.id in priority_changed else row.priority,
+                created_at=row.created_at, response_due_at=row.response_due_at,
+                resolution_due_at=row.resolution_due_at, sla_due_at=row.sla_due_at)
+            update_deadlines(ticket, row.status, row.id in priority_changed, now)
+            updates.append({"id": row.id, "response_due_at": ticket.response_due_at,
+                            "resolution_due_at": ticket.resolution_due_at,
+                            "sla_due_at": ticket.sla_due_at})
+        if updates:
+            self.db.execute(update(Ticket), updates)
+        return {item["id"]: item["sla_due_at"] for item in updates}
+
+    def _add_comments(self, ticket_ids: List[str]) -> int:
+        """Comment on tickets not already carrying the rule's comment. Returns the number added."""
+        commented = {ticket_id for (ticket_id,) in self.db.query(WorkflowActionLog.ticket_id).filter(
+            WorkflowActionLog.ticket_id.in_(ticket_ids),
+            WorkflowActionLog.rule_id == self.rule.id,
+            WorkflowActionLog.action == WorkflowAction.ADD_COMMENT.value
+        ).all()}
+        pending = [ticket_id for ticket_id in ticket_ids if ticket_id not in commented]
+        if not pending:
+            return 0
+        self.db.execute(insert(TicketComment), [
+            {"ticket_id": ticket_id, "user_id": self.actor_id, "content": str(self.comment)}
+            for ticket_id in pending
+        ])
+        self.db.execute(insert(WorkflowActionLog), [
+            {"idempotency_key": apply_key(self.rule.id, ticket_id, WorkflowAction.ADD_COMMENT.value),
+             "ticket_id": ticket_id, "rule_id": self.rule.id, "action": WorkflowAction.ADD_COMMENT.value}
+            for ticket_id in pending
+        ])
+        return len(pending)
+
+    def _add_assignees(self, ticket_ids: List[str], history: List[Dict[str, Any]], touched: set):
+        """Add the rule's assignees to tickets missing them with one bulk insert."""
+        if not self.assignee_ids:
+            return
+        current: Dict[str, List[str]] = {ticket_id: [] for ticket_id in ticket_ids}
+        for ticket_id, user_id in self.db.query(
+                ticket_assignees.c.ticket_id, ticket_assignees.c.user_id
+        ).filter(ticket_assignees.c.ticket_id.in_(ticket_ids)).all():
+            current[ticket_id].append(user_id)
+
+        links = []
+        for ticket_id, assigned in current.items():
+            added = [user_id for user_id in self.assignee_ids if user_id not in assigned]
+            if not added:
+                continue
+            links.extend({"ticket_id": ticket_id, "user_id": user_id} for user_id in added)
+            history.append({"ticket_id": ticket_id, "user_id": self.actor_id,
+                            "action": TicketHistoryAction.UPDATED_ASSIGNEES,
+                            "old_value": ",".join(assigned), "new_value": ",".join(assigned + added)})
+            touched.add(ticket_id)
+        if links:
+            self.db.execute(ticket_assignees.insert(), links)
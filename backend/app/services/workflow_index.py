@@ -0,0 +1,90 @@
+"""Index of workflow rules for matching events without scanning every rule.
+
+Rules are grouped by trigger. Within a trigger each rule is filed under one
+of its equality conditions, preferring the condition key with the most
+distinct values across that trigger's rules. An event then looks up only
+the buckets for the (key, value) pairs it carries and evaluates the rules
+found there, so its cost follows the number of candidate rules rather than
+the total. Rules without conditions, or whose condition values cannot be
+hashed, are checked for every event of their trigger.
+"""
+
+from operator import itemgetter
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from app.models.workflow import WorkflowRuleInternal, WorkflowTrigger
+
+# (position in rule order, rule); position keeps matches in rule order
+RuleEntry = Tuple[int, WorkflowRuleInternal]
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def conditions_match(conditions: Dict[str, Any], context: Dict[str, Any]) -> bool:
+    """Check that every condition key is present in context with the expected value."""
+    for key, expected_value in conditions.items():
+        if key not in context or context[key] != expected_value:
+            return False
+    return True
+
+
+class RuleIndex:
+    """Active workflow rules compiled for lookup by trigger and condition."""
+
+    def __init__(self, rules: Iterable[WorkflowRuleInternal]):
+        self.buckets: Dict[WorkflowTrigger, Dict[Tuple[str, Hashable], List[RuleEntry]]] = {}
+        self.unindexed: Dict[WorkflowTrigger, List[RuleEntry]] = {}
+        self.size = 0
+
+        by_trigger: Dict[WorkflowTrigger, List[RuleEntry]] = {}
+        for position, rule in enumerate(rules):
+            if rule.active:
+                by_trigger.setdefault(rule.trigger, []).append((position, rule))
+                self.size += 1
+
+        for trigger, entries in by_trigger.items():
+            selectivity = self._distinct_values(entries)
+            buckets = self.buckets[trigger] = {}
+            for entry in entries:
+                key = self._index_key(entry[1], selectivity)
+                if key is None:
+                    self.unindexed.setdefault(trigger, []).append(entry)
+                else:
+                    buckets.setdefault((key, entry[1].conditions[key]), []).append(entry)
+
+    @staticmethod
+    def _distinct_values(entries: List[RuleEntry]) -> Dict[str, int]:
+        values: Dict[str, set] = {}
+        for _, rule in entries:
+            for key, value in rule.conditions.items():
+                if _hashable(value):
+                    values.setdefault(key, set()).add(value)
+        return {key: len(seen) for key, seen in values.items()}
+
+    @staticmethod
+    def _index_key(rule: WorkflowRuleInternal, selectivity: Dict[str, int]) -> Optional[str]:
+        keys = [key for key, value in rule.conditions.items() if _hashable(value)]
+        return max(keys, key=selectivity.__getitem__) if keys else None
+
+    def match(self, trigger: WorkflowTrigger, context: Dict[str, Any]) -> List[WorkflowRuleInternal]:
+        """Get the active rules for a trigger whose conditions all hold in context."""
+        candidates = list(self.unindexed.get(trigger, ()))
+        buckets = self.buckets.get(trigger)
+        if buckets:
+            for item in context.items():
+                try:
+                    bucket = buckets.get(item)
+                except TypeError:
+                    # Lists and dicts in the event data cannot be condition values
+                    continue
+                if bucket:
+                    candidates.extend(bucket)
+        if len(candidates) > 1:
+            candidates.sort(key=itemgetter(0))
+        return [rule for _, rule in candidates if conditions_match(rule.conditions, context)]
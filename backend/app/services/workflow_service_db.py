@@ -0,0 +1,255 @@
+"""Workflow rule management with database storage.
+
+Rules live in ``workflow_rules``. Each worker matches events against an
+in-memory compiled rule set (see app.services.workflow_index), so rule
+evaluation never queries the database. Every rule change bumps the rule
+set's version in the same transaction; the worker that made the change
+rebuilds straight away and the others rebuild when their periodic check
+sees the new version.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database.base import SessionLocal, get_db
+from app.database.models import WorkflowRule
+from app.database.repositories.workflow_repository import WorkflowRepository
+from app.models.workflow import (
+    WorkflowApplyResponse, WorkflowRuleCreate, WorkflowRuleInternal, WorkflowRuleUpdate,
+    WorkflowTrigger
+)
+from app.database.repositories.user_repository import UserRepository
+from app.services.workflow_apply import RuleApplication
+from app.services.workflow_actions import WorkflowActionExecutor, workflow_action_executor
+from app.services.workflow_index import RuleIndex
+from app.utils.errors import ErrorCodes, create_http_exception
+from app.utils.events import event_bus, EventTypes
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def to_internal(rule: WorkflowRule) -> WorkflowRuleInternal:
+    """Convert a stored rule to the internal model rules are compiled from."""
+    return WorkflowRuleInternal(
+        id=str(rule.id),
+        name=rule.name,
+        description=rule.description,
+        trigger=WorkflowTrigger(rule.trigger.value),
+        conditions=rule.conditions or {},
+        actions=rule.actions or {},
+        active=rule.active,
+        created_at=rule.created_at.isoformat() if rule.created_at else "",
+        updated_at=rule.updated_at.isoformat() if rule.updated_at else None
+    )
+
+
+class WorkflowRuleSet:
+    """This worker's compiled copy of the workflow rules."""
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self.index = RuleIndex(())
+        self.version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild the compiled rules if the stored version moved. Returns True if rebuilt."""
+        with self._lock:
+            db = self.session_factory()
+            try:
+                repo = WorkflowRepository(db)
+                version = repo.get_version()
+                if version == self.version and not force:
+                    return False
+                rules = [to_internal(rule) for rule in repo.get_all_in_order()]
+            finally:
+                db.close()
+
+            # Build aside and swap, so events in flight always see a whole rule set
+            self.index = RuleIndex(rules)
+            self.version = version
+        logger.info("Compiled %s active workflow rules (version %s)", self.index.size, version)
+        return True
+
+
+# Rule set shared by the workflow engine of this worker
+workflow_rule_set = WorkflowRuleSet()
+
+
+# Workflow trigger fired by each ticket event type
+EVENT_TRIGGERS = {
+    EventTypes.TICKET_CREATED: WorkflowTrigger.TICKET_CREATED,
+    EventTypes.TICKET_UPDATED: WorkflowTrigger.TICKET_UPDATED,
+    EventTypes.TICKET_STATUS_CHANGED: WorkflowTrigger.STATUS_CHANGED,
+    EventTypes.TICKET_SLA_BREACHED: WorkflowTrigger.SLA_BREACHED,
+}
+
+
+class WorkflowEngine:
+    """Submits the actions of workflow rules matching ticket events."""
+
+    def __init__(self, rule_set: WorkflowRuleSet, executor: WorkflowActionExecutor,
+                 max_depth: int = 3, subscribe: bool = True):
+        self.rule_set = rule_set
+        self.executor = executor
+        self.max_depth = max_depth
+        if subscribe:
+            self._setup_event_listeners()
+
+    def _setup_event_listeners(self):
+        """Setup event listeners for workflow triggers."""
+        event_bus.subscribe(EventTypes.TICKET_CREATED, self._handle_ticket_created)
+        event_bus.subscribe(EventTypes.TICKET_UPDATED, self._handle_ticket_updated)
+        event_bus.subscribe(EventTypes.TICKET_STATUS_CHANGED, self._handle_status_changed)
+        event_bus.subscribe(EventTypes.TICKET_SLA_BREACHED, self._handle_sla_breached)
+
+    def _handle_ticket_created(self, event_data: Dict):
+        """Handle ticket created event."""
+        self._process_rules(WorkflowTrigger.TICKET_CREATED, event_data)
+
+    def _handle_ticket_updated(self, event_data: Dict):
+        """Handle ticket updated event."""
+        self._process_rules(WorkflowTrigger.TICKET_UPDATED, event_data)
+
+    def _handle_status_changed(self, event_data: Dict):
+        """Handle ticket status changed event."""
+        self._process_rules(WorkflowTrigger.STATUS_CHANGED, event_data)
+
+    def _handle_sla_breached(self, event_data: Dict):
+        """Handle SLA breach event."""
+        self._process_rules(WorkflowTrigger.SLA_BREACHED, event_data)
+
+    def process_event(self, event_data: Dict):
+        """Process rules for an event without going through the event bus."""
+        trigger = EVENT_TRIGGERS.get(event_data["type"])
+        if trigger is not None:
+            self._process_rules(trigger, event_data)
+
+    def _process_rules(self, trigger: WorkflowTrigger, event_data: Dict):
+        """Process workflow rules for a given trigger.
+
+        Only rules the index finds matching are visited, so the cost does not
+        grow with the number of rules that cannot apply. Events caused by a
+        chain of max_depth rule actions match nothing, which ends rule loops.
+        """
+        depth = event_data["data"].get("workflow_depth", 0)
+        if depth >= self.max_depth:
+            metrics.increment("workflow_depth_limited")
+            logger.warning("Workflow depth limit reached for ticket %s", event_data["data"].get("ticket_id"))
+            return
+
+        for rule in self.rule_set.index.match(trigger, event_data["data"]):
+            try:
+                logger.info(f"Workflow rule '{rule.name}' matched for trigger {trigger}")
+                self.executor.submit(rule, event_data)
+            except Exception as e:
+                logger.error(f"Error processing workflow rule '{rule.name}': {e}")
+
+
+# Global workflow engine instance
+workflow_engine = WorkflowEngine(
+    workflow_rule_set, workflow_action_executor, max_depth=settings.WORKFLOW_MAX_DEPTH)
+
+
+class WorkflowServiceDB:
+    """Workflow rule management with database storage."""
+
+    def __init__(self, db: Session = Depends(get_db)):
+        self.db = db
+        self.workflow_repo = WorkflowRepository(db)
+
+    def _get_or_404(self, rule_id: str) -> WorkflowRule:
+        rule = self.workflow_repo.get_by_id(rule_id)
+        if not rule:
+            raise create_http_exception(
+                404,
+                ErrorCodes.E_WORKFLOW_NOT_FOUND,
+                "Workflow rule not found"
+            )
+        return rule
+
+    def create_rule(self, rule_data: WorkflowRuleCreate, created_by_id: str) -> WorkflowRuleInternal:
+        """Create a new workflow rule."""
+        rule = self.workflow_repo.create(rule_data, commit=False)
+        self.workflow_repo.bump_version()
+        self.db.commit()
+        workflow_rule_set.refresh()
+
+        logger.info(f"Created workflow rule: {rule.name} (ID: {rule.id})")
+        return to_internal(rule)
+
+    def get_rule(self, rule_id: str) -> Optional[WorkflowRuleInternal]:
+        """Get workflow rule by ID."""
+        rule = self.workflow_repo.get_by_id(rule_id)
+        return to_internal(rule) if rule else None
+
+    def get_all_rules(self) -> List[WorkflowRuleInternal]:
+        """Get all workflow rules."""
+        return [to_internal(rule) for rule in self.workflow_repo.get_all()]
+
+    def update_rule(self, rule_id: str, rule_data: WorkflowRuleUpdate, updated_by_id: str) -> WorkflowRuleInternal:
+        """Update workflow rule."""
+        self._get_or_404(rule_id)
+        rule = self.workflow_repo.update(rule_id, rule_data, commit=False)
+        self.workflow_repo.bump_version()
+        self.db.commit()
+        workflow_rule_set.refresh()
+        return to_internal(rule)
+
+    def delete_rule(self, rule_id: str, deleted_by_id: str) -> bool:
+        """Delete workflow rule."""
+        self._get_or_404(rule_id)
+        self.workflow_repo.delete(rule_id, commit=False)
+        self.workflow_repo.bump_version()
+        self.db.commit()
+        workflow_rule_set.refresh()
+        return True
+
+    def apply_rule(self, rule_id: str, applied_by_id: str, dry_run: bool = False) -> WorkflowApplyResponse:
+        """Apply a rule's actions to the existing tickets matching its conditions.
+
+        With dry_run only the matching tickets are counted.
+        """
+        rule = to_internal(self._get_or_404(rule_id))
+        try:
+            application = RuleApplication(
+                self.db, rule, applied_by_id, chunk_size=settings.WORKFLOW_APPLY_CHUNK_SIZE)
+        except ValueError as e:
+            raise create_http_exception(400, ErrorCodes.E_WORKFLOW_INVALID_RULE, str(e))
+
+        user_repo = UserRepository(self.db)
+        missing = [user_id for user_id in application.assignee_ids if not user_repo.get_by_id(user_id)]
+        if missing:
+            raise create_http_exception(
+                400,
+                ErrorCodes.E_WORKFLOW_INVALID_RULE,
+                "Rule assigns users that do not exist",
+                {"userIds": missing}
+            )
+
+        if dry_run:
+            return WorkflowApplyResponse(dryRun=True, matched=application.count(),
+                                         skippedActions=application.skipped_actions)
+
+        result = application.run()
+        logger.info("Applied workflow rule '%s' to %s existing tickets", rule.name, result["matched"])
+        return WorkflowApplyResponse(
+            dryRun=False,
+            matched=result["matched"],
+            updated=result["updated"],
+            historyEntries=result["history_entries"],
+            comments=result["comments"],
+            chunks=result["chunks"],
+            skippedActions=application.skipped_actions
+        )
+
+
+def get_workflow_service(db: Session = Depends(get_db)) -> WorkflowServiceDB:
+    """Get workflow service instance."""
+    return WorkflowServiceDB(db)
@@ -0,0 +1,99 @@
+"""Benchmark of workflow rule matching as the number of rules grows.
+
+Compares the compiled rule index with a scan of every rule, using
+department-specific rules like a large installation would have.
+
+Usage:
+    python -m app.tools.bench_workflow_rules [events]
+"""
+
+import sys
+import time
+from typing import List
+
+from app.models.workflow import WorkflowRuleInternal, WorkflowTrigger
+from app.services.workflow_index import RuleIndex, conditions_match
+
+RULE_COUNTS = (10, 100, 1000, 10000, 50000)
+PRIORITIES = ("low", "medium", "high", "critical")
+TRIGGERS = tuple(WorkflowTrigger)
+
+
+def make_rules(count: int) -> List[WorkflowRuleInternal]:
+    """Rules spread over departments, priorities and triggers."""
+    return [
+        WorkflowRuleInternal(
+            id=str(index),
+            name=f"rule-{index}",
+            trigger=TRIGGERS[index % len(TRIGGERS)],
+            conditions={"department": f"dept-{index // 4 % max(count // 8, 1)}",
+                        "priority": PRIORITIES[index % len(PRIORITIES)]},
+            actions={"send_notification": "team"},
+            active=True,
+            created_at="2024-01-01T00:00:00",
+        )
+        for index in range(count)
+    ]
+
+
+def make_events(count: int) -> List[dict]:
+    """Ticket event payloads as published by the ticket service."""
+    return [
+        {"ticket_id": f"t{index}", "ticket_key": f"TKT-{index}", "reporter_id": "u1",
+         "assignee_ids": ["u2"], "department": f"dept-{index % 97}",
+         "priority": PRIORITIES[index % len(PRIORITIES)], "status": "open"}
+        for index in range(count)
+    ]
+
+
+def scan(rules: List[WorkflowRuleInternal], trigger: WorkflowTrigger, context: dict) -> list:
+    """Matching as done before the index: every rule, every event."""
+    return [rule for rule in rules
+            if rule.active and rule.trigger == trigger and conditions_match(rule.conditions, context)]
+
+
+def bench(events: int = 2000) -> List[dict]:
+    """Time per-event matching with the index and with a full scan."""
+    payloads = make_events(events)
+    results = []
+    for count in RULE_COUNTS:
+        rules = make_rules(count)
+        started = time.perf_counter()
+        index = RuleIndex(rules)
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        indexed_matches = sum(len(index.match(WorkflowTrigger.TICKET_CREATED, payload))
+                              for payload in payloads)
+        indexed = (time.perf_counter() - started) / events
+
+        # Scanning 50k rules per event is slow; a sample is enough to time it
+        sample = payloads[:max(events * 10 // count, 20)]
+        started = time.perf_counter()
+        scanned_matches = sum(len(scan(rules, WorkflowTrigger.TICKET_CREATED, payload))
+                              for payload in sample)
+        scanned = (time.perf_counter() - started) / len(sample)
+
+        indexed_sample = sum(len(index.match(WorkflowTrigger.TICKET_CREATED, payload))
+                             for payload in sample)
+        assert indexed_sample == scanned_matches, "index and scan disagree"
+        results.append({
+            "rules": count,
+            "build_ms": build * 1e3,
+            "indexed_us": indexed * 1e6,
+            "scan_us": scanned * 1e6,
+            "matches_per_event": indexed_matches / events,
+        })
+    return results
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{'rules':>8} {'build ms':>10} {'indexed us/event':>18} {'scan us/event':>15} {'matches':>8}")
+    for result in bench(events):
+        print(f"{result['rules']:>8} {result['build_ms']:>10.1f} {result['indexed_us']:>18.2f} "
+              f"{result['scan_us']:>15.1f} {result['matches_per_event']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Report bytes per ticket history entry, legacy versus compact format.
+
+Usage:
+    python -m app.tools.history_storage_report
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import select
+
+from app.database.base import SessionLocal
+from app.database.history_partitions import history_tables
+from app.database.types import encode_text
+
+# Fixed column widths in bytes
+UUID_BYTES = 36
+TIMESTAMP_BYTES = 8
+LEGACY_KEY_BYTES = UUID_BYTES
+COMPACT_KEY_BYTES = 8
+COMPACT_ACTION_BYTES = 2
+
+
+def _text_bytes(value: Optional[str]) -> int:
+    return len(value.encode("utf-8")) if value is not None else 0
+
+
+def _stored_bytes(value: Optional[str]) -> int:
+    encoded = encode_text(value)
+    return len(encoded) if encoded is not None else 0
+
+
+def legacy_entry_bytes(action: str, old_value: Optional[str], new_value: Optional[str]) -> int:
+    """Payload bytes of an entry in the legacy layout (UUID key, text action, raw text)."""
+    return (LEGACY_KEY_BYTES + 2 * UUID_BYTES + _text_bytes(action)
+            + _text_bytes(old_value) + _text_bytes(new_value) + TIMESTAMP_BYTES)
+
+
+def compact_entry_bytes(old_value: Optional[str], new_value: Optional[str]) -> int:
+    """Payload bytes of an entry in the compact layout."""
+    return (COMPACT_KEY_BYTES + 2 * UUID_BYTES + COMPACT_ACTION_BYTES
+            + _stored_bytes(old_value) + _stored_bytes(new_value) + TIMESTAMP_BYTES)
+
+
+def build_report(entries: Iterable) -> Dict[str, Dict[str, float]]:
+    """Aggregate legacy and compact sizes per action plus an overall total.
+
+    Each entry needs ``action``, ``old_value`` and ``new_value`` attributes.
+    """
+    totals = defaultdict(lambda: {"entries": 0, "legacy_bytes": 0, "compact_bytes": 0})
+    for entry in entries:
+        action = getattr(entry.action, "value", entry.action)
+        legacy = legacy_entry_bytes(action, entry.old_value, entry.new_value)
+        compact = compact_entry_bytes(entry.old_value, entry.new_value)
+        for key in (action, "all"):
+            totals[key]["entries"] += 1
+            totals[key]["legacy_bytes"] += legacy
+            totals[key]["compact_bytes"] += compact
+
+    report = {}
+    for key, total in totals.items():
+        count = total["entries"]
+        report[key] = {
+            "entries": count,
+            "legacy_bytes_per_entry": total["legacy_bytes"] / count,
+            "compact_bytes_per_entry": total["compact_bytes"] / count,
+            "ratio": total["compact_bytes"] / total["legacy_bytes"],
+        }
+    return report
+
+
+def format_report(report: Dict[str, Dict[str, float]]) -> str:
+    """Render the report as a plain-text table."""
+    lines = [f"{'action':<22}{'entries':>9}{'before B/entry':>16}{'after B/entry':>15}{'ratio':>8}"]
+    for key in sorted(report, key=lambda k: (k == "all", k)):
+        row = report[key]
+        lines.append(
+            f"{key:<22}{row['entries']:>9}{row['legacy_bytes_per_entry']:>16.1f}"
+            f"{row['compact_bytes_per_entry']:>15.1f}{row['ratio']:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    db = SessionLocal()
+    try:
+        entries = []
+        for table in history_tables(db):
+            entries.extend(db.execute(
+                select(table.c.action, table.c.old_value, table.c.new_value)
+            ).all())
+    finally:
+        db.close()
+
+    if not entries:
+        print("No ticket history entries found.")
+        return
+    print(format_report(build_report(entries)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Replay stored ticket history through the workflow engine.
+
+Each ticket is rewound from its current row to its initial state with the
+old values in its history, then walked forward: the ``created`` entry
+becomes a ``ticket.created`` event and each update (consecutive entries by
+the same user at the same time) a ``ticket.updated`` event, plus
+``ticket.status_changed`` when it changed the status. Events carry the
+same data the ticket service publishes and go through the real
+WorkflowEngine, but actions are only counted, never executed, so follow-on
+events from actions are not simulated.
+
+Rules are the stored ones, or a JSON file with a list of rule objects as
+accepted by ``POST /workflows`` to try a rule set before creating it.
+
+Usage:
+    python -m app.tools.workflow_sim [--rules rules.json] [--include-inactive] [--limit N]
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database.base import SessionLocal
+from app.database.models import Ticket, TicketHistoryAction, ticket_assignees
+from app.database.repositories.ticket_repository import TicketHistoryRepository
+from app.database.repositories.workflow_repository import WorkflowRepository
+from app.models.workflow import WorkflowAction, WorkflowRuleCreate, WorkflowRuleInternal
+from app.services.ticket_service_db import HISTORY_ACTION_FIELDS
+from app.services.workflow_index import RuleIndex
+from app.services.workflow_service_db import WorkflowEngine, WorkflowRuleSet, to_internal
+from app.utils.events import EventTypes
+
+# Ticket field names as they appear in ticket.updated changes
+CHANGE_FIELDS = {"assignee_ids": "assignees"}
+
+
+class ActionRecorder:
+    """Executor stand-in counting what matched rules would have done."""
+
+    def __init__(self):
+        self.matches: Counter = Counter()
+        self.actions: Dict[str, Counter] = {}
+
+    def submit(self, rule: WorkflowRuleInternal, event: Dict[str, Any]) -> int:
+        self.matches[rule.id] += 1
+        actions = self.actions.setdefault(rule.id, Counter())
+        for name in rule.actions:
+            actions[name if name in WorkflowAction._value2member_map_ else f"{name} (unknown)"] += 1
+        return len(rule.actions)
+
+
+def load_rules(db: Session, path: Optional[str], include_inactive: bool) -> List[WorkflowRuleInternal]:
+    """Load the stored rules, or the rules in a JSON file."""
+    if path:
+        with open(path) as f:
+            rules = [
+                WorkflowRuleInternal(id=f"file-{index}", created_at="",
+                                     **WorkflowRuleCreate(**data).model_dump())
+                for index, data in enumerate(json.load(f))
+            ]
+    else:
+        rules = [to_internal(rule) for rule in WorkflowRepository(db).get_all_in_order()]
+    if include_inactive:
+        rules = [rule.model_copy(update={"active": True}) for rule in rules]
+    return rules
+
+
+def _ticket_states(db: Session, ticket_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Current event-relevant state of tickets."""
+    states = {
+        str(row.id): {"ticket_id": str(row.id), "ticket_key": row.key,
+                      "reporter_id": str(row.reporter_id), "assignee_ids": [],
+                      "department": row.department, "priority": row.priority.value,
+                      "status": row.status.value}
+        for row in db.query(Ticket.id, Ticket.key, Ticket.reporter_id, Ticket.department,
+                            Ticket.priority, Ticket.status).filter(Ticket.id.in_(ticket_ids))
+    }
+    for ticket_id, user_id in db.query(ticket_assignees.c.ticket_id, ticket_assignees.c.user_id).filter(
+            ticket_assignees.c.ticket_id.in_(ticket_ids)):
+        states[str(ticket_id)]["assignee_ids"].append(str(user_id))
+    return states
+
+
+def _set(state: Dict[str, Any], entry, value: Optional[str]):
+    field = HISTORY_ACTION_FIELDS.get(entry.action)
+    if field == "assignee_ids":
+        state[field] = sorted(v for v in (value or "").split(",") if v)
+    elif field in state:
+        state[field] = value
+
+
+def _group_updates(entries: Iterable) -> Iterator[List[Any]]:
+    """Group a ticket's entries into the updates that wrote them."""
+    group: List[Any] = []
+    for entry in entries:
+        if group and (entry.action == TicketHistoryAction.CREATED
+                      or group[0].action == TicketHistoryAction.CREATED
+                      or entry.user_id != group[0].user_id
+                      or entry.created_at != group[0].created_at
+                      or entry.action in {e.action for e in group}):
+            yield group
+            group = []
+        group.append(entry)
+    if group:
+        yield group
+
+
+def ticket_events(state: Dict[str, Any], entries: List[Any]) -> Iterator[Dict[str, Any]]:
+    """Synthetic events for one ticket's history, given its current state."""
+    state = dict(state)
+    for entry in reversed(entries):
+        _set(state, entry, entry.old_value)
+
+    for group in _group_updates(entries):
+        first = group[0]
+        timestamp = first.created_at.isoformat() if first.created_at else None
+        if first.action == TicketHistoryAction.CREATED:
+            yield {"type": EventTypes.TICKET_CREATED, "timestamp": timestamp, "data": dict(state)}
+            continue
+
+        old_status = state["status"]
+        changes = []
+        for entry in group:
+            field = HISTORY_ACTION_FIELDS.get(entry.action)
+            _set(state, entry, entry.new_value)
+            changes.append({"field": CHANGE_FIELDS.get(field, field),
+                            "old": entry.old_value, "new": entry.new_value})
+        yield {"type": EventTypes.TICKET_UPDATED, "timestamp": timestamp,
+               "data": {**state, "updated_by": str(first.user_id), "changes": changes}}
+        if state["status"] != old_status:
+            yield {"type": EventTypes.TICKET_STATUS_CHANGED, "timestamp": timestamp,
+                   "data": {"ticket_id": state["ticket_id"], "old_status": old_status,
+                            "new_status": state["status"], "updated_by": str(first.user_id),
+                            "department": state["department"], "priority": state["priority"]}}
+
+
+def history_events(db: Session, chunk_size: int = 500,
+                   limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Synthetic events for stored tickets, a chunk of tickets at a time."""
+    history = TicketHistoryRepository(db)
+    last_id, seen = "", 0
+    while limit is None or seen < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - seen)
+        ticket_ids = [ticket_id for (ticket_id,) in db.query(Ticket.id).filter(
+            Ticket.id > last_id).order_by(Ticket.id).limit(size)]
+        if not ticket_ids:
+            return
+        last_id = ticket_ids[-1]
+        seen += len(ticket_ids)
+
+        states = _ticket_states(db, ticket_ids)
+        by_ticket: Dict[str, List[Any]] = {}
+        for entry in history.get_by_ticket_ids(ticket_ids):
+            by_ticket.setdefault(str(entry.ticket_id), []).append(entry)
+        for ticket_id in ticket_ids:
+            yield from ticket_events(states[ticket_id], by_ticket.get(ticket_id, []))
+
+
+def simulate(db: Session, rules: List[WorkflowRuleInternal], limit: Optional[int] = None) -> Dict[str, Any]:
+    """Replay history against rules. Returns per-rule counts and throughput."""
+    rule_set = WorkflowRuleSet()
+    rule_set.index = RuleIndex(rules)
+    recorder = ActionRecorder()
+    engine = WorkflowEngine(rule_set, recorder, subscribe=False)
+
+    events: Counter = Counter()
+    evaluating = 0.0
+    started = time.perf_counter()
+    for event in history_events(db, limit=limit):
+        events[event["type"]] += 1
+        before = time.perf_counter()
+        engine.process_event(event)
+        evaluating += time.perf_counter() - before
+    elapsed = time.perf_counter() - started
+
+    total = sum(events.values())
+    return {
+        "events": dict(events),
+        "rules": [
+            {"id": rule.id, "name": rule.name, "trigger": rule.trigger.value,
+             "active": rule.active, "matches": recorder.matches[rule.id],
+             "actions": dict(recorder.actions.get(rule.id, {}))}
+            for rule in rules
+        ],
+        "elapsed_s": elapsed,
+        "evaluation_s": evaluating,
+        "events_per_second": total / evaluating if evaluating else 0.0,
+        "replay_events_per_second": total / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", help="JSON file with a list of rules to simulate instead of the stored ones")
+    parser.add_argument("--include-inactive", action="store_true", help="simulate inactive rules as if active")
+    parser.add_argument("--limit", type=int, help="replay at most this many tickets")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rules = load_rules(db, args.rules, args.include_inactive)
+        result = simulate(db, rules, limit=args.limit)
+    finally:
+        db.close()
+
+    print(f"{'rule':<32} {'trigger':<16} {'matches':>8}  actions")
+    for rule in result["rules"]:
+        name = rule["name"] if rule["active"] else f"{rule['name']} (inactive)"
+        actions = ", ".join(f"{action}={count}" for action, count in sorted(rule["actions"].items()))
+        print(f"{name[:32]:<32} {rule['trigger']:<16} {rule['matches']:>8}  {actions or '-'}")
+    print()
+    print("events: " + ", ".join(f"{event_type}={count}" for event_type, count in sorted(result["events"].items())))
+    print(f"evaluation: {result['events_per_second']:,.0f} events/s "
+          f"({result['evaluation_s'] * 1e3:.1f} ms); "
+          f"replay including history reads: {result['replay_events_per_second']:,.0f} events/s "
+          f"({result['elapsed_s']:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Periodic background tasks run inside the API process."""
+
+import asyncio
+import logging
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run a blocking function every ``interval`` seconds off the event loop."""
+
+    def __init__(self, name: str, interval: float, func: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.func)
+            except Exception:
+                logger.exception("Periodic task '%s' failed", self.name)
+
+    def start(self):
+        """Start the task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self):
+        """Cancel the task and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+class BackgroundTasks:
+    """Registry of periodic tasks started and stopped with the application."""
+
+    def __init__(self):
+        self.tasks: List[PeriodicTask] = []
+
+    def add(self, name: str, interval: float, func: Callable[[], None]) -> PeriodicTask:
+        """Register a periodic task."""
+        task = PeriodicTask(name, interval, func)
+        self.tasks.append(task)
+        return task
+
+    def start(self):
+        """Start all registered tasks."""
+        for task in self.tasks:
+            task.start()
+
+    async def stop(self):
+        """Stop all registered tasks."""
+        for task in self.tasks:
+            await task.stop()
+
+
+# Global background task registry
+background_tasks = BackgroundTasks()
@@ -0,0 +1,52 @@
+"""Streaming compression codecs for stored attachments.
+
+gzip comes from the standard library; zstd needs the optional zstandard
+package. Nothing from the application is imported, so preview worker
+processes can read compressed blobs too.
+"""
+
+import gzip
+from typing import BinaryIO, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; gzip is used without it
+    zstandard = None
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+# File suffix of a blob stored with each encoding
+SUFFIXES = {GZIP: ".gz", ZSTD: ".zst"}
+
+
+def is_available(encoding: str) -> bool:
+    """Check whether an encoding can be used in this environment."""
+    return encoding == GZIP or (encoding == ZSTD and zstandard is not None)
+
+
+def open_writer(f: BinaryIO, encoding: str) -> BinaryIO:
+    """Wrap a binary file so data written to it is compressed.
+
+    Closing the wrapper finishes the stream but leaves f open.
+    """
+    if encoding == GZIP:
+        # mtime=0 keeps the output a function of the content alone
+        return gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6, mtime=0)
+    if encoding == ZSTD:
+        return zstandard.ZstdCompressor(level=3).stream_writer(f, closefd=False)
+    raise ValueError(f"Unsupported encoding: {encoding!r}")
+
+
+def open_reader(f: BinaryIO, encoding: Optional[str]) -> BinaryIO:
+    """Wrap a binary file so reads return decompressed data.
+
+    read(n) returns at most n bytes, however well the data compressed.
+    """
+    if encoding is None:
+        return f
+    if encoding == GZIP:
+        return gzip.GzipFile(fileobj=f, mode="rb")
+    if encoding == ZSTD:
+        return zstandard.ZstdDecompressor().stream_reader(f, closefd=False)
+    raise ValueError(f"Unsupported encoding: {encoding!r}")
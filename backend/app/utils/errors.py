@@ -22,6 +22,7 @@ class ErrorCodes:
     E_TICKET_NOT_FOUND = "E_TICKET_NOT_FOUND"
     E_TICKET_INVALID_STATUS_TRANSITION = "E_TICKET_INVALID_STATUS_TRANSITION"
     E_TICKET_INVALID_ASSIGNEE = "E_TICKET_INVALID_ASSIGNEE"
+    E_COMMENT_NOT_FOUND = "E_COMMENT_NOT_FOUND"
     
     # Project errors
     E_PROJECT_NOT_FOUND = "E_PROJECT_NOT_FOUND"
@@ -31,9 +32,19 @@ class ErrorCodes:
     E_WORKFLOW_NOT_FOUND = "E_WORKFLOW_NOT_FOUND"
     E_WORKFLOW_INVALID_RULE = "E_WORKFLOW_INVALID_RULE"
     
+    # Attachment errors
+    E_ATTACHMENT_NOT_FOUND = "E_ATTACHMENT_NOT_FOUND"
+    E_ATTACHMENT_TOO_LARGE = "E_ATTACHMENT_TOO_LARGE"
+    E_ATTACHMENT_RANGE_NOT_SATISFIABLE = "E_ATTACHMENT_RANGE_NOT_SATISFIABLE"
+    E_UPLOAD_NOT_FOUND = "E_UPLOAD_NOT_FOUND"
+    E_PREVIEW_UNAVAILABLE = "E_PREVIEW_UNAVAILABLE"
+    E_UPLOAD_INCOMPLETE = "E_UPLOAD_INCOMPLETE"
+    
     # General errors
     E_VALIDATION_ERROR = "E_VALIDATION_ERROR"
     E_INTERNAL_ERROR = "E_INTERNAL_ERROR"
+    E_SERVICE_BUSY = "E_SERVICE_BUSY"
+    E_RATE_LIMITED = "E_RATE_LIMITED"
 
 
 def build_error_response(
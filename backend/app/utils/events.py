@@ -1,46 +1,342 @@
-"""Simple event bus for application events."""
+"""Simple event bus for application events.
 
+In ``sync`` mode listeners run inside ``publish``, which keeps tests
+deterministic. In ``async`` mode every listener has its own bounded queue
+and worker thread, so publishing only enqueues. When a listener's queue is
+full the backpressure policy decides what happens:
+
+- ``block``: the publisher waits for room
+- ``drop``: the event is discarded for that listener and counted
+- ``spill``: the event is appended to a file and delivered once the queue drains
+
+Event types can opt in to coalescing: events of that type sharing a key
+are held for a short window and merged into one before any listener sees
+them. Events a barrier function flags are never merged; they flush the
+held event for their key and are dispatched straight away. The outbox
+relay flushes held events after each batch it publishes, so only events
+relayed in the same batch are merged.
+"""
+
+import json
 import logging
-from typing import Dict, Any, List, Callable
+import os
+import queue
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Hashable, List, Callable, Optional
 from datetime import datetime
 
+from app.core.config import settings
+from app.utils.metrics import metrics
+
 logger = logging.getLogger(__name__)
 
+BACKPRESSURE_POLICIES = ("block", "drop", "spill")
+
+# Sentinel telling a listener worker to exit
+_STOP = object()
+
+
+class SpillFile:
+    """Append-only overflow file of JSON-encoded events."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+
+    def append(self, event: Dict[str, Any]):
+        with open(self.path, "a", encoding="utf-8") as spill:
+            spill.write(json.dumps(event, default=str) + "\n")
+        self.count += 1
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Read and remove every spilled event, oldest first."""
+        if not self.count:
+            return []
+        with open(self.path, "r", encoding="utf-8") as spill:
+            events = [json.loads(line) for line in spill if line.strip()]
+        os.remove(self.path)
+        self.count = 0
+        return events
+
+
+class Listener:
+    """A subscribed callback and, in async mode, its queue and worker."""
+
+    def __init__(self, callback: Callable, batch: bool, name: str):
+        self.callback = callback
+        self.batch = batch
+        self.name = name
+        self.queue: Optional[queue.Queue] = None
+        self.spill: Optional[SpillFile] = None
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+    def deliver(self, events: List[Dict[str, Any]]):
+        """Call the listener with a batch of events, isolating its failures."""
+        started = time.perf_counter()
+        try:
+            if self.batch:
+                self.callback(events)
+            else:
+                for event in events:
+                    try:
+                        self.callback(event)
+                    except Exception as e:
+                        logger.error("Error in event listener %s for %s: %s", self.name, event["type"], e)
+        except Exception as e:
+            logger.error("Error in batch event listener %s: %s", self.name, e)
+        finally:
+            metrics.observe(f"event_listener.{self.name}", time.perf_counter() - started)
+
+
+class Coalescer:
+    """Merges events of one type that share a key within a time window."""
+
+    def __init__(self, window: float, key: Callable[[Dict[str, Any]], Hashable],
+                 merge: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]],
+                 barrier: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.key = key
+        self.merge = merge
+        self.barrier = barrier
+        self.clock = clock
+        # key -> [deadline, event, merged event count]
+        self._pending: Dict[Hashable, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _finish(pending: List[Any]) -> Dict[str, Any]:
+        event = pending[1]
+        if pending[2] > 1:
+            event["coalesced"] = pending[2]
+        return event
+
+    def add(self, event: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Hold an event for merging. Returns the events to dispatch now, in order."""
+        key = self.key(event["data"])
+        with self._lock:
+            pending = self._pending.get(key)
+            if self.barrier is not None and self.barrier(event["data"]):
+                ready = [self._finish(self._pending.pop(key))] if pending else []
+                ready.append(event)
+                return ready
+            if pending is None:
+                self._pending[key] = [self.clock() + self.window, event, 1]
+            else:
+                pending[1] = dict(event, data=self.merge(pending[1]["data"], event["data"]))
+                pending[2] += 1
+                metrics.increment("events_coalesced")
+            return []
+
+    def due(self, force: bool = False) -> List[Dict[str, Any]]:
+        """Remove and return the events whose window has closed (all if force)."""
+        now = self.clock()
+        with self._lock:
+            keys = [key for key, pending in self._pending.items() if force or pending[0] <= now]
+            return [self._finish(self._pending.pop(key)) for key in keys]
+
+    def next_deadline(self) -> Optional[float]:
+        """Get the earliest window close, or None when nothing is held."""
+        with self._lock:
+            return min((pending[0] for pending in self._pending.values()), default=None)
+
 
 class EventBus:
-    """Simple in-memory event bus."""
-    
-    def __init__(self):
-        self.listeners: Dict[str, List[Callable]] = {}
-    
-    def subscribe(self, event_type: str, callback: Callable):
-        """Subscribe to an event type."""
-        if event_type not in self.listeners:
-            self.listeners[event_type] = []
-        self.listeners[event_type].append(callback)
-    
-    def publish(self, event_type: str, data: Dict[str, Any]):
-        """Publish an event."""
+    """In-process event bus with sync and async delivery."""
+
+    def __init__(self, mode: str = "sync", queue_size: int = 1000, backpressure: str = "block",
+                 batch_size: int = 50, spill_dir: Optional[str] = None):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
+        self.mode = mode
+        self.queue_size = queue_size
+        self.backpressure = backpressure
+        self.batch_size = batch_size
+        self.spill_dir = spill_dir or tempfile.gettempdir()
+        self.listeners: Dict[str, List[Listener]] = {}
+        self.coalescers: Dict[str, Coalescer] = {}
+        self._lock = threading.Lock()
+        self._flush_condition = threading.Condition()
+        self._flusher: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def subscribe(self, event_type: str, callback: Callable, batch: bool = False):
+        """Subscribe to an event type.
+
+        Batch listeners receive a list of events per call instead of one.
+        """
+        name = getattr(callback, "__qualname__", repr(callback))
+        listener = Listener(callback, batch, f"{event_type}:{name}")
+        if self.mode == "async":
+            self._start_worker(listener)
+        with self._lock:
+            self.listeners.setdefault(event_type, []).append(listener)
+
+    def coalesce(self, event_type: str, window: float, key: Callable[[Dict[str, Any]], Hashable],
+                 merge: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]],
+                 barrier: Optional[Callable[[Dict[str, Any]], bool]] = None):
+        """Merge events of a type that share key(data) within window seconds.
+
+        merge(earlier_data, later_data) returns the combined data. Events
+        for which barrier(data) is true are never held or merged.
+        """
+        self.coalescers[event_type] = Coalescer(window, key, merge, barrier)
+        if self._flusher is None:
+            self._stopping = False
+            self._flusher = threading.Thread(
+                target=self._run_flusher, name="events-coalesce", daemon=True)
+            self._flusher.start()
+
+    def publish(self, event_type: str, data: Dict[str, Any], timestamp: Optional[str] = None,
+                event_id: Optional[int] = None):
+        """Publish an event.
+
+        Events relayed from the outbox keep their recorded timestamp and id.
+        """
         event_data = {
             "type": event_type,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": timestamp or datetime.utcnow().isoformat(),
             "data": data
         }
-        
-        # Log the event (stub implementation)
-        logger.info(f"Event published: {event_type} - {data}")
-        
-        # Call registered listeners
-        if event_type in self.listeners:
-            for callback in self.listeners[event_type]:
-                try:
-                    callback(event_data)
-                except Exception as e:
-                    logger.error(f"Error in event listener for {event_type}: {e}")
+        if event_id is not None:
+            event_data["id"] = event_id
+
+        logger.debug("Event published: %s - %s", event_type, data)
+        metrics.increment("events_published")
+
+        coalescer = self.coalescers.get(event_type)
+        if coalescer is None:
+            self._dispatch(event_type, event_data)
+            return
+
+        ready = coalescer.add(event_data)
+        if ready:
+            for event in ready:
+                self._dispatch(event_type, event)
+        else:
+            with self._flush_condition:
+                self._flush_condition.notify()
+
+    def _dispatch(self, event_type: str, event_data: Dict[str, Any]):
+        for listener in self.listeners.get(event_type, ()):
+            if listener.queue is None:
+                listener.deliver([event_data])
+            else:
+                self._enqueue(listener, event_data)
+
+    def flush_coalesced(self, force: bool = True) -> int:
+        """Dispatch held events (only those whose window closed unless force)."""
+        dispatched = 0
+        for event_type, coalescer in list(self.coalescers.items()):
+            for event in coalescer.due(force):
+                self._dispatch(event_type, event)
+                dispatched += 1
+        return dispatched
+
+    def _run_flusher(self):
+        while True:
+            with self._flush_condition:
+                if self._stopping:
+                    return
+                deadlines = [deadline for deadline in (
+                    coalescer.next_deadline() for coalescer in self.coalescers.values())
+                    if deadline is not None]
+                timeout = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+                self._flush_condition.wait(timeout)
+                if self._stopping:
+                    return
+            self.flush_coalesced(force=False)
+
+    def _enqueue(self, listener: Listener, event: Dict[str, Any]):
+        if self.backpressure == "spill":
+            with listener.lock:
+                # Once spilling, keep spilling until the worker catches up so order holds
+                if not listener.spill.count:
+                    try:
+                        listener.queue.put_nowait(event)
+                        return
+                    except queue.Full:
+                        pass
+                listener.spill.append(event)
+            metrics.increment("events_spilled")
+        elif self.backpressure == "drop":
+            try:
+                listener.queue.put_nowait(event)
+            except queue.Full:
+                metrics.increment("events_dropped")
+                return
+        else:
+            listener.queue.put(event)
+        metrics.set_gauge(f"event_queue_depth.{listener.name}", listener.queue.qsize())
+
+    def _start_worker(self, listener: Listener):
+        listener.queue = queue.Queue(maxsize=self.queue_size)
+        if self.backpressure == "spill":
+            safe_name = "".join(c if c.isalnum() else "_" for c in listener.name)
+            listener.spill = SpillFile(os.path.join(
+                self.spill_dir, f"events-{os.getpid()}-{id(listener)}-{safe_name}.jsonl"))
+        listener.thread = threading.Thread(
+            target=self._run_worker, args=(listener,), name=f"events-{listener.name}", daemon=True)
+        listener.thread.start()
+
+    def _next_batch(self, listener: Listener) -> List[Any]:
+        batch = [listener.queue.get()]
+        while len(batch) < self.batch_size and batch[-1] is not _STOP:
+            try:
+                batch.append(listener.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run_worker(self, listener: Listener):
+        while True:
+            batch = self._next_batch(listener)
+            stopping = batch[-1] is _STOP
+            events = [event for event in batch if event is not _STOP]
+
+            if listener.spill is not None and listener.queue.empty():
+                with listener.lock:
+                    events.extend(listener.spill.drain())
+
+            metrics.set_gauge(f"event_queue_depth.{listener.name}", listener.queue.qsize())
+            for start in range(0, len(events), self.batch_size):
+                listener.deliver(events[start:start + self.batch_size])
+            if stopping:
+                return
+
+    def stop(self, timeout: float = 5.0):
+        """Deliver held and queued events and stop the background threads."""
+        if self._flusher is not None:
+            with self._flush_condition:
+                self._stopping = True
+                self._flush_condition.notify()
+            self._flusher.join(timeout)
+            self._flusher = None
+        self.flush_coalesced()
+
+        for listeners in self.listeners.values():
+            for listener in listeners:
+                if listener.thread is not None:
+                    listener.queue.put(_STOP)
+        for listeners in self.listeners.values():
+            for listener in listeners:
+                if listener.thread is not None:
+                    listener.thread.join(timeout)
+                    listener.thread = None
+                    listener.queue = None
 
 
 # Global event bus instance
-event_bus = EventBus()
+event_bus = EventBus(
+    mode=settings.EVENT_BUS_MODE,
+    queue_size=settings.EVENT_BUS_QUEUE_SIZE,
+    backpressure=settings.EVENT_BUS_BACKPRESSURE,
+    batch_size=settings.EVENT_BUS_BATCH_SIZE,
+    spill_dir=settings.EVENT_BUS_SPILL_DIR or None,
+)
 
 
 # Event types
@@ -49,12 +345,42 @@ class EventTypes:
     USER_CREATED = "user.created"
     USER_UPDATED = "user.updated"
     USER_DELETED = "user.deleted"
-    
+
     TICKET_CREATED = "ticket.created"
     TICKET_UPDATED = "ticket.updated"
     TICKET_STATUS_CHANGED = "ticket.status_changed"
     TICKET_ASSIGNED = "ticket.assigned"
-    
+    TICKET_SLA_BREACHED = "ticket.sla_breached"
+
     PROJECT_CREATED = "project.created"
     PROJECT_UPDATED = "project.updated"
-    PROJECT_DELETED = "project.deleted"
\ No newline at end of file
+    PROJECT_DELETED = "project.deleted"
+
+
+def merge_ticket_updates(earlier: Dict[str, Any], later: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine two ticket.updated payloads, keeping each field's first old and last new value."""
+    merged = dict(later)
+    changes = {change["field"]: dict(change) for change in earlier.get("changes", [])}
+    for change in later.get("changes", []):
+        if change["field"] in changes:
+            changes[change["field"]]["new"] = change["new"]
+        else:
+            changes[change["field"]] = dict(change)
+    merged["changes"] = list(changes.values())
+    return merged
+
+
+def has_status_change(data: Dict[str, Any]) -> bool:
+    """Check whether a ticket.updated payload changes the ticket's status."""
+    return any(change["field"] == "status" for change in data.get("changes", ()))
+
+
+# Autosaved edits produce bursts of updates; merge them per ticket and editor
+if settings.EVENT_COALESCE_WINDOW_SECONDS > 0:
+    event_bus.coalesce(
+        EventTypes.TICKET_UPDATED,
+        settings.EVENT_COALESCE_WINDOW_SECONDS,
+        key=lambda data: (data.get("ticket_id"), data.get("updated_by")),
+        merge=merge_ticket_updates,
+        barrier=has_status_change,
+    )
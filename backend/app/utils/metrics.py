@@ -0,0 +1,56 @@
+"""Lightweight in-process metrics registry."""
+
+import threading
+from typing import Any, Callable, Dict
+
+
+class Metrics:
+    """Counters, gauges and timings, plus collectors computed on read."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def increment(self, name: str, value: float = 1):
+        """Increment a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        """Set a gauge to its current value."""
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        """Record a duration."""
+        with self._lock:
+            timing = self.timings.setdefault(
+                name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            timing["count"] += 1
+            timing["total_seconds"] += seconds
+            timing["max_seconds"] = max(timing["max_seconds"], seconds)
+
+    def register_collector(self, name: str, collector: Callable[[], Dict[str, Any]]):
+        """Register a callable whose values are computed when metrics are read."""
+        self.collectors[name] = collector
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a point-in-time copy of all metrics."""
+        with self._lock:
+            data = {
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "timings": {
+                    name: dict(timing, avg_seconds=timing["total_seconds"] / timing["count"])
+                    for name, timing in self.timings.items()
+                },
+            }
+        data.update({name: collector() for name, collector in self.collectors.items()})
+        return data
+
+
+# Global metrics registry
+metrics = Metrics()
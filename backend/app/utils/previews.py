@@ -0,0 +1,63 @@
+"""Attachment preview rendering, run in worker processes.
+
+Only the standard library, the compression codecs (and Pillow, when
+installed) are imported here, so worker processes start without loading
+the application. Each function
+reads a stored file and writes its preview atomically to dest.
+"""
+
+import io
+import os
+import tempfile
+from typing import Optional
+
+from app.utils import compression
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it images have no preview
+    Image = None
+
+# Image types thumbnails are made of, when Pillow is installed
+IMAGE_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp", "image/bmp"}
+
+
+def _write_atomic(dest: str, data: bytes):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(dest))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, dest)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def render_thumbnail(source: str, dest: str, max_size: int, encoding: Optional[str] = None):
+    """Write a PNG thumbnail fitting in max_size x max_size pixels of an image stored with encoding."""
+    with open(source, "rb") as f:
+        # Pillow seeks around the file, which a decompressing reader cannot do cheaply
+        data = f if encoding is None else io.BytesIO(compression.open_reader(f, encoding).read())
+        with Image.open(data) as image:
+            # Lets JPEG decode at a reduced scale instead of full resolution
+            image.draft("RGB", (max_size, max_size))
+            image.thumbnail((max_size, max_size))
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG", optimize=True)
+    _write_atomic(dest, buffer.getvalue())
+
+
+def render_text_head(source: str, dest: str, max_bytes: int, max_lines: int,
+                     encoding: Optional[str] = None):
+    """Write the first lines of a text file, stored with encoding, as UTF-8."""
+    with open(source, "rb") as f:
+        data = compression.open_reader(f, encoding).read(max_bytes + 1)
+    truncated = len(data) > max_bytes
+    lines = data[:max_bytes].split(b"\n")
+    if truncated and len(lines) > 1:
+        # Drop the line cut off by the byte limit
+        lines.pop()
+    text = b"\n".join(lines[:max_lines]).decode("utf-8", errors="replace")
+    _write_atomic(dest, text.encode("utf-8"))
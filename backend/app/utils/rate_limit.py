@@ -0,0 +1,119 @@
+"""In-process token-bucket rate limiting."""
+
+import math
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.utils.errors import ErrorCodes, build_error_response
+
+
+@lru_cache(maxsize=None)
+def parse_limit(limit: str) -> Tuple[float, float]:
+    """Parse a "count/seconds" limit into (capacity, tokens refilled per second)."""
+    count, seconds = limit.split("/")
+    capacity = float(count)
+    return capacity, capacity / float(seconds)
+
+
+class RateLimiter:
+    """Token buckets keyed by arbitrary strings.
+
+    A bucket is stored as ``[tokens, updated_at, full_at]``. Buckets that
+    would have refilled completely carry no state, so compact() drops them.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._buckets: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, capacity: float, refill_rate: float) -> float:
+        """Take one token from a bucket.
+
+        Returns 0 if the request is allowed, otherwise the seconds to wait
+        until a token is available.
+        """
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+
+            if tokens < 1:
+                return (1 - tokens) / refill_rate
+
+            tokens -= 1
+            self._buckets[key] = [tokens, now, now + (capacity - tokens) / refill_rate]
+            return 0.0
+
+    def compact(self) -> int:
+        """Drop buckets that have refilled completely. Returns the number dropped."""
+        now = self.clock()
+        with self._lock:
+            full = [key for key, bucket in self._buckets.items() if bucket[2] <= now]
+            for key in full:
+                del self._buckets[key]
+        return len(full)
+
+    def clear(self):
+        """Drop all buckets."""
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Limiter shared by all rate-limited routes in this worker
+rate_limiter = RateLimiter()
+
+
+def _check(key: str, limit: str) -> float:
+    capacity, refill_rate = parse_limit(limit)
+    return rate_limiter.hit(key, capacity, refill_rate)
+
+
+def rate_limit(route: str, account_field: Optional[str] = "email"):
+    """Dependency limiting a route per client IP and per account.
+
+    Limits come from ``settings.RATE_LIMITS[route]`` as an (ip, account)
+    pair of "count/seconds" strings. The account is read from
+    ``account_field`` of the JSON body.
+    """
+    async def dependency(request: Request):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        ip_limit, account_limit = settings.RATE_LIMITS[route]
+        client_ip = request.client.host if request.client else "unknown"
+        retry_after = _check(f"{route}:ip:{client_ip}", ip_limit)
+
+        if not retry_after and account_field:
+            try:
+                body = await request.json()
+            except ValueError:
+                body = None
+            account = body.get(account_field) if isinstance(body, dict) else None
+            if isinstance(account, str):
+                retry_after = _check(f"{route}:account:{account.strip().lower()}", account_limit)
+
+        if retry_after:
+            retry_after = math.ceil(retry_after)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=build_error_response(
+                    ErrorCodes.E_RATE_LIMITED,
+                    "Too many requests, please retry later",
+                    {"retryAfter": retry_after}
+                ),
+                headers={"Retry-After": str(retry_after)}
+            )
+
+    return dependency
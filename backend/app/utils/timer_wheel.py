@@ -0,0 +1,106 @@
+"""Hierarchical timer wheel.
+
+Timers are keyed by arbitrary hashable keys and due times in seconds. Time
+is cut into ticks; level 0 has one slot per tick, and each higher level
+has slots spanning a whole turn of the level below. A timer is filed at
+the lowest level whose turn contains its due tick, and moves down a level
+each time the slot holding it comes round, so adding, cancelling and
+firing a timer are O(1) and advancing costs O(ticks elapsed), however many
+timers are pending. Timers beyond the top level wait in an overflow slot
+that is re-filed once per top-level turn.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class TimerWheel:
+    """Timers keyed by arbitrary keys, fired by advancing the wheel."""
+
+    def __init__(self, tick: float = 1.0, slot_bits: int = 6, levels: int = 4,
+                 clock: Callable[[], float] = time.time):
+        self.tick = tick
+        self.slot_bits = slot_bits
+        self.levels = levels
+        self.clock = clock
+        self._mask = (1 << slot_bits) - 1
+        self._wheels: List[List[Dict[Hashable, Tuple[int, float]]]] = [
+            [{} for _ in range(1 << slot_bits)] for _ in range(levels)
+        ]
+        self._overflow: Dict[Hashable, Tuple[int, float]] = {}
+        # key -> the slot dict holding it
+        self._slots: Dict[Hashable, Dict[Hashable, Tuple[int, float]]] = {}
+        # Next tick to process; every earlier tick has fired
+        self._current = int(clock() // tick)
+        self._lock = threading.Lock()
+
+    def _file(self, key: Hashable, due_tick: int, due: float):
+        due_tick = max(due_tick, self._current)
+        slot = None
+        for level in range(self.levels):
+            shift = self.slot_bits * (level + 1)
+            if due_tick >> shift == self._current >> shift:
+                slot = self._wheels[level][(due_tick >> (self.slot_bits * level)) & self._mask]
+                break
+        if slot is None:
+            slot = self._overflow
+        slot[key] = (due_tick, due)
+        self._slots[key] = slot
+
+    def schedule(self, key: Hashable, due: float):
+        """Schedule a timer, replacing any pending timer with the same key."""
+        with self._lock:
+            self._remove(key)
+            self._file(key, int(due // self.tick), due)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel a pending timer. Returns True if there was one."""
+        with self._lock:
+            return self._remove(key)
+
+    def _remove(self, key: Hashable) -> bool:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+        del slot[key]
+        return True
+
+    def _cascade(self, slot: Dict[Hashable, Tuple[int, float]]):
+        entries = list(slot.items())
+        slot.clear()
+        for key, (due_tick, due) in entries:
+            self._file(key, due_tick, due)
+
+    def advance(self, now: Optional[float] = None) -> List[Tuple[Hashable, float]]:
+        """Fire every timer due by now. Returns (key, due) pairs in due order."""
+        target = int((self.clock() if now is None else now) // self.tick)
+        fired = []
+        with self._lock:
+            while self._current <= target:
+                tick = self._current
+                if not self._slots:
+                    # Nothing pending: jump straight to the target
+                    self._current = target + 1
+                    break
+                if tick & ((1 << (self.slot_bits * self.levels)) - 1) == 0 and self._overflow:
+                    self._cascade(self._overflow)
+                # Higher levels first, so their timers can drop all the way down
+                for level in range(self.levels - 1, 0, -1):
+                    if tick & ((1 << (self.slot_bits * level)) - 1) == 0:
+                        self._cascade(self._wheels[level][(tick >> (self.slot_bits * level)) & self._mask])
+
+                slot = self._wheels[0][tick & self._mask]
+                if slot:
+                    for key, (_, due) in sorted(slot.items(), key=lambda item: item[1][1]):
+                        fired.append((key, due))
+                        del self._slots[key]
+                    slot.clear()
+                self._current = tick + 1
+        return fired
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slots
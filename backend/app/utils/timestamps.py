@@ -0,0 +1,17 @@
+"""Timestamp normalisation.
+
+Timestamps are written as naive UTC, but ``DateTime(timezone=True)``
+columns come back tz-aware on Postgres and naive on SQLite, and naive and
+aware datetimes cannot be compared. Values from the database or from
+clients go through as_naive_utc() before being compared.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert a timestamp to the naive UTC form timestamps are stored in."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -0,0 +1,26 @@
+"""Shared test configuration.
+
+Points the application at a throwaway SQLite database so the test suite
+always runs against the current schema instead of the checked-in
+development database.
+"""
+
+import os
+import tempfile
+
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="ticketing-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_DB_DIR, 'test.db')}"
+os.environ.setdefault("ATTACHMENT_STORAGE_DIR", os.path.join(_TEST_DB_DIR, "attachments"))
+# Files are deleted as soon as nothing refers to them; the grace period is tested explicitly
+os.environ.setdefault("ATTACHMENT_ORPHAN_GRACE_SECONDS", "0")
+# Minimum bcrypt cost keeps password hashing fast under test
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# The suite logs in far more often than real clients; limits are tested explicitly
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+# Deliver events inside publish so assertions can follow immediately
+os.environ.setdefault("EVENT_BUS_MODE", "sync")
+
+from app.core.config import settings  # noqa: E402
+from app.database.setup import setup_database  # noqa: E402
+
+setup_database(settings.DATABASE_URL)
@@ -0,0 +1,325 @@
+"""Tests for attachment blob storage, upload and ranged download."""
+
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.database.base import SessionLocal
+from app.database.models import UploadSession
+from app.main import app
+from app.services.blob_store import blob_store
+from app.services.preview_service import IMAGE, TEXT, preview_generator
+from app.services.upload_service import run_upload_gc
+
+client = TestClient(app)
+
+
+def _headers():
+    tokens = client.post("/api/v1/auth/login", json={
+        "email": "admin@company.com",
+        "password": "password"
+    }).json()
+    return {"Authorization": f"Bearer {tokens['accessToken']}"}
+
+
+def test_upload_is_streamed_and_deduplicated_by_content():
+    headers = _headers()
+    body = os.urandom(3 * 1024 * 1024 + 17)
+
+    def chunks():
+        for start in range(0, len(body), 64 * 1024):
+            yield body[start:start + 64 * 1024]
+
+    first = client.put("/api/v1/attachments/blobs", content=chunks(), headers=headers)
+    assert first.status_code == 200
+    assert first.json() == {"fileKey": hashlib.sha256(body).hexdigest(), "size": len(body)}
+
+    second = client.put("/api/v1/attachments/blobs", content=body, headers=headers)
+    assert second.json()["fileKey"] == first.json()["fileKey"]
+    with open(blob_store.path_for(first.json()["fileKey"]), "rb") as f:
+        assert f.read() == body
+    assert os.listdir(blob_store.temp_dir) == []
+
+
+def _create_ticket(headers):
+    return client.post("/api/v1/tickets/", json={
+        "title": "Attachment test", "description": "x"
+    }, headers=headers).json()["id"]
+
+
+def _attach(headers, ticket_id, body, filename="data.bin", content_type="application/octet-stream"):
+    file_key = client.put("/api/v1/attachments/blobs", content=body, headers=headers).json()["fileKey"]
+    response = client.post(f"/api/v1/attachments/?file_key={file_key}", json={
+        "ticketId": ticket_id, "filename": filename,
+        "contentType": content_type, "size": 0
+    }, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_download_supports_ranges():
+    headers = _headers()
+    body = bytes(range(256)) * 100
+    attachment = _attach(headers, _create_ticket(headers), body)
+    assert attachment["size"] == len(body)
+    url = f"/api/v1/attachments/{attachment['id']}/download"
+
+    full = client.get(url, headers=headers)
+    assert full.status_code == 200
+    assert full.content == body
+    assert full.headers["accept-ranges"] == "bytes"
+
+    part = client.get(url, headers={**headers, "Range": "bytes=100-299"})
+    assert part.status_code == 206
+    assert part.content == body[100:300]
+    assert part.headers["content-range"] == f"bytes 100-299/{len(body)}"
+
+    tail = client.get(url, headers={**headers, "Range": "bytes=-10"})
+    assert tail.content == body[-10:]
+
+    beyond = client.get(url, headers={**headers, "Range": f"bytes={len(body)}-"})
+    assert beyond.status_code == 416
+    assert beyond.headers["content-range"] == f"bytes */{len(body)}"
+
+
+def test_ticket_lists_include_attachment_stats_and_shared_blobs_survive_deletes():
+    headers = _headers()
+    ticket_id = _create_ticket(headers)
+    body = os.urandom(1000)
+    first = _attach(headers, ticket_id, body, "a.bin")
+    second = _attach(headers, ticket_id, body, "b.bin")
+    _attach(headers, ticket_id, os.urandom(24), "c.bin")
+
+    listed = client.get("/api/v1/attachments/ticket/" + ticket_id, headers=headers).json()
+    assert sorted(a["filename"] for a in listed) == ["a.bin", "b.bin", "c.bin"]
+    tickets = {t["id"]: t for t in client.get(
+        "/api/v1/tickets/?include=attachments", headers=headers).json()}
+    assert (tickets[ticket_id]["attachmentCount"], tickets[ticket_id]["attachmentBytes"]) == (3, 2024)
+    assert client.get("/api/v1/tickets/", headers=headers).json()[0]["attachmentCount"] is None
+
+    assert client.delete(f"/api/v1/attachments/{first['id']}", headers=headers).status_code == 200
+    assert blob_store.exists(second["fileKey"])
+    client.delete(f"/api/v1/attachments/{second['id']}", headers=headers)
+    assert not blob_store.exists(second["fileKey"])
+    assert client.get(f"/api/v1/attachments/{first['id']}", headers=headers).status_code == 404
+    assert client.get("/api/v1/attachments/ticket/missing", headers=headers).status_code == 404
+
+
+def test_resumable_upload_accepts_chunks_in_any_order():
+    headers = _headers()
+    body = os.urandom(2 * 1024 * 1024 + 5)
+    upload = client.post("/api/v1/attachments/uploads", json={"size": len(body)}, headers=headers).json()
+    url = f"/api/v1/attachments/uploads/{upload['uploadId']}"
+    cut = 1024 * 1024
+
+    status = client.put(f"{url}?offset={cut}", content=body[cut:], headers=headers).json()
+    assert status["receivedRanges"] == [{"start": cut, "end": len(body)}]
+    incomplete = client.post(f"{url}/complete", headers=headers)
+    assert incomplete.status_code == 409
+    # Overlapping retries are harmless
+    client.put(f"{url}?offset=0", content=body[:cut + 10], headers=headers)
+    assert client.put(f"{url}?offset={len(body) - 1}", content=b"xx", headers=headers).status_code == 400
+    assert client.get(url, headers=headers).json()["receivedBytes"] == len(body)
+
+    done = client.post(f"{url}/complete", headers=headers).json()
+    assert done == {"fileKey": hashlib.sha256(body).hexdigest(), "size": len(body)}
+    with open(blob_store.path_for(done["fileKey"]), "rb") as f:
+        assert f.read() == body
+    assert client.get(url, headers=headers).status_code == 404
+
+
+def test_abandoned_uploads_are_garbage_collected():
+    headers = _headers()
+    upload_id = client.post("/api/v1/attachments/uploads", json={"size": 100},
+                            headers=headers).json()["uploadId"]
+    client.put(f"/api/v1/attachments/uploads/{upload_id}?offset=0", content=b"x" * 10, headers=headers)
+    assert upload_id in os.listdir(blob_store.upload_dir)
+
+    db = SessionLocal()
+    try:
+        db.get(UploadSession, upload_id).updated_at = datetime.utcnow() - timedelta(days=2)
+        db.commit()
+    finally:
+        db.close()
+    run_upload_gc()
+    assert upload_id not in os.listdir(blob_store.upload_dir)
+    assert client.get(f"/api/v1/attachments/uploads/{upload_id}", headers=headers).status_code == 404
+
+
+def test_orphaned_files_are_deleted_once_idle_for_the_grace_period(monkeypatch):
+    monkeypatch.setattr(settings, "ATTACHMENT_ORPHAN_GRACE_SECONDS", 3600)
+    headers = _headers()
+    ticket_id = _create_ticket(headers)
+    unattached = os.urandom(500)
+    unattached_key = client.put("/api/v1/attachments/blobs", content=unattached,
+                                headers=headers).json()["fileKey"]
+    detached = _attach(headers, ticket_id, os.urandom(500))
+    kept = _attach(headers, ticket_id, os.urandom(500))
+
+    # Recently uploaded or attached files may be about to be attached (again)
+    client.delete(f"/api/v1/attachments/{detached['id']}", headers=headers)
+    run_upload_gc()
+    assert blob_store.exists(unattached_key) and blob_store.exists(detached["fileKey"])
+
+    idle = time.time() - 7200
+    for key in (unattached_key, detached["fileKey"], kept["fileKey"]):
+        os.utime(blob_store.stat(key).path, (idle, idle))
+    # Uploading the same content again claims the stored file anew
+    client.put("/api/v1/attachments/blobs", content=unattached, headers=headers)
+    run_upload_gc()
+    assert blob_store.exists(unattached_key)
+    assert not blob_store.exists(detached["fileKey"])
+    assert blob_store.exists(kept["fileKey"])
+
+
+def test_text_previews_are_rendered_out_of_process_and_cached_by_content():
+    headers = _headers()
+    ticket_id = _create_ticket(headers)
+    body = "".join(f"line {i}\n" for i in range(5000)).encode()
+    first = _attach(headers, ticket_id, body, "app.log", "text/plain")
+
+    preview = client.get(f"/api/v1/attachments/{first['id']}/preview", headers=headers)
+    assert preview.status_code == 200
+    assert preview.headers["content-type"].startswith("text/plain")
+    assert preview.text == "\n".join(f"line {i}" for i in range(100))
+    cached = preview_generator.path_for(first["fileKey"], TEXT)
+    assert os.path.exists(cached)
+
+    # Same content under another name reuses the cached preview
+    second = _attach(headers, ticket_id, body, "copy.log", "text/plain")
+    assert client.get(f"/api/v1/attachments/{second['id']}/preview", headers=headers).text == preview.text
+
+    binary = _attach(headers, ticket_id, os.urandom(100))
+    assert client.get(f"/api/v1/attachments/{binary['id']}/preview", headers=headers).status_code == 404
+
+    client.delete(f"/api/v1/attachments/{first['id']}", headers=headers)
+    client.delete(f"/api/v1/attachments/{second['id']}", headers=headers)
+    assert not os.path.exists(cached)
+
+
+def test_image_thumbnails_fit_the_preview_size():
+    Image = pytest.importorskip("PIL.Image")
+    import io
+
+    headers = _headers()
+    buffer = io.BytesIO()
+    Image.new("RGB", (2000, 1000), "red").save(buffer, format="PNG")
+    attachment = _attach(headers, _create_ticket(headers), buffer.getvalue(), "photo.png", "image/png")
+
+    preview = client.get(f"/api/v1/attachments/{attachment['id']}/preview", headers=headers)
+    assert preview.headers["content-type"] == "image/png"
+    assert Image.open(io.BytesIO(preview.content)).size == (320, 160)
+    assert os.path.exists(preview_generator.path_for(attachment["fileKey"], IMAGE))
+
+
+def test_thumbnails_are_made_of_images_stored_compressed():
+    Image = pytest.importorskip("PIL.Image")
+    import io
+
+    headers = _headers()
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), "blue").save(buffer, format="BMP")
+    # Stored compressed when first uploaded as text; uploading it as an image dedupes onto that
+    client.put("/api/v1/attachments/blobs", content=buffer.getvalue(),
+               headers={**headers, "Content-Type": "text/plain"})
+    attachment = _attach(headers, _create_ticket(headers), buffer.getvalue(), "pixels.bmp", "image/bmp")
+    assert blob_store.stat(attachment["fileKey"]).encoding is not None
+
+    preview = client.get(f"/api/v1/attachments/{attachment['id']}/preview", headers=headers)
+    assert preview.status_code == 200
+    with Image.open(io.BytesIO(preview.content)) as image:
+        assert image.size == (320, 240)
+
+def test_text_is_compressed_at_rest_and_served_encoded_or_decoded():
+    headers = _headers()
+    ticket_id = _create_ticket(headers)
+    body = "".join(f"2026-10-19 12:00:{i % 60:02d} INFO worker {i % 7} handled request {i}\n"
+                   for i in range(40000)).encode()
+    stored = client.put("/api/v1/attachments/blobs", content=body,
+                        headers={**headers, "Content-Type": "text/plain"}).json()
+    blob = blob_store.stat(stored["fileKey"])
+    assert (blob.size, blob.encoding) == (len(body), blob_store.compression)
+    assert blob.stored_size * 5 < len(body)
+    attachment = client.post(f"/api/v1/attachments/?file_key={stored['fileKey']}", json={
+        "ticketId": ticket_id, "filename": "server.log", "contentType": "text/plain", "size": 0
+    }, headers=headers).json()
+    url = f"/api/v1/attachments/{attachment['id']}/download"
+
+    encoded = client.get(url, headers={**headers, "Accept-Encoding": blob.encoding})
+    assert encoded.headers["content-encoding"] == blob.encoding
+    assert encoded.num_bytes_downloaded == blob.stored_size
+    assert encoded.content == body
+
+    plain = client.get(url, headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == body
+    assert plain.headers["content-disposition"] == 'attachment; filename="server.log"'
+
+    part = client.get(url, headers={**headers, "Range": "bytes=1000000-1000099"})
+    assert part.content == body[1000000:1000100]
+
+    preview = client.get(f"/api/v1/attachments/{attachment['id']}/preview", headers=headers)
+    assert preview.text.splitlines()[0] == body.decode().splitlines()[0]
+
+    # Resumable uploads compress when they complete
+    upload = client.post("/api/v1/attachments/uploads", json={
+        "size": len(body), "contentType": "text/plain"}, headers=headers).json()
+    upload_url = f"/api/v1/attachments/uploads/{upload['uploadId']}"
+    client.put(f"{upload_url}?offset=0", content=body, headers=headers)
+    assert client.post(f"{upload_url}/complete", headers=headers).json()["fileKey"] == stored["fileKey"]
+
+    stats = {row["contentType"]: row for row in client.get(
+        "/api/v1/attachments/compression-stats", headers=headers).json()}
+    assert stats["text/plain"]["compressed"] >= 1
+    assert stats["text/plain"]["storedBytes"] < stats["text/plain"]["bytes"]
+
+
+def test_preview_pool_shuts_down_with_renders_pending():
+    import threading
+
+    from app.services.preview_service import PreviewGenerator
+
+    headers = _headers()
+    generator = PreviewGenerator(blob_store, max_workers=1)
+    for i in range(8):
+        body = "".join(f"pending {i} line {n}\n" for n in range(2000)).encode()
+        key = client.put("/api/v1/attachments/blobs", content=body, headers=headers).json()["fileKey"]
+        generator.schedule(key, TEXT)
+
+    stopper = threading.Thread(target=generator.shutdown, daemon=True)
+    stopper.start()
+    stopper.join(timeout=30)
+    assert not stopper.is_alive()
+    assert generator._pending == {}
+
+
+def test_completing_an_upload_holds_no_database_lock_while_importing(monkeypatch):
+    headers = _headers()
+    body = os.urandom(4096)
+    upload_id = client.post("/api/v1/attachments/uploads", json={"size": len(body)},
+                            headers=headers).json()["uploadId"]
+    url = f"/api/v1/attachments/uploads/{upload_id}"
+    client.put(f"{url}?offset=0", content=body, headers=headers)
+
+    import_file = blob_store.import_file
+
+    def import_while_another_worker_writes(path, content_type=None):
+        db = SessionLocal()
+        try:
+            # Would wait out the lock timeout and fail if the import ran in a write transaction
+            db.get(UploadSession, upload_id).updated_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+        return import_file(path, content_type)
+
+    monkeypatch.setattr(blob_store, "import_file", import_while_another_worker_writes)
+    done = client.post(f"{url}/complete", headers=headers)
+    assert done.json()["fileKey"] == hashlib.sha256(body).hexdigest()
+    assert client.get(url, headers=headers).status_code == 404
+    assert client.post(f"{url}/complete", headers=headers).status_code == 404
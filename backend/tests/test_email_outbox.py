@@ -0,0 +1,85 @@
+"""Tests for the email outbox sender against a local SMTP server."""
+
+import socket
+
+import pytest
+
+from app.database.base import SessionLocal
+from app.database.models import EmailOutbox
+from app.services.email_outbox import EmailOutboxSender, SMTPTransport
+from app.services.email_service import email_service
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class CollectingHandler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = CollectingHandler()
+    port = free_port()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        yield handler, port
+    finally:
+        controller.stop()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    session.query(EmailOutbox).delete()
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def test_outbox_is_drained_over_one_connection(smtp_server, db):
+    handler, port = smtp_server
+    for index in range(3):
+        email_service.send_verification_email(db, f"user{index}@example.com", "123456", "User")
+
+    sender = EmailOutboxSender(SMTPTransport("127.0.0.1", port, use_tls=False))
+    try:
+        assert sender.drain() == 3
+    finally:
+        sender.close()
+
+    assert [m.rcpt_tos for m in handler.messages] == [
+        [f"user{index}@example.com"] for index in range(3)]
+    assert len(handler.sessions) == 1
+    assert b"123456" in handler.messages[0].content
+    assert db.query(EmailOutbox).filter(EmailOutbox.status == "sent").count() == 3
+
+
+def test_failed_sends_back_off_then_give_up(db):
+    message = email_service.queue_email(db, "nobody@example.com", "Subject", "Body")
+    assert message
+
+    # Nothing listens on this port, so every attempt fails
+    sender = EmailOutboxSender(SMTPTransport("127.0.0.1", 1, use_tls=False, timeout=1),
+                               max_attempts=2, backoff_seconds=0)
+    assert sender.drain() == 0
+    row = db.query(EmailOutbox).one()
+    db.refresh(row)
+    assert row.status == "failed"
+    assert row.attempts == 2
+    assert row.last_error
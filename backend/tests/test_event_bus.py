@@ -0,0 +1,126 @@
+"""Tests for asynchronous event delivery."""
+
+import threading
+import time
+
+from app.utils.events import EventBus, EventTypes, has_status_change, merge_ticket_updates
+
+
+def test_async_delivery_in_batches():
+    bus = EventBus(mode="async", queue_size=100, batch_size=10)
+    release = threading.Event()
+    batches = []
+
+    def listener(events):
+        release.wait(5)
+        batches.append([event["data"]["n"] for event in events])
+
+    bus.subscribe("thing.happened", listener, batch=True)
+    for n in range(25):
+        bus.publish("thing.happened", {"n": n})
+    release.set()
+    bus.stop()
+
+    assert [n for batch in batches for n in batch] == list(range(25))
+    assert all(len(batch) <= 10 for batch in batches)
+
+
+def test_drop_policy_discards_when_full():
+    bus = EventBus(mode="async", queue_size=2, backpressure="drop", batch_size=1)
+    release = threading.Event()
+    received = []
+
+    def listener(event):
+        release.wait(5)
+        received.append(event["data"]["n"])
+
+    bus.subscribe("thing.happened", listener)
+    for n in range(10):
+        bus.publish("thing.happened", {"n": n})
+    release.set()
+    bus.stop()
+
+    assert received[0] == 0
+    assert len(received) < 10
+
+
+def test_spill_policy_keeps_every_event_in_order(tmp_path):
+    bus = EventBus(mode="async", queue_size=2, backpressure="spill", batch_size=5,
+                   spill_dir=str(tmp_path))
+    release = threading.Event()
+    received = []
+
+    def listener(event):
+        release.wait(5)
+        received.append(event["data"]["n"])
+
+    bus.subscribe("thing.happened", listener)
+    for n in range(20):
+        bus.publish("thing.happened", {"n": n})
+    release.set()
+    bus.stop()
+
+    assert received == list(range(20))
+    assert not list(tmp_path.iterdir())
+
+
+def coalescing_bus(window: float) -> EventBus:
+    bus = EventBus(mode="sync")
+    bus.coalesce(EventTypes.TICKET_UPDATED, window,
+                 key=lambda data: (data["ticket_id"], data["updated_by"]),
+                 merge=merge_ticket_updates, barrier=has_status_change)
+    return bus
+
+
+def update(field: str, old: str, new: str, ticket_id: str = "t1") -> dict:
+    return {"ticket_id": ticket_id, "updated_by": "u1",
+            "changes": [{"field": field, "old": old, "new": new}]}
+
+
+def test_rapid_updates_are_merged_per_ticket():
+    bus = coalescing_bus(60)
+    received = []
+    bus.subscribe(EventTypes.TICKET_UPDATED, received.append)
+
+    bus.publish(EventTypes.TICKET_UPDATED, update("title", "a", "ab"))
+    bus.publish(EventTypes.TICKET_UPDATED, update("title", "ab", "abc"))
+    bus.publish(EventTypes.TICKET_UPDATED, update("description", "", "x"))
+    bus.publish(EventTypes.TICKET_UPDATED, update("title", "x", "y", ticket_id="t2"))
+    assert received == []
+
+    assert bus.flush_coalesced() == 2
+    merged = next(event for event in received if event["data"]["ticket_id"] == "t1")
+    assert merged["coalesced"] == 3
+    assert merged["data"]["changes"] == [
+        {"field": "title", "old": "a", "new": "abc"},
+        {"field": "description", "old": "", "new": "x"},
+    ]
+    bus.stop()
+
+
+def test_status_changes_are_never_merged():
+    bus = coalescing_bus(60)
+    received = []
+    bus.subscribe(EventTypes.TICKET_UPDATED, received.append)
+
+    bus.publish(EventTypes.TICKET_UPDATED, update("title", "a", "b"))
+    bus.publish(EventTypes.TICKET_UPDATED, update("status", "open", "in_progress"))
+    bus.publish(EventTypes.TICKET_UPDATED, update("status", "in_progress", "closed"))
+
+    # The held title edit goes out first, then each status change on its own
+    assert [event["data"]["changes"][0]["new"] for event in received] == [
+        "b", "in_progress", "closed"]
+    assert bus.flush_coalesced() == 0
+    bus.stop()
+
+
+def test_held_updates_are_delivered_when_the_window_closes():
+    bus = coalescing_bus(0.05)
+    delivered = threading.Event()
+    bus.subscribe(EventTypes.TICKET_UPDATED, lambda event: delivered.set())
+
+    bus.publish(EventTypes.TICKET_UPDATED, update("title", "a", "b"))
+    started = time.monotonic()
+    assert delivered.wait(2)
+    assert time.monotonic() - started < 1
+    bus.stop()
@@ -0,0 +1,177 @@
+"""Tests for the event outbox relay and consumer replay."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database.base import SessionLocal
+from app.database.models import EventOutbox, TicketPriority, User, UserRole
+from app.database.repositories.event_repository import EventOutboxRepository
+from app.models.ticket import TicketCreate, TicketUpdate
+from app.services.event_relay import BUS_CONSUMER, EventRelay
+from app.services.ticket_service_db import TicketServiceDB
+from app.utils.events import EventBus, EventTypes, merge_ticket_updates
+
+
+def make_reporter(db) -> str:
+    user = db.query(User).filter(User.email == "outbox-reporter@example.com").first()
+    if not user:
+        user = User(name="Outbox Reporter", email="outbox-reporter@example.com", password_hash="x",
+                    role=UserRole.DEVELOPER, active=True, email_verified=True)
+        db.add(user)
+        db.commit()
+    return str(user.id)
+
+
+def test_events_are_recorded_with_the_change_and_relayed_in_order():
+    db = SessionLocal()
+    try:
+        reporter = make_reporter(db)
+        service = TicketServiceDB(db)
+        ticket = service.create_ticket(TicketCreate(
+            title="Outbox", description="Relay me", priority=TicketPriority.LOW,
+            department="IT"), reporter)
+        ticket_id = str(ticket.id)
+        service.update_ticket(ticket_id, TicketUpdate(status="in_progress"), reporter)
+
+        # Nothing is published until the relay runs, but the events are already durable
+        recorded = [row.event_type for row in db.query(EventOutbox).order_by(EventOutbox.id)
+                    if row.payload.get("ticket_id") == ticket_id]
+        assert recorded == [EventTypes.TICKET_CREATED, EventTypes.TICKET_UPDATED,
+                            EventTypes.TICKET_STATUS_CHANGED]
+
+        bus = EventBus(mode="sync")
+        published = []
+        for event_type in recorded:
+            bus.subscribe(event_type, published.append)
+        projected = []
+        relay = EventRelay(bus=bus, batch_size=2)
+        relay.register_consumer("test-projection", projected.extend)
+
+        relay.relay()
+        ours = [event for event in published if event["data"]["ticket_id"] == ticket_id]
+        assert [event["type"] for event in ours] == recorded
+        assert ours[0]["id"] < ours[1]["id"] < ours[2]["id"]
+        assert relay.get_offset(BUS_CONSUMER) == ours[-1]["id"]
+
+        # Offsets persist, so a second run publishes nothing new
+        assert relay.relay() == 0
+        projected_count = len(projected)
+        assert [e["type"] for e in projected if e["data"].get("ticket_id") == ticket_id] == recorded
+
+        # Rewinding a consumer replays the log to it from that point
+        relay.reset_consumer("test-projection", ours[0]["id"])
+        relay.relay()
+        replayed = projected[projected_count:]
+        assert [event["id"] for event in replayed][:2] == [ours[1]["id"], ours[2]["id"]]
+    finally:
+        db.close()
+
+
+def test_a_batch_that_fails_to_publish_is_published_again():
+    db = SessionLocal()
+    try:
+        reporter = make_reporter(db)
+        ticket = TicketServiceDB(db).create_ticket(TicketCreate(
+            title="Outbox retry", description="Publish me twice", priority=TicketPriority.LOW,
+            department="IT"), reporter)
+        ticket_id = str(ticket.id)
+
+        class CrashingBus(EventBus):
+            crashed = False
+
+            def publish(self, event_type, data, **kwargs):
+                if not self.crashed:
+                    # As if the worker died halfway through the batch
+                    self.crashed = True
+                    raise RuntimeError("worker died")
+                super().publish(event_type, data, **kwargs)
+
+        bus = CrashingBus(mode="sync")
+        published = []
+        bus.subscribe(EventTypes.TICKET_CREATED, published.append)
+        relay = EventRelay(bus=bus)
+        offset = relay.get_offset(BUS_CONSUMER)
+        with pytest.raises(RuntimeError):
+            relay.relay()
+        assert relay.get_offset(BUS_CONSUMER) == offset
+
+        relay.relay()
+        assert [event["data"]["ticket_id"] for event in published].count(ticket_id) == 1
+        assert relay.get_offset(BUS_CONSUMER) > offset
+    finally:
+        db.close()
+
+
+def test_sessions_do_not_share_a_transaction():
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        first.add(EventOutbox(event_type="test.uncommitted", payload={}, created_at=datetime.utcnow()))
+        first.flush()
+        # Another thread committing its own work must not commit the first session's
+        second.query(EventOutbox).count()
+        second.commit()
+        first.rollback()
+        assert second.query(EventOutbox).filter(
+            EventOutbox.event_type == "test.uncommitted").count() == 0
+    finally:
+        first.close()
+        second.close()
+
+
+def test_events_after_a_missing_id_wait_for_it():
+    db = SessionLocal()
+    try:
+        bus = EventBus(mode="sync")
+        published = []
+        bus.subscribe("test.gap", published.append)
+        relay = EventRelay(bus=bus, gap_grace_seconds=60)
+        relay.relay()
+        last = relay.get_offset(BUS_CONSUMER)
+
+        def record(event_id: int, age_seconds: float = 0):
+            db.add(EventOutbox(id=event_id, event_type="test.gap", payload={"n": event_id - last},
+                               created_at=datetime.utcnow() - timedelta(seconds=age_seconds)))
+            db.commit()
+
+        # As on Postgres: the transaction holding the next id commits after a later one
+        record(last + 2)
+        assert relay.relay() == 0
+        assert relay.get_offset(BUS_CONSUMER) == last
+        record(last + 1)
+        assert relay.relay() == 2
+        assert [event["data"]["n"] for event in published] == [1, 2]
+
+        # An id that never commits (a rolled back insert) is skipped after the grace period
+        record(last + 4, age_seconds=61)
+        assert relay.relay() == 1
+        assert relay.get_offset(BUS_CONSUMER) == last + 4
+    finally:
+        db.close()
+
+
+def test_coalesced_events_are_delivered_before_the_offset_moves():
+    db = SessionLocal()
+    try:
+        bus = EventBus(mode="sync")
+        bus.coalesce(EventTypes.TICKET_UPDATED, 60, key=lambda data: data["ticket_id"],
+                     merge=merge_ticket_updates)
+        received = []
+        bus.subscribe(EventTypes.TICKET_UPDATED, received.append)
+        relay = EventRelay(bus=bus)
+        relay.relay()
+        received.clear()
+
+        repo = EventOutboxRepository(db)
+        for title in ("a", "ab"):
+            repo.record(EventTypes.TICKET_UPDATED, {
+                "ticket_id": "coalesced", "changes": [{"field": "title", "old": "", "new": title}]})
+        db.commit()
+
+        # A worker dying right after this relay must not lose the held update
+        relay.relay()
+        assert [(event["coalesced"], event["data"]["changes"][0]["new"]) for event in received] == [
+            (2, "ab")]
+        bus.stop()
+    finally:
+        db.close()
@@ -0,0 +1,54 @@
+"""Tests for notification digests."""
+
+from app.database.base import SessionLocal
+from app.database.models import EmailOutbox, User, UserRole
+from app.services.notification_digest import NotificationDigestService
+from app.utils.events import EventBus, EventTypes
+
+
+def make_user(db, email: str) -> str:
+    user = db.query(User).filter(User.email == email).first()
+    if not user:
+        user = User(name=email.split("@")[0], email=email, password_hash="x",
+                    role=UserRole.DEVELOPER, active=True, email_verified=True)
+        db.add(user)
+        db.commit()
+    return str(user.id)
+
+
+def test_many_events_become_one_email_per_recipient():
+    db = SessionLocal()
+    try:
+        reporter = make_user(db, "digest-reporter@example.com")
+        assignee = make_user(db, "digest-assignee@example.com")
+        db.query(EmailOutbox).delete()
+        db.commit()
+
+        # A bus of its own, so the app's digest service doesn't see these events too
+        bus = EventBus(mode="sync")
+        digest = NotificationDigestService(bus=bus)
+        bus.publish(EventTypes.TICKET_CREATED, {
+            "ticket_id": "t1", "ticket_key": "TKT-1",
+            "reporter_id": reporter, "assignee_ids": [assignee]
+        })
+        for status in ("in_progress", "blocked", "in_progress"):
+            bus.publish(EventTypes.TICKET_UPDATED, {
+                "ticket_id": "t1", "ticket_key": "TKT-1", "updated_by": assignee,
+                "reporter_id": reporter, "assignee_ids": [assignee],
+                "changes": [{"field": "status", "old": "open", "new": status}]
+            })
+
+        assert digest.flush() == 2
+        emails = {row.recipient: row for row in db.query(EmailOutbox).all()}
+        assert set(emails) == {"digest-reporter@example.com", "digest-assignee@example.com"}
+
+        # The reporter hears about the assignee's three updates in one line
+        assert "TKT-1: 3 updates to status (status is now in_progress)" in emails[
+            "digest-reporter@example.com"].body
+        # The assignee did not hear about their own updates, only the creation
+        assert "TKT-1: created" in emails["digest-assignee@example.com"].body
+        assert "updates" not in emails["digest-assignee@example.com"].body
+
+        assert digest.flush() == 0
+    finally:
+        db.close()
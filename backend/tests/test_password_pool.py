@@ -0,0 +1,46 @@
+"""Tests for offloaded password hashing and rehash-on-login."""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.core.security import PasswordHashPool, pwd_context
+
+
+def test_outdated_cost_is_rehashed():
+    pool = PasswordHashPool(max_workers=1, queue_limit=0)
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("secret")
+
+    async def verify():
+        return await pool.verify_and_update("secret", old_hash)
+
+    verified, new_hash = asyncio.run(verify())
+    pool.shutdown()
+
+    assert verified
+    assert new_hash is not None
+    assert not pwd_context.needs_update(new_hash)
+    assert pwd_context.verify("secret", new_hash)
+
+
+def test_saturated_pool_rejects_with_503():
+    pool = PasswordHashPool(max_workers=1, queue_limit=0)
+    release = threading.Event()
+
+    async def scenario():
+        busy = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as excinfo:
+            await pool.hash("secret")
+        release.set()
+        await busy
+        return excinfo.value
+
+    error = asyncio.run(scenario())
+    pool.shutdown()
+
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "1"
@@ -0,0 +1,58 @@
+"""Tests that the compiled policy matches the original role matrix."""
+
+import pytest
+
+from app.core.policy import Policy, policy
+
+# Role matrix as previously hard-coded in get_role_permissions
+LEGACY_ROLE_PERMISSIONS = {
+    "admin": ["*"],
+    "manager": [
+        "read:tickets", "write:tickets", "assign:tickets",
+        "read:users", "write:users",
+        "read:reports", "read:dashboard",
+        "read:projects", "write:projects",
+        "read:workflows", "write:workflows"
+    ],
+    "developer": ["read:tickets", "write:tickets", "read:projects", "read:dashboard"],
+    "support": ["read:tickets", "write:tickets", "assign:tickets", "read:dashboard"],
+    "it": [
+        "read:tickets", "write:tickets", "assign:tickets",
+        "read:users", "write:users",
+        "read:projects", "write:projects",
+        "read:workflows", "write:workflows",
+        "read:reports", "read:dashboard"
+    ],
+    "client": ["read:tickets", "write:tickets", "read:dashboard"],
+}
+
+ROLES = list(LEGACY_ROLE_PERMISSIONS) + ["unknown"]
+PERMISSIONS = sorted({p for perms in LEGACY_ROLE_PERMISSIONS.values() for p in perms if p != "*"}) + [
+    "delete:everything"
+]
+
+
+def legacy_allows(role: str, permission: str) -> bool:
+    permissions = LEGACY_ROLE_PERMISSIONS.get(role, [])
+    return "*" in permissions or permission in permissions
+
+
+@pytest.mark.parametrize("role", ROLES)
+def test_permission_decisions_match_legacy_matrix(role):
+    for permission in PERMISSIONS:
+        bit = policy.permission_bit(permission)
+        assert policy.allows(role, bit) == legacy_allows(role, permission), (role, permission)
+
+
+@pytest.mark.parametrize("allowed_roles", [("admin",), ("manager", "admin"), ("it", "support")])
+def test_role_decisions_match_legacy_rule(allowed_roles):
+    mask = policy.roles_mask(allowed_roles)
+    for role in ROLES:
+        assert policy.role_in(role, mask) == (role in allowed_roles or role == "admin")
+
+
+def test_wildcard_covers_permissions_registered_later():
+    compiled = Policy({"admin": ["*"], "viewer": ["read:things"]})
+    bit = compiled.permission_bit("write:things")
+    assert compiled.allows("admin", bit)
+    assert not compiled.allows("viewer", bit)
@@ -0,0 +1,54 @@
+"""Tests for token-bucket rate limiting."""
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.utils.rate_limit import RateLimiter, rate_limiter
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_refills_and_compacts():
+    clock = FakeClock()
+    limiter = RateLimiter(clock)
+
+    assert limiter.hit("key", 2, 1.0) == 0
+    assert limiter.hit("key", 2, 1.0) == 0
+    assert limiter.hit("key", 2, 1.0) == 1.0
+
+    clock.now = 1.0
+    assert limiter.hit("key", 2, 1.0) == 0
+    assert limiter.compact() == 0
+
+    clock.now = 3.0
+    assert limiter.compact() == 1
+    assert len(limiter) == 0
+
+
+def test_login_returns_429_per_account(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setitem(settings.RATE_LIMITS, "login", ("100/60", "2/60"))
+    rate_limiter.clear()
+
+    credentials = {"email": "limited@example.com", "password": "wrong"}
+    for _ in range(2):
+        assert client.post("/api/v1/auth/login", json=credentials).status_code == 401
+
+    response = client.post("/api/v1/auth/login", json=credentials)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["detail"]["error"] == "E_RATE_LIMITED"
+
+    # Other accounts from the same client are unaffected
+    other = {"email": "other@example.com", "password": "wrong"}
+    assert client.post("/api/v1/auth/login", json=other).status_code == 401
+    rate_limiter.clear()
@@ -0,0 +1,64 @@
+"""Tests for multi-session refresh tokens and expiry sweeping."""
+
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.database.base import SessionLocal
+from app.database.models import RefreshToken
+from app.database.repositories.auth_repository import AuthRepository
+from app.main import app
+
+client = TestClient(app)
+
+
+def login(device: str) -> dict:
+    response = client.post("/api/v1/auth/login", json={
+        "email": "admin@company.com",
+        "password": "password"
+    }, headers={"User-Agent": device})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_sessions_are_independent_per_device():
+    laptop = login("laptop")
+    phone = login("phone")
+    headers = {"Authorization": f"Bearer {phone['accessToken']}"}
+
+    sessions = client.get("/api/v1/auth/sessions", headers=headers).json()
+    laptop_session = next(s for s in sessions if s["device"] == "laptop")
+
+    # Both devices stay signed in and can refresh
+    assert client.post("/api/v1/auth/refresh", json={
+        "refreshToken": laptop["refreshToken"]}).status_code == 200
+    phone_tokens = client.post("/api/v1/auth/refresh", json={
+        "refreshToken": phone["refreshToken"]}).json()
+
+    # Rotated tokens replace the old one within the same session
+    assert client.post("/api/v1/auth/refresh", json={
+        "refreshToken": phone["refreshToken"]}).status_code == 401
+
+    response = client.delete(f"/api/v1/auth/sessions/{laptop_session['id']}", headers=headers)
+    assert response.status_code == 200
+    sessions = client.get("/api/v1/auth/sessions", headers=headers).json()
+    assert laptop_session["id"] not in [s["id"] for s in sessions]
+    assert client.post("/api/v1/auth/refresh", json={
+        "refreshToken": phone_tokens["refreshToken"]}).status_code == 200
+
+
+def test_expired_tokens_are_swept_in_batches():
+    db = SessionLocal()
+    try:
+        repo = AuthRepository(db)
+        user_id = login("sweeper")["user"]["id"]
+        for index in range(5):
+            token = repo.create_refresh_token(user_id, f"expired-{index}")
+            token.expires_at = datetime.utcnow() - timedelta(days=1)
+        db.commit()
+
+        assert repo.delete_expired_tokens(batch_size=2) >= 5
+        assert db.query(RefreshToken).filter(
+            RefreshToken.expires_at <= datetime.utcnow()).count() == 0
+    finally:
+        db.close()
@@ -0,0 +1,131 @@
+"""Tests for SLA deadlines, the timer wheel and breach escalation."""
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.database.base import SessionLocal
+from app.database.models import EventOutbox, Ticket, TicketPriority, TicketStatus, User
+from app.models.ticket import TicketCreate, TicketUpdate
+from app.services.sla_service import SlaScheduler, update_deadlines
+from app.services.ticket_service_db import TicketServiceDB
+from app.utils.events import EventTypes
+from app.utils.timer_wheel import TimerWheel
+
+
+def test_timer_wheel_fires_each_timer_once_at_its_tick():
+    wheel = TimerWheel(tick=1.0, slot_bits=2, levels=2, clock=lambda: 0.0)
+    due = {f"t{i}": random.uniform(0, 100) for i in range(200)}
+    for key, at in due.items():
+        wheel.schedule(key, at)
+    wheel.schedule("cancelled", 5)
+    wheel.cancel("cancelled")
+    wheel.schedule("t0", 50.5)
+    due["t0"] = 50.5
+
+    fired = {}
+    for now in range(0, 101, 3):
+        for key, at in wheel.advance(now):
+            assert key not in fired
+            fired[key] = now
+    assert set(fired) == set(due)
+    # Fired on the first advance at or after the due tick, never early
+    assert all(int(due[key]) <= now < int(due[key]) + 3 for key, now in fired.items())
+    assert len(wheel) == 0
+
+
+def test_deadlines_follow_status_and_priority():
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == "admin@company.com").first()
+        service = TicketServiceDB(db)
+        ticket = service.create_ticket(TicketCreate(
+            title="SLA", description="x", priority=TicketPriority.LOW), str(admin.id))
+        assert ticket.resolution_due_at - ticket.response_due_at == timedelta(minutes=10080 - 480)
+        assert ticket.sla_due_at == ticket.response_due_at
+
+        ticket = service.update_ticket(str(ticket.id), TicketUpdate(priority=TicketPriority.CRITICAL),
+                                       str(admin.id))
+        assert ticket.response_due_at - ticket.created_at == timedelta(minutes=15)
+
+        ticket = service.update_ticket(str(ticket.id), TicketUpdate(status=TicketStatus.IN_PROGRESS),
+                                       str(admin.id))
+        assert ticket.response_due_at is None
+        assert ticket.sla_due_at == ticket.resolution_due_at
+
+        ticket = service.update_ticket(str(ticket.id), TicketUpdate(status=TicketStatus.CLOSED),
+                                       str(admin.id))
+        assert (ticket.resolution_due_at, ticket.sla_due_at) == (None, None)
+
+        ticket = service.update_ticket(str(ticket.id), TicketUpdate(status=TicketStatus.OPEN),
+                                       str(admin.id))
+        assert ticket.resolution_due_at > datetime.utcnow() + timedelta(minutes=230)
+        assert ticket.sla_due_at == ticket.resolution_due_at
+    finally:
+        db.close()
+
+
+def test_breaches_are_escalated_once_across_workers():
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == "admin@company.com").first()
+        ticket = TicketServiceDB(db).create_ticket(TicketCreate(
+            title="Overdue", description="x", priority=TicketPriority.HIGH), str(admin.id))
+        past = datetime.utcnow() - timedelta(minutes=5)
+        ticket.response_due_at = past
+        ticket.resolution_due_at = past + timedelta(hours=1)
+        ticket.sla_due_at = past
+        db.commit()
+        ticket_id = str(ticket.id)
+
+        workers = [SlaScheduler(SessionLocal), SlaScheduler(SessionLocal)]
+        for worker in workers:
+            assert worker.rehydrate() >= 1
+        assert sum(worker.fire_due(time.time()) for worker in workers) == 1
+
+        breaches = db.query(EventOutbox).filter(
+            EventOutbox.event_type == EventTypes.TICKET_SLA_BREACHED).all()
+        assert [(e.payload["ticket_id"], e.payload["sla"]) for e in breaches] == [(ticket_id, "response")]
+        db.expire_all()
+        assert db.get(Ticket, ticket_id).sla_due_at == past + timedelta(hours=1)
+        # The resolution deadline is next in the wheel of the worker that escalated
+        assert any(ticket_id in worker.wheel for worker in workers)
+    finally:
+        db.close()
+
+
+def test_deadlines_loaded_timezone_aware_are_compared_as_utc():
+    # Postgres returns timestamptz columns tz-aware; new deadlines are naive UTC
+    now = datetime.utcnow()
+    created_at = now - timedelta(hours=1)
+    eastern = timezone(timedelta(hours=-5))
+    ticket = SimpleNamespace(
+        priority=TicketPriority.HIGH, status=TicketStatus.IN_PROGRESS,
+        created_at=created_at.replace(tzinfo=timezone.utc).astimezone(eastern),
+        response_due_at=(created_at + timedelta(minutes=480)).replace(tzinfo=timezone.utc),
+        resolution_due_at=(created_at + timedelta(minutes=10080)).replace(tzinfo=timezone.utc),
+        sla_due_at=(created_at + timedelta(minutes=480)).replace(tzinfo=timezone.utc))
+
+    update_deadlines(ticket, TicketStatus.OPEN, True, now)
+    assert ticket.response_due_at is None
+    assert ticket.resolution_due_at == created_at + timedelta(minutes=1440)
+    assert ticket.sla_due_at == ticket.resolution_due_at
+
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == "admin@company.com").first()
+        loaded = TicketServiceDB(db).create_ticket(TicketCreate(
+            title="Overdue, aware", description="x", priority=TicketPriority.HIGH), str(admin.id))
+        ticket_id = str(loaded.id)
+        past = (now - timedelta(minutes=5)).replace(tzinfo=timezone.utc)
+        loaded.response_due_at = loaded.sla_due_at = past
+        loaded.resolution_due_at = past + timedelta(hours=1)
+        db.flush()
+
+        worker = SlaScheduler(lambda: db)
+        worker.schedule(ticket_id, past)
+        assert worker.fire_due(time.time()) == 1
+        assert ticket_id in worker.wheel
+    finally:
+        db.close()
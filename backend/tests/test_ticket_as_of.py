@@ -0,0 +1,118 @@
+"""Test point-in-time ticket and board reconstruction."""
+
+from datetime import timedelta, timezone
+
+import pytest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.database.base import Base
+from app.database.models import Ticket, TicketHistory, TicketSnapshot, User, UserRole
+from app.models.ticket import TicketCreate, TicketUpdate
+from app.services.ticket_service_db import TicketServiceDB
+
+
+
+@pytest.fixture
+def db():
+    """Isolated in-memory database so board counts only see this test's tickets."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(name="Admin User", email="admin@company.com", password_hash="x",
+                     role=UserRole.ADMIN, email_verified=True))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def ticket_with_history(db, monkeypatch):
+    """Ticket with five changes, one hour apart, checkpointed every two entries."""
+    monkeypatch.setattr(settings, "HISTORY_CHECKPOINT_INTERVAL", 2)
+    service = TicketServiceDB(db)
+    admin = db.query(User).filter(User.email == "admin@company.com").first()
+
+    ticket = service.create_ticket(
+        TicketCreate(title="Printer jam", description="Tray 2", priority="low"),
+        admin.id)
+    for update in (
+        TicketUpdate(status="in_progress"),
+        TicketUpdate(priority="high"),
+        TicketUpdate(title="Printer jam on floor 3"),
+        TicketUpdate(status="blocked"),
+        TicketUpdate(department="IT"),
+    ):
+        service.update_ticket(ticket.id, update, admin.id)
+
+    # Spread the changes out so the timeline is deterministic
+    start = db.get(Ticket, ticket.id).created_at
+    entries = db.query(TicketHistory).filter(
+        TicketHistory.ticket_id == ticket.id).order_by(TicketHistory.id).all()
+    times = {}
+    for hours, entry in enumerate(entries):
+        entry.created_at = times[entry.id] = start + timedelta(hours=hours)
+    for snapshot in db.query(TicketSnapshot).filter(TicketSnapshot.ticket_id == ticket.id):
+        snapshot.taken_at = times[snapshot.history_id]
+    db.commit()
+    return service, ticket.id, start
+
+
+def test_checkpoints_bound_replay(db, ticket_with_history):
+    """A checkpoint is written on creation and then every interval."""
+    _, ticket_id, _ = ticket_with_history
+    assert db.query(TicketSnapshot).filter(
+        TicketSnapshot.ticket_id == ticket_id).count() == 3
+
+
+@pytest.mark.parametrize("hours, expected", [
+    (0.5, {"status": "open", "priority": "low", "title": "Printer jam", "department": None}),
+    (2.5, {"status": "in_progress", "priority": "high", "title": "Printer jam", "department": None}),
+    (4.5, {"status": "blocked", "priority": "high", "title": "Printer jam on floor 3", "department": None}),
+    (9, {"status": "blocked", "priority": "high", "title": "Printer jam on floor 3", "department": "IT"}),
+])
+def test_ticket_as_of(ticket_with_history, hours, expected):
+    """Reconstructed fields match the timeline."""
+    service, ticket_id, start = ticket_with_history
+    state = service.get_ticket_as_of(ticket_id, start + timedelta(hours=hours))
+    assert {field: getattr(state, field) for field in expected} == expected
+
+
+def test_ticket_as_of_without_checkpoints(db, ticket_with_history):
+    """Tickets predating checkpoints are rewound from their current state."""
+    service, ticket_id, start = ticket_with_history
+    db.query(TicketSnapshot).filter(TicketSnapshot.ticket_id == ticket_id).delete()
+    db.commit()
+
+    state = service.get_ticket_as_of(ticket_id, start + timedelta(hours=2.5))
+    assert (state.status, state.priority, state.title) == ("in_progress", "high", "Printer jam")
+    assert service.get_ticket_as_of(ticket_id, start - timedelta(hours=1)) is None
+
+
+def test_ticket_as_of_with_timezone_aware_timestamps(db, ticket_with_history):
+    """Timestamps loaded tz-aware (as Postgres returns them) compare with naive ones."""
+    service, ticket_id, start = ticket_with_history
+    ticket = db.get(Ticket, ticket_id)
+    ticket.created_at = start.replace(tzinfo=timezone.utc)
+
+    assert service.get_ticket_as_of(ticket_id, start + timedelta(hours=2.5)).status == "in_progress"
+    assert service.get_ticket_as_of(
+        ticket_id, (start - timedelta(hours=1)).replace(tzinfo=timezone.utc)) is None
+
+
+def test_board_snapshot(ticket_with_history):
+    """Board snapshot counts the ticket under its historical values."""
+    service, _, start = ticket_with_history
+    snapshot = service.get_board_snapshot(start + timedelta(hours=1.5))
+    assert snapshot["total"] == 1
+    assert snapshot["by_status"] == {"in_progress": 1}
+    assert snapshot["by_priority"] == {"low": 1}
+    assert snapshot["by_department"] == {"Unassigned": 1}
+
+    assert service.get_board_snapshot(start + timedelta(hours=9))["by_department"] == {"IT": 1}
+    assert service.get_board_snapshot(start - timedelta(hours=1))["total"] == 0
@@ -0,0 +1,62 @@
+"""Tests for the ticket comments API and its cursor pagination."""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database.base import engine
+from app.main import app
+
+client = TestClient(app)
+
+
+def _headers():
+    tokens = client.post("/api/v1/auth/login", json={
+        "email": "admin@company.com",
+        "password": "password"
+    }).json()
+    return {"Authorization": f"Bearer {tokens['accessToken']}"}
+
+
+def test_comments_are_paged_by_cursor_with_authors_loaded_in_one_query():
+    headers = _headers()
+    ticket_id = client.post("/api/v1/tickets/", json={
+        "title": "Comments", "description": "x"
+    }, headers=headers).json()["id"]
+    url = f"/api/v1/tickets/{ticket_id}/comments"
+    for i in range(7):
+        assert client.post(url, json={"content": f"comment {i}"}, headers=headers).status_code == 200
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(" ".join(statement.split()))
+
+    seen, cursor = [], None
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            page = client.get(url, params=params, headers=headers).json()
+            seen += page["items"]
+            cursor = page["nextCursor"]
+            if cursor is None:
+                break
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert [c["content"] for c in seen] == [f"comment {i}" for i in range(7)]
+    assert all(c["authorName"] for c in seen)
+    # One users query per page, not one per comment
+    assert sum("FROM users WHERE users.id IN" in s for s in statements) == 3
+
+    assert client.get(url, params={"cursor": "garbage"}, headers=headers).status_code == 400
+
+    comment_url = f"{url}/{seen[0]['id']}"
+    edited = client.put(comment_url, json={"content": "edited"}, headers=headers).json()
+    assert edited["content"] == "edited" and edited["updatedAt"]
+    assert client.delete(comment_url, headers=headers).status_code == 200
+    assert client.delete(comment_url, headers=headers).status_code == 404
+
+    tickets = {t["id"]: t for t in client.get(
+        "/api/v1/tickets/?include=comments,attachments", headers=headers).json()}
+    assert tickets[ticket_id]["commentCount"] == 6
+    assert tickets[ticket_id]["attachmentCount"] == 0
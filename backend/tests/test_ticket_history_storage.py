@@ -0,0 +1,59 @@
+"""Test compact ticket history storage and monthly roll-up."""
+
+from datetime import datetime
+
+from app.database.base import SessionLocal
+from app.database.history_partitions import roll_up_history
+from app.database.models import Ticket, TicketHistory, TicketHistoryAction, User
+from app.database.repositories.ticket_repository import TicketHistoryRepository
+from app.database.types import decode_text, encode_text
+
+
+def test_large_values_are_compressed():
+    """Large text round-trips and is stored smaller than the original."""
+    text = "Steps to reproduce: open the dashboard and refresh. " * 40
+    stored = encode_text(text)
+
+    assert len(stored) < len(text.encode("utf-8"))
+    assert decode_text(stored) == text
+    assert decode_text(encode_text("short")) == "short"
+
+
+def test_roll_up_moves_old_months_and_history_stays_readable():
+    """Rows from past months move to archives and are still returned in order."""
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == "admin@company.com").first()
+        ticket = Ticket(key="HIST-1", title="History", description="d",
+                        reporter_id=admin.id)
+        db.add(ticket)
+        db.commit()
+
+        description = "A long description line. " * 50
+        db.add_all([
+            TicketHistory(ticket_id=ticket.id, user_id=admin.id,
+                          action=TicketHistoryAction.CREATED,
+                          created_at=datetime(2025, 1, 10)),
+            TicketHistory(ticket_id=ticket.id, user_id=admin.id,
+                          action=TicketHistoryAction.UPDATED_DESCRIPTION,
+                          old_value="d", new_value=description,
+                          created_at=datetime(2025, 2, 3)),
+            TicketHistory(ticket_id=ticket.id, user_id=admin.id,
+                          action=TicketHistoryAction.UPDATED_STATUS,
+                          old_value="open", new_value="in_progress",
+                          created_at=datetime(2025, 3, 1)),
+        ])
+        db.commit()
+
+        moved = roll_up_history(db, now=datetime(2025, 3, 15))
+        assert moved == {"202501": 1, "202502": 1}
+
+        history = TicketHistoryRepository(db).get_by_ticket_id(ticket.id)
+        assert [entry.action for entry in history] == [
+            TicketHistoryAction.CREATED,
+            TicketHistoryAction.UPDATED_DESCRIPTION,
+            TicketHistoryAction.UPDATED_STATUS,
+        ]
+        assert history[1].new_value == description
+    finally:
+        db.close()
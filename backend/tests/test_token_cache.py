@@ -0,0 +1,56 @@
+"""Tests for the verified access token cache."""
+
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.security import (
+    VerifiedTokenCache, create_access_token, resolve_user_context, token_cache
+)
+from app.main import app
+
+
+def test_cached_context_matches_decoded_context():
+    token_cache.clear()
+    token = create_access_token({"sub": "user-1", "role": "manager"})
+
+    hits = token_cache.hits
+    first = resolve_user_context(token)
+    second = resolve_user_context(token)
+
+    assert second == first
+    assert first["role"] == "manager"
+    assert token_cache.hits == hits + 1
+
+
+def test_invalid_tokens_are_not_cached():
+    token_cache.clear()
+    with pytest.raises(HTTPException):
+        resolve_user_context("not-a-token")
+    assert token_cache.stats()["size"] == 0
+
+
+def test_entries_expire_and_are_bounded():
+    cache = VerifiedTokenCache(max_size=2)
+    cache.put("expired", time.time() - 1, {"user_id": "a"})
+    assert cache.get("expired") is None
+
+    for token in ("a", "b", "c"):
+        cache.put(token, time.time() + 60, {"user_id": token})
+    assert cache.get("a") is None
+    assert cache.get("c") == {"user_id": "c"}
+
+
+def test_metrics_are_only_shown_to_admins():
+    client = TestClient(app)
+    assert client.get("/metrics").status_code == 401
+
+    manager = create_access_token({"sub": "user-1", "role": "manager"})
+    assert client.get("/metrics", headers={"Authorization": f"Bearer {manager}"}).status_code == 403
+
+    admin = create_access_token({"sub": "user-1", "role": "admin"})
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {admin}"})
+    assert response.status_code == 200
+    assert "auth_token_cache" in response.json()
@@ -0,0 +1,75 @@
+"""Tests for access token revocation."""
+
+from datetime import datetime, timedelta
+from functools import partial
+
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.core import revocation
+from app.core.revocation import BloomFilter, RevocationList
+from app.database.base import SessionLocal
+from app.database.models import RevokedToken
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=100)
+    values = [f"token-{index}" for index in range(100)]
+    for value in values:
+        bloom.add(value)
+
+    assert all(value in bloom for value in values)
+    false_positives = sum(f"other-{index}" in bloom for index in range(1000))
+    assert false_positives < 50
+
+
+def test_logout_revokes_access_token_across_workers():
+    tokens = client.post("/api/v1/auth/login", json={
+        "email": "admin@company.com",
+        "password": "password"
+    }).json()
+    headers = {"Authorization": f"Bearer {tokens['accessToken']}"}
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+    # A second worker that already loaded its filter before the logout
+    other_worker = RevocationList()
+    other_worker.refresh()
+
+    response = client.post("/api/v1/auth/logout", json={
+        "refreshToken": tokens["refreshToken"]}, headers=headers)
+    assert response.status_code == 200
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+    # The other worker learns of the revocation on its next poll
+    jti = jwt.get_unverified_claims(tokens["accessToken"])["jti"]
+    assert other_worker.refresh()
+    assert other_worker.is_revoked(jti)
+    assert not other_worker.is_revoked("never-revoked")
+
+
+def test_revocation_committed_out_of_id_order_reaches_other_workers(monkeypatch):
+    revocations = RevocationList()
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    revocations.revoke("out-of-order-low", expires_at)
+    revocations.revoke("out-of-order-high", expires_at)
+
+    # As on Postgres: the lower id is still uncommitted when a worker polls
+    db = SessionLocal()
+    try:
+        low = db.query(RevokedToken).filter(RevokedToken.jti == "out-of-order-low").one()
+        low_id = low.id
+        db.delete(low)
+        db.commit()
+    finally:
+        db.close()
+    other_worker = RevocationList()
+    other_worker.refresh()
+
+    with monkeypatch.context() as patch:
+        patch.setattr(revocation, "RevokedToken", partial(RevokedToken, id=low_id))
+        revocations.revoke("out-of-order-low", expires_at)
+    assert other_worker.refresh()
+    assert other_worker.is_revoked("out-of-order-low")
@@ -0,0 +1,84 @@
+"""Tests for the workflow action executor."""
+
+from app.database.base import SessionLocal
+from app.database.models import (
+    EmailOutbox, EventOutbox, TicketComment, TicketPriority, User, UserRole
+)
+from app.models.ticket import TicketCreate
+from app.models.workflow import WorkflowRuleInternal, WorkflowTrigger
+from app.services.ticket_service_db import TicketServiceDB
+from app.services.workflow_actions import WorkflowActionExecutor
+from app.services.workflow_index import RuleIndex
+from app.services.workflow_service_db import WorkflowEngine
+
+
+def make_rule(actions: dict) -> WorkflowRuleInternal:
+    return WorkflowRuleInternal(id="rule-1", name="Triage", trigger=WorkflowTrigger.TICKET_CREATED,
+                                conditions={}, actions=actions, active=True,
+                                created_at="2024-01-01T00:00:00")
+
+
+def test_actions_are_applied_once_per_event_in_one_unit_of_work():
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == "admin@company.com").first()
+        agent = User(name="Triage Agent", email="triage-agent@example.com", password_hash="x",
+                     role=UserRole.SUPPORT, active=True, email_verified=True)
+        db.add(agent)
+        db.commit()
+        ticket = TicketServiceDB(db).create_ticket(TicketCreate(
+            title="Printer on fire", description="Smoke", priority=TicketPriority.LOW,
+            department="IT"), str(admin.id))
+        ticket_id = str(ticket.id)
+
+        rule = make_rule({
+            "set_priority": "critical",
+            "change_status": "in_progress",
+            "assign_user": str(agent.id),
+            "add_comment": "Escalated by triage",
+            "send_notification": "assignees",
+        })
+        event = {"id": 424242, "type": "ticket.created", "timestamp": "2024-01-01T00:00:00",
+                 "data": {"ticket_id": ticket_id}}
+
+        executor = WorkflowActionExecutor(background=False)
+        # The same event delivered twice queues the actions twice but applies them once
+        assert executor.submit(rule, event) == 5
+        assert executor.submit(rule, event) == 5
+        assert executor.drain() == 5
+        executor.submit(rule, event)
+        assert executor.drain() == 0
+
+        db.expire_all()
+        ticket = TicketServiceDB(db).get_ticket(ticket_id)
+        assert ticket.priority.value == "critical"
+        assert ticket.status.value == "in_progress"
+        assert [a.email for a in ticket.assignees] == ["triage-agent@example.com"]
+        assert db.query(TicketComment).filter(TicketComment.ticket_id == ticket_id).count() == 1
+        assert db.query(EmailOutbox).filter(EmailOutbox.recipient == "triage-agent@example.com").count() == 1
+
+        # Changes made by actions carry the depth of the rule chain that caused them
+        updated = [row.payload for row in db.query(EventOutbox).filter(
+            EventOutbox.event_type == "ticket.updated") if row.payload["ticket_id"] == ticket_id]
+        assert len(updated) == 1
+        assert updated[0]["workflow_depth"] == 1
+    finally:
+        db.close()
+
+
+def test_engine_stops_at_the_depth_limit():
+    class RuleSet:
+        index = RuleIndex([make_rule({"add_comment": "again"})])
+
+    executor = WorkflowActionExecutor(background=False)
+    engine = WorkflowEngine.__new__(WorkflowEngine)
+    engine.rule_set, engine.executor, engine.max_depth = RuleSet(), executor, 2
+
+    event = {"type": "ticket.created", "timestamp": "2024-01-01T00:00:00",
+             "data": {"ticket_id": "t1", "workflow_depth": 1}}
+    engine._process_rules(WorkflowTrigger.TICKET_CREATED, event)
+    assert executor.queue.qsize() == 1
+
+    event["data"]["workflow_depth"] = 2
+    engine._process_rules(WorkflowTrigger.TICKET_CREATED, event)
+    assert executor.queue.qsize() == 1
@@ -0,0 +1,123 @@
+"""Tests for applying workflow rules to existing tickets."""
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.database.base import SessionLocal
+from app.database.models import (
+    Ticket, TicketComment, TicketHistory, TicketHistoryAction, TicketPriority, TicketStatus,
+    User, UserRole
+)
+from app.main import app
+from app.models.ticket import TicketCreate
+from app.models.workflow import WorkflowRuleCreate, WorkflowTrigger
+from app.services.sla_service import sla_scheduler
+from app.services.ticket_service_db import TicketServiceDB
+from app.services.workflow_apply import RuleApplication, compile_conditions
+from app.services.workflow_service_db import WorkflowServiceDB, to_internal
+
+
+def test_rule_is_applied_set_based_in_chunks():
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == "admin@company.com").first()
+        on_call = User(name="On Call", email="on-call@example.com", password_hash="x",
+                       role=UserRole.SUPPORT, active=True, email_verified=True)
+        db.add(on_call)
+        db.flush()
+        department = "Retro Support"
+        for index in range(23):
+            db.add(Ticket(key=f"RETRO-{index}", title=f"Retro {index}", description="x",
+                          department=department, reporter_id=admin.id,
+                          priority=TicketPriority.CRITICAL if index % 2 else TicketPriority.LOW,
+                          status=TicketStatus.IN_PROGRESS if index == 1 else TicketStatus.OPEN))
+        db.commit()
+
+        service = WorkflowServiceDB(db)
+        rule = service.create_rule(WorkflowRuleCreate(
+            name="Critical support to on-call", trigger=WorkflowTrigger.TICKET_CREATED,
+            conditions={"department": department, "priority": "critical"},
+            actions={"assign_user": str(on_call.id), "change_status": "in_progress",
+                     "add_comment": "Routed to on-call", "send_notification": "assignees"}), "system")
+
+        preview = service.apply_rule(rule.id, str(admin.id), dry_run=True)
+        assert preview.matched == 11
+        assert preview.skippedActions == ["send_notification"]
+        assert db.query(TicketComment).join(Ticket).filter(Ticket.department == department).count() == 0
+
+        application = RuleApplication(db, to_internal(service.workflow_repo.get_by_id(rule.id)),
+                                      str(admin.id), chunk_size=4)
+        result = application.run()
+        assert result["matched"] == 11
+        assert result["chunks"] == 3
+        assert result["comments"] == 11
+
+        db.expire_all()
+        matched = db.query(Ticket).filter(*compile_conditions(rule.conditions)).all()
+        assert all([a.email for a in t.assignees] == ["on-call@example.com"] for t in matched)
+        assert all(t.status == TicketStatus.IN_PROGRESS for t in matched)
+        history = db.query(TicketHistory).filter(
+            TicketHistory.ticket_id.in_([t.id for t in matched])).all()
+        assert sum(h.action == TicketHistoryAction.UPDATED_ASSIGNEES for h in history) == 11
+        # The ticket already in progress gets no status entry
+        assert sum(h.action == TicketHistoryAction.UPDATED_STATUS for h in history) == 10
+        assert result["updated"] == 11
+
+        # Re-applying finds nothing left to change, and comments only once
+        again = RuleApplication(db, to_internal(service.workflow_repo.get_by_id(rule.id)),
+                                str(admin.id)).run()
+        assert (again["updated"], again["comments"]) == (0, 0)
+        assert db.query(TicketComment).filter(
+            TicketComment.ticket_id.in_([t.id for t in matched])).count() == 11
+    finally:
+        db.close()
+
+
+def test_conditions_that_cannot_be_compiled_are_rejected():
+    db = SessionLocal()
+    try:
+        service = WorkflowServiceDB(db)
+        rule = service.create_rule(WorkflowRuleCreate(
+            name="By assignee list", trigger=WorkflowTrigger.TICKET_UPDATED,
+            conditions={"assignee_ids": ["u1"]}, actions={"set_priority": "high"}), "system")
+        with pytest.raises(HTTPException) as error:
+            service.apply_rule(rule.id, "system", dry_run=True)
+        assert error.value.status_code == 400
+    finally:
+        db.close()
+
+
+def test_closing_tickets_by_apply_clears_their_sla_deadlines():
+    client = TestClient(app)
+    tokens = client.post("/api/v1/auth/login", json={
+        "email": "admin@company.com", "password": "password"}).json()
+    headers = {"Authorization": f"Bearer {tokens['accessToken']}"}
+
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == "admin@company.com").first()
+        department = "Retro SLA"
+        tickets = [TicketServiceDB(db).create_ticket(TicketCreate(
+            title=f"SLA {i}", description="x", department=department,
+            priority=TicketPriority.HIGH), str(admin.id)) for i in range(3)]
+        ticket_ids = [str(t.id) for t in tickets]
+        # As the relayed ticket.created events would
+        for ticket in tickets:
+            sla_scheduler.schedule(str(ticket.id), ticket.sla_due_at)
+
+        rule = WorkflowServiceDB(db).create_rule(WorkflowRuleCreate(
+            name="Close retro SLA", trigger=WorkflowTrigger.TICKET_UPDATED,
+            conditions={"department": department},
+            actions={"change_status": "closed"}), "system")
+        response = client.post(f"/api/v1/workflows/{rule.id}/apply", headers=headers)
+        assert response.status_code == 200
+
+        db.expire_all()
+        closed = db.query(Ticket).filter(Ticket.id.in_(ticket_ids)).all()
+        assert all(t.status == TicketStatus.CLOSED for t in closed)
+        assert all((t.response_due_at, t.resolution_due_at, t.sla_due_at) == (None, None, None)
+                   for t in closed)
+        assert not any(ticket_id in sla_scheduler.wheel for ticket_id in ticket_ids)
+    finally:
+        db.close()
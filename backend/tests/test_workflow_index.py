@@ -0,0 +1,39 @@
+"""Tests for the workflow rule index."""
+
+from app.models.workflow import WorkflowRuleInternal, WorkflowTrigger
+from app.services.workflow_index import RuleIndex, conditions_match
+
+
+def rule(rule_id: str, conditions: dict, trigger=WorkflowTrigger.TICKET_CREATED,
+         active: bool = True) -> WorkflowRuleInternal:
+    return WorkflowRuleInternal(id=rule_id, name=rule_id, trigger=trigger, conditions=conditions,
+                                actions={}, active=active, created_at="2024-01-01T00:00:00")
+
+
+def test_index_matches_the_same_rules_as_a_scan():
+    rules = [
+        rule("any", {}),
+        rule("it-high", {"department": "IT", "priority": "high"}),
+        rule("it", {"department": "IT"}),
+        rule("hr", {"department": "HR"}),
+        rule("high", {"priority": "high"}),
+        rule("assignees", {"assignee_ids": ["u1"]}),
+        rule("inactive", {"department": "IT"}, active=False),
+        rule("updated", {"department": "IT"}, trigger=WorkflowTrigger.TICKET_UPDATED),
+    ]
+    index = RuleIndex(rules)
+
+    contexts = [
+        {"department": "IT", "priority": "high", "assignee_ids": ["u1"]},
+        {"department": "IT", "priority": "low", "assignee_ids": []},
+        {"department": "HR", "priority": "high"},
+        {"ticket_id": "t1"},
+    ]
+    for context in contexts:
+        expected = [r.id for r in rules if r.active and r.trigger == WorkflowTrigger.TICKET_CREATED
+                    and conditions_match(r.conditions, context)]
+        assert [r.id for r in index.match(WorkflowTrigger.TICKET_CREATED, context)] == expected
+
+    assert [r.id for r in index.match(WorkflowTrigger.TICKET_CREATED, contexts[0])] == [
+        "any", "it-high", "it", "high", "assignees"]
+    assert index.match(WorkflowTrigger.STATUS_CHANGED, contexts[0]) == []
@@ -0,0 +1,37 @@
+"""Tests for database-backed workflow rules."""
+
+from app.database.base import SessionLocal
+from app.models.workflow import WorkflowRuleCreate, WorkflowRuleUpdate, WorkflowTrigger
+from app.services.workflow_service_db import WorkflowRuleSet, WorkflowServiceDB, workflow_rule_set
+
+
+def test_rule_changes_rebuild_every_workers_rule_set():
+    db = SessionLocal()
+    try:
+        service = WorkflowServiceDB(db)
+        other_worker = WorkflowRuleSet()
+        other_worker.refresh()
+        context = {"ticket_id": "t1", "department": "Finance", "priority": "high"}
+
+        rule = service.create_rule(WorkflowRuleCreate(
+            name="Finance escalation", trigger=WorkflowTrigger.TICKET_CREATED,
+            conditions={"department": "Finance", "priority": "high"},
+            actions={"send_notification": "finance-leads"}), "system")
+
+        # The writing worker rebuilt at once; the other one sees the new version on its next check
+        assert [r.id for r in workflow_rule_set.index.match(WorkflowTrigger.TICKET_CREATED, context)] == [rule.id]
+        assert other_worker.index.match(WorkflowTrigger.TICKET_CREATED, context) == []
+        assert other_worker.refresh() is True
+        assert [r.id for r in other_worker.index.match(WorkflowTrigger.TICKET_CREATED, context)] == [rule.id]
+        assert other_worker.refresh() is False
+
+        service.update_rule(rule.id, WorkflowRuleUpdate(active=False), "system")
+        assert other_worker.refresh() is True
+        assert other_worker.index.match(WorkflowTrigger.TICKET_CREATED, context) == []
+        assert service.get_rule(rule.id).active is False
+
+        service.delete_rule(rule.id, "system")
+        assert service.get_rule(rule.id) is None
+        assert other_worker.refresh() is True
+    finally:
+        db.close()
@@ -0,0 +1,62 @@
+"""Tests for the workflow simulation tool."""
+
+from app.database.base import SessionLocal
+from app.database.models import TicketPriority, TicketStatus, User
+from app.database.repositories.ticket_repository import TicketHistoryRepository
+from app.models.ticket import TicketCreate, TicketUpdate
+from app.models.workflow import WorkflowRuleInternal, WorkflowTrigger
+from app.services.ticket_service_db import TicketServiceDB
+from app.tools.workflow_sim import _ticket_states, simulate, ticket_events
+from app.utils.events import EventTypes
+
+
+def _rule(rule_id, trigger, conditions, actions, active=True):
+    return WorkflowRuleInternal(id=rule_id, name=rule_id, trigger=trigger, conditions=conditions,
+                                actions=actions, active=active, created_at="")
+
+
+def test_history_replays_as_ticket_events():
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == "admin@company.com").first()
+        service = TicketServiceDB(db)
+        ticket = service.create_ticket(TicketCreate(
+            title="Printer on fire", description="x", department="Sim Facilities",
+            priority=TicketPriority.LOW), str(admin.id))
+        ticket_id = str(ticket.id)
+        service.update_ticket(ticket_id, TicketUpdate(
+            status=TicketStatus.IN_PROGRESS, priority=TicketPriority.CRITICAL), str(admin.id))
+        service.update_ticket(ticket_id, TicketUpdate(status=TicketStatus.CLOSED), str(admin.id))
+
+        entries = TicketHistoryRepository(db).get_by_ticket_ids([ticket_id])
+        events = list(ticket_events(_ticket_states(db, [ticket_id])[ticket_id], entries))
+        assert [e["type"] for e in events] == [
+            EventTypes.TICKET_CREATED,
+            EventTypes.TICKET_UPDATED, EventTypes.TICKET_STATUS_CHANGED,
+            EventTypes.TICKET_UPDATED, EventTypes.TICKET_STATUS_CHANGED,
+        ]
+        # The state each event saw is rebuilt from the history, not today's row
+        assert (events[0]["data"]["status"], events[0]["data"]["priority"]) == ("open", "low")
+        assert {c["field"] for c in events[1]["data"]["changes"]} == {"status", "priority"}
+        assert events[2]["data"]["new_status"] == "in_progress"
+        assert events[2]["data"]["priority"] == "critical"
+        assert events[4]["data"]["old_status"] == "in_progress"
+
+        rules = [
+            _rule("created-low", WorkflowTrigger.TICKET_CREATED,
+                  {"department": "Sim Facilities", "priority": "low"}, {"add_comment": "hi"}),
+            _rule("closed-critical", WorkflowTrigger.STATUS_CHANGED,
+                  {"department": "Sim Facilities", "new_status": "closed", "priority": "critical"},
+                  {"send_notification": "reporter", "set_priority": "high"}),
+            _rule("draft", WorkflowTrigger.TICKET_UPDATED,
+                  {"department": "Sim Facilities"}, {"add_comment": "x"}, active=False),
+        ]
+        result = simulate(db, rules)
+        by_id = {rule["id"]: rule for rule in result["rules"]}
+        assert by_id["created-low"]["matches"] == 1
+        assert by_id["closed-critical"]["actions"] == {"send_notification": 1, "set_priority": 1}
+        assert by_id["draft"]["matches"] == 0
+        assert result["events"][EventTypes.TICKET_STATUS_CHANGED] >= 2
+        assert result["events_per_second"] > 0
+    finally:
+        db.close()